@@ -1,13 +1,33 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional, Dict, Any, Final, Mapping, NamedTuple, Set, Tuple
+from functools import lru_cache
 from models.vehicle import Vehicle
 from services.template_service import template_service
-from services.openrouter import openrouter
+from services.openrouter_batcher import openrouter_batcher
+from services.openrouter_batch import openrouter_batch
+from services.vehicle_onboarding import get_popular_vehicles, get_common_jobs
 from services.chunk_generator import chunk_generator
+from services.semantic_cache import intent_cache, embed_query
+from config import settings
+from services.performance import (
+    bundle_cache,
+    chat_response_cache,
+    FastJSONResponse,
+    sse_response,
+)
+import asyncio
 import json
+import logging
+import sys
+import time
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# PERF: Every /chat/* response is encoded by pydantic-core, not stdlib json
+router = APIRouter(default_response_class=FastJSONResponse)
 
 
 class ChatRequest(BaseModel):
@@ -21,42 +41,102 @@ class ChatResponse(BaseModel):
     chunks: List[Dict[str, Any]] = []
 
 
-@router.post("/chat/generate", response_model=ChatResponse)
-async def generate_chat_response(request: ChatRequest):
+# Reply messages (the {name} ones are filled with str.format)
+_NO_MATCH_MESSAGE: Final[str] = (
+    "I couldn't find a specific service procedure for that. "
+    "Please check the full repair manual in the Navigation tab."
+)
+_INTENT_FAILED_MESSAGE: Final[str] = (
+    "I'm having trouble understanding that request right now."
+)
+_NO_REPORT_MESSAGE: Final[str] = (
+    "I can help with that in the full repair section, "
+    "but I don't have a quick report for it yet."
+)
+_NO_CHUNKS_MESSAGE: Final[str] = (
+    "I found the topic '{name}', but it has no content definitions."
+)
+_REPORT_MESSAGE: Final[str] = "Here is the Custom Service Report for {name}."
+
+
+@lru_cache(maxsize=256)
+def _reply_json(message: str) -> str:
+    """Serialized message-only ChatResponse, rendered once per distinct message."""
+    return ChatResponse(message=message).model_dump_json()
+
+
+async def _chat_request_body(http_request: Request) -> ChatRequest:
     """
-    Smart Service Doc Generator Endpoint.
-    1. Parses user query to find EXACT nav_tree leaf ID.
-    2. Generates ONLY the chunks defined in service_templates.json for that leaf.
-    3. Returns a structured report.
+    PERF: Validate the raw body straight from bytes in pydantic-core,
+    skipping the stdlib json.loads + dict validation pass.
     """
+    try:
+        return ChatRequest.model_validate_json(await http_request.body())
+    except ValidationError as e:
+        # Same error shape as FastAPI's own body validation
+        raise RequestValidationError(
+            [
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ]
+        )
 
-    # 1. Find Candidates
-    candidates = template_service.search_candidates(request.query, request.vehicle)
 
-    if not candidates:
-        return ChatResponse(
-            message="I couldn't find a specific service procedure for that. Please check the full repair manual in the Navigation tab."
-        )
+class PrewarmRequest(BaseModel):
+    """Empty lists fall back to popular vehicles x common jobs."""
 
-    # 2. LLM Intent Parsing
-    # We give the LLM the user query and the top candidates.
-    # It must pick the BEST match or "NONE".
+    vehicles: List[Vehicle] = []
+    queries: List[str] = []
 
-    candidates_text = "\n".join(
-        [
-            f"- ID: {c['id']}\n  Name: {c['name']}\n  Desc: {c['description']}"
-            for c in candidates
-        ]
+
+def _clean_leaf_id(raw: str) -> str:
+    """
+    Strip whitespace and markdown backticks from an LLM leaf ID reply.
+    Interned so template lookups compare against the loaded keys by identity.
+    """
+    leaf_id = raw.strip()
+    if leaf_id.startswith("`"):
+        leaf_id = leaf_id.replace("`", "")
+    return sys.intern(leaf_id)
+
+
+# Score lead that makes the top candidate unambiguous. Matches the exact-phrase
+# boost in search_candidates: only one candidate contains the whole query.
+_DOMINANT_MARGIN = 5
+
+
+def _dominant_candidate(candidates: List[Dict]) -> Optional[str]:
+    """Return the top candidate ID if it leads the runner-up by _DOMINANT_MARGIN."""
+    top = candidates[0]["score"]
+    runner_up = candidates[1]["score"] if len(candidates) > 1 else 0
+    if top - runner_up >= _DOMINANT_MARGIN:
+        return candidates[0]["id"]
+    return None
+
+
+def _exact_cache_key(request: ChatRequest, candidates: List[Dict]) -> str:
+    """Exact-match key: normalized query + vehicle + the candidate set offered to the LLM."""
+    vehicle = request.vehicle
+    candidate_ids = ",".join(sorted(c["id"] for c in candidates))
+    return (
+        f"chat:{request.query.strip().lower()}|{vehicle.year}|{vehicle.make}"
+        f"|{vehicle.model}|{vehicle.engine}|{candidate_ids}"
     )
 
-    prompt = f"""You are an expert automotive service advisor.
-    
-User Query: "{request.query}"
-Vehicle: {request.vehicle.year} {request.vehicle.make} {request.vehicle.model} {request.vehicle.engine}
 
-Available Service Procedures (Candidates):
-{candidates_text}
+# Hard caps on the intent prompt: top-K candidates, each description truncated.
+# Prompt length drives LLM prefill latency and token cost.
+_MAX_CANDIDATES: Final[int] = 8
+_DESC_CHARS: Final[int] = 180
+
+# Each pre-warm (vehicle, query) pair is one paid LLM call; the defaults
+# (popular vehicles x common jobs) stay well under this
+_MAX_PREWARM_PAIRS: Final[int] = 250
 
+# Static prompt segments; only the query line and the per-vehicle
+# candidate segment vary between calls
+_INTENT_HEADER: Final[str] = "You are an expert automotive service advisor.\n\n"
+_INTENT_FOOTER: Final[str] = """
 Task: Identify the SINGLE best matching Procedure ID from the list above that answers the user's query.
 - If the user is asking for a specific repair, spec, or procedure that matches one of the candidates, return that ID.
 - If NONE of the candidates are a good match, return "NONE".
@@ -66,59 +146,442 @@ Rules:
 - Do not add any explanation or punctuation.
 """
 
+
+@lru_cache(maxsize=4096)
+def _vehicle_candidates_segment(
+    vehicle_line: str, candidates: Tuple[Tuple[str, str, str], ...]
+) -> str:
+    """Render the vehicle line + candidate list once per (vehicle, candidate set)."""
+    candidates_text = "\n".join(
+        f"- ID: {leaf_id}\n  Name: {name}\n  Desc: {description}"
+        for leaf_id, name, description in candidates
+    )
+    return (
+        f"Vehicle: {vehicle_line}\n\n"
+        f"Available Service Procedures (Candidates):\n{candidates_text}\n"
+    )
+
+
+def _build_intent_prompt(query: str, vehicle: Vehicle, candidates: List[Dict]) -> str:
+    """Join the precomputed prompt segments around the user's query."""
+    segment = _vehicle_candidates_segment(
+        f"{vehicle.year} {vehicle.make} {vehicle.model} {vehicle.engine}",
+        tuple(
+            (c["id"], c["name"], (c["description"] or "")[:_DESC_CHARS])
+            for c in candidates
+        ),
+    )
+    return "".join(
+        (_INTENT_HEADER, f'User Query: "{query}"\n', segment, _INTENT_FOOTER)
+    )
+
+
+async def _parse_intent(request: ChatRequest, candidates: List[Dict]) -> Optional[str]:
+    """
+    Ask the LLM to pick the best candidate leaf ID (or "NONE").
+    Returns None if the LLM call fails.
+    """
+    # We give the LLM the user query and the top candidates.
+    # It must pick the BEST match or "NONE".
+    prompt = _build_intent_prompt(request.query, request.vehicle, candidates)
+
     try:
-        leaf_id, _ = await openrouter.chat_completion(
-            "ingestion",  # Use fast/free model
-            [{"role": "user", "content": prompt}],
+        # PERF: Coalesced with concurrent intent prompts into one burst
+        leaf_id = await openrouter_batcher.submit(
+            prompt,
+            model_key="ingestion",  # Use fast/free model
             temperature=0.1,
         )
-        leaf_id = leaf_id.strip()
+        return _clean_leaf_id(leaf_id)
+
+    except Exception:
+        logger.exception("intent_parse_failed query=%r", request.query[:200])
+        return None
+
+
+class _LeafResolution(NamedTuple):
+    """Outcome of resolving a chat query to a template (or an early reply)."""
+
+    reply: Optional[str] = None
+    cached_json: Optional[str] = None
+    leaf_id: Optional[str] = None
+    template: Optional[Mapping] = None
+    exact_key: Optional[str] = None
+
+
+async def _resolve_leaf(request: ChatRequest) -> _LeafResolution:
+    """
+    Steps 1-2 shared by the buffered and streaming endpoints:
+    candidate search, cache lookups, LLM intent parsing, template lookup.
+    """
 
-        # Clean up potential markdown
-        if leaf_id.startswith("`"):
-            leaf_id = leaf_id.replace("`", "")
+    # 1. Find Candidates
+    candidates = template_service.search_candidates(
+        request.query, request.vehicle, limit=_MAX_CANDIDATES
+    )
 
-    except Exception as e:
-        print(f"LLM Intent Parsing Failed: {e}")
-        return ChatResponse(
-            message="I'm having trouble understanding that request right now."
+    if not candidates:
+        return _LeafResolution(reply=_NO_MATCH_MESSAGE)
+
+    # PERF: Identical repeat queries (reloads, common phrasings) are answered
+    # from the exact-match cache - a full report skips generation entirely.
+    exact_key = _exact_cache_key(request, candidates)
+    exact_hit = await chat_response_cache.get(exact_key)
+    if exact_hit and exact_hit.get("response_json"):
+        logger.info("chat_cache_hit leaf_id=%s", exact_hit["leaf_id"])
+        return _LeafResolution(
+            cached_json=exact_hit["response_json"], leaf_id=exact_hit["leaf_id"]
         )
 
-    if leaf_id == "NONE" or not template_service.get_template(leaf_id):
-        return ChatResponse(
-            message="I can help with that in the full repair section, but I don't have a quick report for it yet."
+    # 2. LLM Intent Parsing
+    # PERF: Paraphrased repeats resolve from the semantic cache without an LLM
+    # round-trip. A hit must still be one of the current candidates.
+    query_vector = embed_query(request.query)
+    vehicle_fingerprint = intent_cache.vehicle_key(request.vehicle)
+    leaf_id = exact_hit["leaf_id"] if exact_hit else None
+    if not leaf_id:
+        leaf_id = intent_cache.lookup(
+            query_vector,
+            vehicle_key=vehicle_fingerprint,
+            threshold=0.9,
+            allowed_ids=[c["id"] for c in candidates],
         )
+        if leaf_id:
+            logger.info("intent_cache_hit leaf_id=%s", leaf_id)
 
-    # 3. Generate Chunks
-    template = template_service.get_template(leaf_id)
-    chunks_def = template.get("chunks", [])
+    # PERF: An unambiguous keyword winner needs no LLM tie-break
+    if not leaf_id:
+        leaf_id = _dominant_candidate(candidates)
 
-    if not chunks_def:
-        return ChatResponse(
-            message=f"I found the topic '{template['name']}', but it has no content definitions."
-        )
+    from_llm = not leaf_id
+    if from_llm:
+        # PERF: Overlap the free per-vehicle lookups that chunk generation
+        # needs with the intent LLM round-trip
+        chunk_generator.prefetch_vehicle_sources(request.vehicle)
+        leaf_id = await _parse_intent(request, candidates)
+        if leaf_id is None:
+            return _LeafResolution(reply=_INTENT_FAILED_MESSAGE)
+        await chat_response_cache.set(exact_key, {"leaf_id": leaf_id})
+
+    # Single template lookup shared by the validity check and generation
+    template = None if leaf_id == "NONE" else template_service.get_template(leaf_id)
+    if not template:
+        return _LeafResolution(reply=_NO_REPORT_MESSAGE)
+
+    if from_llm:
+        intent_cache.insert(query_vector, vehicle_fingerprint, leaf_id)
+
+    if not template.get("chunks"):
+        return _LeafResolution(reply=_NO_CHUNKS_MESSAGE.format(name=template["name"]))
+
+    return _LeafResolution(leaf_id=leaf_id, template=template, exact_key=exact_key)
+
+
+def _chunk_to_dict(chunk: Any) -> Dict[str, Any]:
+    """Convert a chunk model to a JSON-safe dict (Pydantic v2 path)."""
+    if hasattr(chunk, "model_dump"):
+        return chunk.model_dump(mode="json")
+    return chunk
+
+
+# Cached bundles older than this are still served, but refreshed in the background
+_BUNDLE_REFRESH_SECONDS = 6 * 3600
 
-    # Use chunk_generator to generate the bundle
-    # We reuse generate_leaf_bundle logic but we might want to customize it
-    # actually generate_leaf_bundle is perfect.
+_refreshing_bundles: Set[str] = set()
+# Strong refs so refresh tasks aren't garbage collected mid-flight
+_refresh_tasks: Set[asyncio.Task] = set()
 
+
+def _bundle_key(leaf_id: str, vehicle: Vehicle) -> str:
+    return (
+        f"bundle:{leaf_id}|{vehicle.year}|{vehicle.make}"
+        f"|{vehicle.model}|{vehicle.engine}"
+    )
+
+
+async def _generate_bundle_chunks(
+    vehicle: Vehicle, leaf_id: str, chunks_def: List[Dict]
+) -> List[Dict[str, Any]]:
+    """Generate a leaf bundle and return the successful chunks as dicts."""
     bundle_result = await chunk_generator.generate_leaf_bundle(
-        vehicle=request.vehicle, leaf_id=leaf_id, chunks_def=chunks_def
+        vehicle=vehicle, leaf_id=leaf_id, chunks_def=chunks_def
     )
+    return [
+        _chunk_to_dict(res.get("chunk"))
+        for res in bundle_result.get("results", {}).values()
+        if res.get("status") == "success"
+    ]
 
-    # Format results for response
-    generated_chunks = []
-    results = bundle_result.get("results", {})
-
-    for key, res in results.items():
-        if res.get("status") == "success":
-            chunk = res.get("chunk")
-            # Convert chunk model to dict
-            chunk_dict = chunk.dict() if hasattr(chunk, "dict") else chunk
-            generated_chunks.append(chunk_dict)
-
-    return ChatResponse(
-        message=f"Here is the Custom Service Report for {template['name']}.",
-        leaf_id=leaf_id,
+
+async def _refresh_bundle(key: str, vehicle: Vehicle, leaf_id: str, chunks_def) -> None:
+    try:
+        chunks = await _generate_bundle_chunks(vehicle, leaf_id, chunks_def)
+        if chunks and len(chunks) == len(chunks_def):
+            await bundle_cache.set(key, (chunks, time.time()))
+    except Exception:
+        logger.exception("bundle_refresh_failed leaf_id=%s", leaf_id)
+    finally:
+        _refreshing_bundles.discard(key)
+
+
+async def _cached_bundle(
+    vehicle: Vehicle, leaf_id: str, chunks_def: List[Dict]
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Return cached chunks for this (leaf, vehicle) regardless of which query
+    reached it. Past the refresh window the stale copy is still returned
+    while a single background task regenerates it.
+    """
+    key = _bundle_key(leaf_id, vehicle)
+    hit = await bundle_cache.get(key)
+    if not hit:
+        return None
+
+    chunks, generated_at = hit
+    if (
+        time.time() - generated_at > _BUNDLE_REFRESH_SECONDS
+        and key not in _refreshing_bundles
+    ):
+        _refreshing_bundles.add(key)
+        task = asyncio.create_task(_refresh_bundle(key, vehicle, leaf_id, chunks_def))
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+
+    logger.info("bundle_cache_hit leaf_id=%s", leaf_id)
+    return chunks
+
+
+async def _cache_report(
+    request: ChatRequest,
+    resolution: _LeafResolution,
+    generated_chunks: List[Dict[str, Any]],
+    from_bundle_cache: bool = False,
+) -> str:
+    """Serialize the finished report; cache it if every chunk succeeded."""
+    template = resolution.template
+    response = ChatResponse(
+        message=_REPORT_MESSAGE.format(name=template["name"]),
+        leaf_id=resolution.leaf_id,
         chunks=generated_chunks,
     )
+
+    # PERF: Serialize once; the same bytes are returned now and on cache hits
+    response_json = response.model_dump_json()
+
+    # Only cache complete reports - a partial bundle should be retried next time
+    if generated_chunks and len(generated_chunks) == len(template["chunks"]):
+        await chat_response_cache.set(
+            resolution.exact_key,
+            {"leaf_id": resolution.leaf_id, "response_json": response_json},
+        )
+        if not from_bundle_cache:
+            await bundle_cache.set(
+                _bundle_key(resolution.leaf_id, request.vehicle),
+                (generated_chunks, time.time()),
+            )
+
+    return response_json
+
+
+@router.post(
+    "/chat/generate", response_model=ChatResponse, response_class=FastJSONResponse
+)
+async def generate_chat_response(request: ChatRequest = Depends(_chat_request_body)):
+    """
+    Smart Service Doc Generator Endpoint.
+    1. Parses user query to find EXACT nav_tree leaf ID.
+    2. Generates ONLY the chunks defined in service_templates.json for that leaf.
+    3. Returns a structured report.
+    """
+    resolution = await _resolve_leaf(request)
+    if resolution.reply:
+        # PERF: Pre-rendered body - no model build or response_model validation
+        return Response(
+            content=_reply_json(resolution.reply), media_type="application/json"
+        )
+    if resolution.cached_json:
+        return Response(content=resolution.cached_json, media_type="application/json")
+
+    # 3. Generate Chunks
+    # PERF: Popular leaves on common vehicles are served from the bundle cache
+    chunks_def = resolution.template["chunks"]
+    generated_chunks = await _cached_bundle(
+        request.vehicle, resolution.leaf_id, chunks_def
+    )
+    from_bundle_cache = generated_chunks is not None
+    if not from_bundle_cache:
+        generated_chunks = await _generate_bundle_chunks(
+            request.vehicle, resolution.leaf_id, chunks_def
+        )
+
+    response_json = await _cache_report(
+        request, resolution, generated_chunks, from_bundle_cache
+    )
+    return Response(content=response_json, media_type="application/json")
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_chat_response(request: ChatRequest):
+    """
+    Generator that yields SSE events as each report chunk completes,
+    so time-to-first-chunk tracks the fastest chunk, not the slowest.
+    """
+    resolution = await _resolve_leaf(request)
+    if resolution.reply:
+        yield f"event: message\ndata: {_reply_json(resolution.reply)}\n\n"
+        return
+
+    if resolution.cached_json:
+        cached = json.loads(resolution.cached_json)
+        yield _sse(
+            "meta",
+            {
+                "leaf_id": cached["leaf_id"],
+                "message": cached["message"],
+                "total": len(cached["chunks"]),
+            },
+        )
+        for chunk in cached["chunks"]:
+            yield _sse("chunk", chunk)
+        yield _sse("complete", {"leaf_id": cached["leaf_id"], "failed": 0})
+        return
+
+    template = resolution.template
+    yield _sse(
+        "meta",
+        {
+            "leaf_id": resolution.leaf_id,
+            "message": _REPORT_MESSAGE.format(name=template["name"]),
+            "total": len(template["chunks"]),
+        },
+    )
+
+    cached_chunks = await _cached_bundle(
+        request.vehicle, resolution.leaf_id, template["chunks"]
+    )
+    if cached_chunks is not None:
+        for chunk in cached_chunks:
+            yield _sse("chunk", chunk)
+        await _cache_report(request, resolution, cached_chunks, from_bundle_cache=True)
+        yield _sse("complete", {"leaf_id": resolution.leaf_id, "failed": 0})
+        return
+
+    generated_chunks = []
+    failed = 0
+    async for content_id, res in chunk_generator.stream_leaf_bundle(
+        vehicle=request.vehicle,
+        leaf_id=resolution.leaf_id,
+        chunks_def=template["chunks"],
+    ):
+        if res["status"] == "success":
+            chunk = _chunk_to_dict(res["chunk"])
+            generated_chunks.append(chunk)
+            yield _sse("chunk", chunk)
+        else:
+            failed += 1
+            yield _sse("chunk_error", {"content_id": content_id, "error": res["error"]})
+
+    await _cache_report(request, resolution, generated_chunks)
+    yield _sse("complete", {"leaf_id": resolution.leaf_id, "failed": failed})
+
+
+@router.post("/chat/generate-stream")
+async def generate_chat_response_stream(
+    http_request: Request,
+    request: ChatRequest = Depends(_chat_request_body),
+):
+    """
+    Streaming variant of /chat/generate using Server-Sent Events.
+
+    Event types:
+    - message: Early reply with no report (no match, LLM failure, ...)
+    - meta: Matched leaf_id, report title and chunk count
+    - chunk: Individual chunk data, in completion order
+    - chunk_error: Error for a specific chunk
+    - complete: All chunks finished
+    """
+    return sse_response(_stream_chat_response(request), http_request)
+
+
+@router.post("/chat/prewarm")
+async def prewarm_chat_intents(request: PrewarmRequest):
+    """
+    Resolve intents for popular (vehicle, query) pairs in the background batch
+    lane and seed the exact-match and semantic caches /chat/generate reads.
+    Returns a batch_id to poll with GET /chat/prewarm/{batch_id}.
+    """
+    if settings.is_serverless:
+        # The batch runs after the response, which serverless instances freeze
+        raise HTTPException(
+            status_code=503, detail="Pre-warm is not available on serverless deployments"
+        )
+
+    vehicles = request.vehicles or [
+        Vehicle(**{**v, "year": str(v["year"])}) for v in await get_popular_vehicles()
+    ]
+    queries = request.queries or [
+        job.replace("_", " ") for job in await get_common_jobs()
+    ]
+    if len(vehicles) * len(queries) > _MAX_PREWARM_PAIRS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {_MAX_PREWARM_PAIRS} vehicle x query pairs per pre-warm",
+        )
+
+    pending: Dict[str, Tuple[ChatRequest, List[Dict], str]] = {}
+    prompts = []
+    for vehicle in vehicles:
+        for query in queries:
+            chat_request = ChatRequest(query=query, vehicle=vehicle)
+            candidates = template_service.search_candidates(
+                query, vehicle, limit=_MAX_CANDIDATES
+            )
+            if not candidates:
+                continue
+            exact_key = _exact_cache_key(chat_request, candidates)
+            if exact_key in pending or await chat_response_cache.get(exact_key):
+                continue
+
+            custom_id = f"intent-{len(prompts)}"
+            pending[custom_id] = (chat_request, candidates, exact_key)
+            prompts.append(
+                {
+                    "custom_id": custom_id,
+                    "prompt": _build_intent_prompt(query, vehicle, candidates),
+                    "model_key": "ingestion",
+                    "temperature": 0.1,
+                }
+            )
+
+    if not prompts:
+        return {"batch_id": None, "queued": 0}
+
+    async def seed_caches(custom_id: str, text: str) -> None:
+        chat_request, candidates, exact_key = pending.pop(custom_id)
+        leaf_id = _clean_leaf_id(text)
+        await chat_response_cache.set(exact_key, {"leaf_id": leaf_id})
+        if leaf_id != "NONE" and template_service.get_template(leaf_id):
+            intent_cache.insert(
+                embed_query(chat_request.query),
+                intent_cache.vehicle_key(chat_request.vehicle),
+                leaf_id,
+            )
+
+    batch_id = openrouter_batch.submit_batch(prompts, on_result=seed_caches)
+    return {"batch_id": batch_id, "queued": len(prompts)}
+
+
+@router.get("/chat/prewarm/{batch_id}")
+async def get_prewarm_status(batch_id: str):
+    """Poll a pre-warm batch (results are already applied to the chat caches)."""
+    batch = openrouter_batch.retrieve_batch(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return {
+        key: batch[key]
+        for key in ("status", "total", "completed", "failed", "total_cost")
+    }
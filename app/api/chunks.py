@@ -4,17 +4,142 @@ Single source of truth for all chunk requests
 """
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple
 from models.vehicle import Vehicle
+from models.verification import to_db_status
 from services.supabase_client import supabase_service
 from services.chunk_generator import chunk_generator
 from services.real_generator import real_generator
 from services.advanced_generator import advanced_generator
+from services.performance import (
+    FastJSONResponse,
+    chunk_failure_cache,
+    chunk_response_cache,
+)
+from config import settings
+from pydantic_core import to_json
+from functools import lru_cache
+from types import MappingProxyType
+import asyncio
+import json
+import logging
 import re
 
-router = APIRouter()
+# PERF: Large chunk `data` payloads are encoded by pydantic-core, not stdlib json
+router = APIRouter(default_response_class=FastJSONResponse)
+logger = logging.getLogger(__name__)
+
+# Background cache-miss generations in progress, keyed by
+# (vehicle_key, content_id, chunk_type, template_version).
+# Also keeps a strong ref so running tasks aren't garbage collected.
+_inflight: Dict[Tuple[str, str, str, str], asyncio.Task] = {}
+
+# Generator chunk types; each maps to itself
+_CANONICAL_CHUNK_TYPES = (
+    "fluid_capacity",
+    "torque_spec",
+    "removal_steps",
+    "known_issues",
+    "part_location",
+    "wiring_diagram",
+    "diag_flow",
+    "labor_time",
+    "tsb",
+    "part_info",
+)
+
+# Request chunk_type -> generator chunk type: the canonical types plus the
+# generic template aliases. One hash probe resolves either kind of key.
+_CHUNK_TYPE_MAP = MappingProxyType(
+    {
+        **{chunk_type: chunk_type for chunk_type in _CANONICAL_CHUNK_TYPES},
+        "spec": "fluid_capacity",
+        "procedure": "removal_steps",
+        "list": "known_issues",
+        "diagram": "wiring_diagram",
+    }
+)
+
+# content_ids served by the NHTSA / multi-source generators on a cache miss
+_TSB_IDS = frozenset({"known_issues", "common_problems", "tsbs"})
+_RECALL_IDS = frozenset({"recalls", "safety_recalls"})
+_DIAG_IDS = frozenset({"diagnostic_flow", "diag_flow", "troubleshooting"})
+
+# Ford F-150/F-250/F-350 in a vehicle_key model part ("f150")
+_FSERIES_RE = re.compile(r"f([1-3])50")
+# year_make_model_engine; model may itself contain underscores
+_VEHICLE_KEY_RE = re.compile(r"([^_]*)_([^_]*)_(.*)_([^_]*)")
+
+# Generic words dropped from content_id before the reuse search
+_STOPWORDS = frozenset({"engine", "system", "assembly", "components"})
+
+
+@lru_cache(maxsize=4096)
+def _extract_search_term(content_id: str) -> Optional[str]:
+    """Reuse-search keyword for a content_id: its last 2 non-generic words."""
+    keywords = [k for k in content_id.replace("_", " ").split() if k not in _STOPWORDS]
+    # Use last 2 words usually most specific
+    return " ".join(keywords[-2:]) if keywords else None
+
+
+class ParsedVehicle(NamedTuple):
+    """A vehicle_key split into its parts, plus the display names used by generators."""
+
+    year: str
+    make: str
+    model: str
+    engine: str
+    display_make: str
+    display_model: str
+
+    def to_vehicle(self) -> Vehicle:
+        """Vehicle with the raw key parts (model keeps its underscores)."""
+        return Vehicle(
+            year=self.year, make=self.make, model=self.model, engine=self.engine
+        )
+
+    def to_display_vehicle(self) -> Vehicle:
+        """Vehicle with display names, e.g. Ford F-150."""
+        return Vehicle(
+            year=self.year,
+            make=self.display_make,
+            model=self.display_model,
+            engine=self.engine,
+        )
+
+
+@lru_cache(maxsize=8192)
+def _parse_vehicle_key(vehicle_key: str) -> ParsedVehicle:
+    """
+    Parse "2011_ford_f150_50lv8" once; vehicle keys repeat heavily across requests.
+    Raises ValueError for keys with fewer than 4 parts.
+    """
+    # PERF: One regex scan validates the shape and splits the key without
+    # building intermediate part lists
+    match = _VEHICLE_KEY_RE.fullmatch(vehicle_key)
+    if not match:
+        raise ValueError(
+            "vehicle_key must have at least 4 parts: year_make_model_engine"
+        )
+
+    year, make, model, engine = match.groups()
+    # Better model parsing - handle F150 -> F-150
+    fseries = _FSERIES_RE.search(model.lower())
+    if fseries:
+        display_model = f"F-{fseries.group(1)}50"
+    else:
+        display_model = model.replace("_", " ").title()
+
+    return ParsedVehicle(
+        year=year,
+        make=make,
+        model=model,
+        engine=engine,
+        display_make=make.capitalize(),
+        display_model=display_model,
+    )
 
 
 class ChunkResponse(BaseModel):
@@ -39,6 +164,30 @@ class ChunkResponse(BaseModel):
     generated_at: Optional[str] = None
 
 
+def _build_ready_response(
+    vehicle_key: str,
+    content_id: str,
+    chunk_type: str,
+    template_type: str,
+    template_version: str,
+    **fields: Any,
+) -> ChunkResponse:
+    """
+    Build a status="ready" ChunkResponse from trusted server-side data.
+    PERF: model_construct skips field validation; unset fields take the
+    model defaults (qa_status="pending", verified_status="unverified", ...).
+    """
+    return ChunkResponse.model_construct(
+        vehicle_key=vehicle_key,
+        content_id=content_id,
+        chunk_type=chunk_type,
+        template_type=template_type,
+        template_version=template_version,
+        status="ready",
+        **fields,
+    )
+
+
 @router.get("/chunks/{content_id}", response_model=ChunkResponse)
 async def get_chunk(
     content_id: str,
@@ -56,32 +205,26 @@ async def get_chunk(
     Flow:
     1. Check Supabase for cached chunk
     2. If found → return immediately
-    3. If missing → trigger async generation → return placeholder
-    4. Frontend polls or uses websocket for completion
+    3. If missing → trigger background generation → return status="generating"
+    4. Frontend polls until the saved chunk comes back status="ready"
     """
 
     # Normalize template_type immediately to fix DB constraint issues
     template_type = _normalize_template_type(vehicle_key, template_type)
 
+    # PERF: Hot chunks are served from an in-process L1 without a Supabase round-trip
+    cache_key = f"{vehicle_key}|{content_id}|{chunk_type}|{template_type}|{template_version}"
+    cached = await chunk_response_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    # Taken before the DB read so a write racing this request can't be cached
+    cache_version = chunk_response_cache.version()
+
     # Parse vehicle key
     try:
-        parts = vehicle_key.split("_")
-        if len(parts) < 4:
-            raise ValueError(
-                "vehicle_key must have at least 4 parts: year_make_model_engine"
-            )
-
-        vehicle = Vehicle(
-            year=parts[0],
-            make=parts[1],
-            model="_".join(parts[2:-1]) if len(parts) > 4 else parts[2],
-            engine=parts[-1],
-        )
+        _parse_vehicle_key(vehicle_key)
     except Exception as e:
-        print(f"❌ Vehicle parsing error: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.exception("❌ Vehicle parsing error: %s", e)
         raise HTTPException(
             status_code=400,
             detail=f"Invalid vehicle_key format: {vehicle_key}. Error: {str(e)}",
@@ -91,58 +234,43 @@ async def get_chunk(
     # Map 'diagram' to 'wiring_diagram' for DB lookup if needed
     db_chunk_type = "wiring_diagram" if chunk_type == "diagram" else chunk_type
 
-    existing_chunk = await supabase_service.get_chunk(
-        vehicle_key=vehicle_key, content_id=content_id, chunk_type=db_chunk_type
-    )
-
     # REUSE LOGIC: If exact match missing, try to find a reusable chunk
-    if not existing_chunk:
-        # Try to find a chunk with similar content
-        # e.g. if looking for "spark_plug_torque", search for chunks with type "torque_spec" and title "Spark Plug"
-
-        # Extract keywords from content_id
-        keywords = content_id.replace("_", " ").split()
-        # Filter out common words
-        keywords = [
-            k
-            for k in keywords
-            if k not in ["engine", "system", "assembly", "components"]
-        ]
-
-        if len(keywords) > 0:
-            search_term = " ".join(
-                keywords[-2:]
-            )  # Use last 2 words usually most specific
-            print(f"♻️ Attempting reuse search for: {search_term} ({db_chunk_type})")
-
-            reusable = await supabase_service.find_reusable_chunk(
-                vehicle_key=vehicle_key, chunk_type=db_chunk_type, keyword=search_term
+    # e.g. if looking for "spark_plug_torque", search for chunks with type "torque_spec" and title "Spark Plug"
+
+    search_term = _extract_search_term(content_id)
+
+    # PERF: Exact match, reuse search and the removal_steps -> torque_spec
+    # fallback are answered in one Supabase round-trip
+    existing_chunk = None
+    match = await supabase_service.get_chunk_with_reuse(
+        vehicle_key=vehicle_key,
+        content_id=content_id,
+        chunk_type=db_chunk_type,
+        keyword=search_term,
+        # FALLBACK: If removal_steps missing, try torque_spec
+        allow_torque_fallback=db_chunk_type == "removal_steps",
+    )
+    if match:
+        existing_chunk, match_kind = match
+        if match_kind == "reuse":
+            logger.info(
+                "♻️ Found reusable chunk! %s for %s", existing_chunk.id, content_id
             )
+        elif match_kind == "torque_fallback":
+            logger.info("♻️ Fallback: Found torque spec! %s", existing_chunk.id)
+            # We must update chunk_type to match the found chunk so frontend renders it correctly
+            chunk_type = "torque_spec"
 
-            if reusable:
-                print(f"♻️ Found reusable chunk! {reusable.id} for {content_id}")
-                existing_chunk = reusable
-
-            # FALLBACK: If removal_steps missing, try torque_spec
-            if not existing_chunk and db_chunk_type == "removal_steps":
-                print(f"♻️ Fallback: Searching for torque_spec for missing procedure...")
-                reusable_torque = await supabase_service.find_reusable_chunk(
-                    vehicle_key=vehicle_key,
-                    chunk_type="torque_spec",
-                    keyword=search_term,
-                )
-                if reusable_torque:
-                    print(f"♻️ Fallback: Found torque spec! {reusable_torque.id}")
-                    existing_chunk = reusable_torque
-                    # We must update chunk_type to match the found chunk so frontend renders it correctly
-                    chunk_type = "torque_spec"
+    # With migration 005 the lookup already skips NULL, "See Manual", banned and
+    # rejected rows in SQL. These checks remain for the non-RPC fallback path.
 
     # Data Integrity Check: Treat NULL data/content OR banned chunks as cache miss to force regeneration
     if existing_chunk and (
         existing_chunk.data is None or existing_chunk.content_text is None
     ):
-        print(
-            f"⚠️ Found corrupted chunk (NULL data/content): {content_id}. Treating as cache miss."
+        logger.warning(
+            "⚠️ Found corrupted chunk (NULL data/content): %s. Treating as cache miss.",
+            content_id,
         )
         existing_chunk = None
 
@@ -150,8 +278,11 @@ async def get_chunk(
     if existing_chunk and existing_chunk.data:
         stored_version = existing_chunk.data.get("template_version", "1.0")
         if stored_version != template_version:
-            print(
-                f"⚠️ Template version mismatch for {content_id}: stored={stored_version}, requested={template_version}. Treating as cache miss."
+            logger.warning(
+                "⚠️ Template version mismatch for %s: stored=%s, requested=%s. Treating as cache miss.",
+                content_id,
+                stored_version,
+                template_version,
             )
             existing_chunk = None
 
@@ -161,373 +292,382 @@ async def get_chunk(
         and existing_chunk.content_text
         and "See Manual" in existing_chunk.content_text
     ):
-        print(
-            f"⚠️ Found 'See Manual' stub in chunk: {content_id}. Treating as cache miss to force regeneration."
+        logger.warning(
+            "⚠️ Found 'See Manual' stub in chunk: %s. Treating as cache miss to force regeneration.",
+            content_id,
         )
         existing_chunk = None
 
-    # Banned chunks should be deleted and regenerated
-    if (
-        existing_chunk
-        and hasattr(existing_chunk, "verified_status")
-        and existing_chunk.verified_status == "banned"
+    # Banned chunks should be deleted and regenerated.
+    # Data Integrity Fix: legacy verification_status 'rejected' is treated as banned.
+    # PERF: The delete runs in the background generation task, not on the request path
+    stale_chunk_id = None
+    if existing_chunk and (
+        existing_chunk.verified_status == "banned"
+        or existing_chunk.verification_status == "rejected"
     ):
-        print(f"⚠️ Found banned chunk: {content_id}. Deleting and regenerating...")
-        # Delete the banned chunk (sync call, not async)
-        try:
-            supabase_service.client.table("chunks").delete().eq(
-                "id", existing_chunk.id
-            ).execute()
-            print(f"✅ Deleted banned chunk: {content_id}")
-        except Exception as e:
-            print(f"❌ Failed to delete banned chunk: {e}")
+        logger.warning(
+            "⚠️ Found banned/rejected chunk: %s. Deleting and regenerating...",
+            content_id,
+        )
+        stale_chunk_id = existing_chunk.id
         existing_chunk = None
 
     if existing_chunk:
-        # Data Integrity Fix: If legacy verification_status is 'rejected', treat as banned and regenerate
-        if existing_chunk.verification_status == "rejected":
-            print(f"⚠️ Found rejected chunk: {content_id}. Deleting and regenerating...")
-            try:
-                supabase_service.client.table("chunks").delete().eq(
-                    "id", existing_chunk.id
-                ).execute()
-                print(f"✅ Deleted rejected chunk: {content_id}")
-                existing_chunk = None
-            except Exception as e:
-                print(f"❌ Failed to delete rejected chunk: {e}")
-
-    if existing_chunk:
-        # Get verified_status for the response
-        verified_status = getattr(existing_chunk, "verified_status", "unverified")
-
         # For non-critical unverified items, this will return status="ready" and visibility="safe"
         # but verified_status="unverified" (yellow badge in UI)
-        print(f"💾 Database hit for: {content_id}")
-        return ChunkResponse(
-            vehicle_key=vehicle_key,
-            content_id=content_id,
-            chunk_type=chunk_type,
-            template_type=template_type,
-            template_version=existing_chunk.data.get("template_version", "1.0"),
-            status="ready",
+        logger.info("💾 Database hit for: %s", content_id)
+        response = _build_ready_response(
+            vehicle_key,
+            content_id,
+            chunk_type,
+            template_type,
+            existing_chunk.data.get("template_version", "1.0"),
             verification_status=existing_chunk.verification_status,
             source_confidence=existing_chunk.source_confidence,
             qa_status=existing_chunk.qa_status,
             qa_notes=existing_chunk.qa_notes,
-            verified_status=verified_status,
-            verified_at=getattr(existing_chunk, "verified_at", None),
-            promotion_count=getattr(existing_chunk, "promotion_count", 0),
-            visibility="safe",
+            verified_status=existing_chunk.verified_status,
+            verified_at=existing_chunk.verified_at,
+            promotion_count=existing_chunk.promotion_count,
             sources=existing_chunk.sources,
             data=existing_chunk.data,
             generated_at=existing_chunk.created_at,
         )
+        body = to_json(response)
+        # Indexed by the requested row and the row actually served (a reuse
+        # or torque fallback hit serves another row), so saving either one
+        # evicts it. db_chunk_type is the requested DB type: chunk_type may
+        # be the "diagram" alias or reassigned to torque_spec above
+        await chunk_response_cache.set_for_rows(
+            cache_key,
+            body,
+            list(
+                {
+                    (vehicle_key, content_id, db_chunk_type),
+                    (
+                        existing_chunk.vehicle_key,
+                        existing_chunk.content_id,
+                        existing_chunk.chunk_type,
+                    ),
+                }
+            ),
+            cache_version,
+        )
+        return Response(content=body, media_type="application/json")
 
     # Cache miss - try to generate real data
-    print(f"🌐 Database miss for: {content_id}")
+    logger.info("🌐 Database miss for: %s", content_id)
+
+    # A generation that just failed isn't restarted by every poll
+    failure_key = f"{vehicle_key}|{content_id}|{chunk_type}|{template_version}"
+    failure = await chunk_failure_cache.get(failure_key)
+    if failure is not None:
+        return FastJSONResponse(status_code=500, content=failure)
+
+    # PERF: Generation (scrape + LLM + save) runs in the background and the
+    # request returns a placeholder immediately; the frontend re-polls and
+    # picks the chunk up from the database once it's saved. Concurrent misses
+    # for the same chunk share one background task.
+    task = _start_generation(
+        vehicle_key,
+        content_id,
+        chunk_type,
+        template_type,
+        template_version,
+        stale_chunk_id=stale_chunk_id,
+    )
+    if settings.is_serverless:
+        # Serverless instances freeze or kill work still running after the
+        # response, so the chunk would never be saved: generate inline there
+        return await asyncio.shield(task)
+    return _build_generating_response(
+        vehicle_key, content_id, chunk_type, template_type, template_version
+    )
 
-    # Parse vehicle info from vehicle_key (e.g., "2011_ford_f150_50lv8")
-    vehicle_parts = vehicle_key.split("_")
-    if len(vehicle_parts) >= 3:
-        year = vehicle_parts[0]
-        make = vehicle_parts[1].capitalize()
-        # Better model parsing - handle F150 -> F-150
-        raw_model = "_".join(vehicle_parts[2:-1])
-        if "f150" in raw_model.lower():
-            model = "F-150"
-        elif "f250" in raw_model.lower():
-            model = "F-250"
-        elif "f350" in raw_model.lower():
-            model = "F-350"
-        else:
-            model = raw_model.replace("_", " ").title()
 
-        print(f"📋 Parsed: {year} {make} {model}")
+def _build_generating_response(
+    vehicle_key: str,
+    content_id: str,
+    chunk_type: str,
+    template_type: str,
+    template_version: str,
+) -> ChunkResponse:
+    """Placeholder returned while a cache-miss chunk generates in the background."""
+    return ChunkResponse.model_construct(
+        vehicle_key=vehicle_key,
+        content_id=content_id,
+        chunk_type=chunk_type,
+        template_type=template_type,
+        template_version=template_version,
+        status="generating",
+        verification_status="pending",
+        source_confidence=0.0,
+        sources=[],
+        data={
+            "message": "Content is being generated. Check back in a few seconds.",
+            "content_id": content_id,
+            "chunk_type": chunk_type,
+        },
+        generated_at=None,
+    )
+
 
-        # Try real generation for known_issues and recalls
-        if content_id in ["known_issues", "common_problems", "tsbs"]:
-            print(f"🔧 Generating real TSB/issues data from NHTSA...")
-            result = await real_generator.generate_tsb_chunk(
-                vehicle_key=vehicle_key, year=year, make=make, model=model
+def _start_generation(
+    vehicle_key: str,
+    content_id: str,
+    chunk_type: str,
+    template_type: str,
+    template_version: str,
+    stale_chunk_id: Optional[str] = None,
+) -> asyncio.Task:
+    """
+    Start (or join) the background generation for a missing chunk.
+    stale_chunk_id is a banned/rejected row to delete before regenerating.
+    """
+    key = (vehicle_key, content_id, chunk_type, template_version)
+    task = _inflight.get(key)
+    if task is not None:
+        logger.info("⏳ Generation already in progress for: %s", content_id)
+        return task
+
+    task = asyncio.create_task(
+        _generate_recording_failure(
+            "|".join(key),
+            _generate_and_save(
+                vehicle_key,
+                content_id,
+                chunk_type,
+                template_type,
+                template_version,
+                stale_chunk_id=stale_chunk_id,
+            ),
+        )
+    )
+    _inflight[key] = task
+
+    def _on_done(done: asyncio.Task) -> None:
+        if _inflight.get(key) is done:
+            del _inflight[key]
+        if done.cancelled():
+            return
+        error = done.exception()
+        if error is not None:
+            logger.error(
+                "❌ Background generation failed for %s", content_id, exc_info=error
             )
+        elif isinstance(done.result(), Response):
+            logger.error("❌ Background generation failed for %s", content_id)
 
-            if result["success"]:
-                # Generate content_text summary for search/indexing
-                content_text = f"Known Issues for {year} {make} {model}. Found {len(result['data'].get('known_issues', []))} common issues."
-
-                # Save to database
-                saved = await supabase_service.save_chunk(
-                    vehicle_key=vehicle_key,
-                    content_id=content_id,
-                    chunk_type=chunk_type,
-                    template_type=template_type,
-                    title=result["title"],
-                    data=result["data"],
-                    sources=result["sources"],
-                    verification_status=result["verification_status"],
-                    source_confidence=result["source_confidence"],
-                    qa_status="pending",
-                    content_text=content_text,
-                    template_version=template_version,
-                )
+    task.add_done_callback(_on_done)
+    return task
 
-                if saved:
-                    print(f"💾 Saved real chunk to database: {content_id}")
-                    return ChunkResponse(
-                        vehicle_key=vehicle_key,
-                        content_id=content_id,
-                        chunk_type=chunk_type,
-                        template_type=template_type,
-                        template_version=template_version,
-                        status="ready",
-                        verification_status=result["verification_status"],
-                        source_confidence=result["source_confidence"],
-                        qa_status="pending",
-                        verified_status="unverified",
-                        verified_at=None,
-                        promotion_count=0,
-                        sources=result["sources"],
-                        data=result["data"],
-                        generated_at=saved.created_at,
-                    )
-                else:
-                    from fastapi.responses import JSONResponse
-
-                    return JSONResponse(
-                        status_code=500,
-                        content={
-                            "status": "db_error",
-                            "message": "Failed to save TSB chunk to database",
-                        },
-                    )
-
-        elif content_id in ["recalls", "safety_recalls"]:
-            print(f"🔧 Generating real recall data from NHTSA...")
-            result = await real_generator.generate_recall_chunk(
-                vehicle_key=vehicle_key, year=year, make=make, model=model
-            )
 
-            if result["success"]:
-                # Generate content_text summary
-                content_text = f"Safety Recalls for {year} {make} {model}. Found {len(result['data'].get('recalls', []))} recalls."
-
-                # Save to database
-                saved = await supabase_service.save_chunk(
-                    vehicle_key=vehicle_key,
-                    content_id=content_id,
-                    chunk_type=chunk_type,
-                    template_type=template_type,
-                    title=result["title"],
-                    data=result["data"],
-                    sources=result["sources"],
-                    verification_status=result["verification_status"],
-                    source_confidence=result["source_confidence"],
-                    qa_status="pending",
-                    content_text=content_text,
-                    template_version=template_version,
-                )
+async def _generate_recording_failure(failure_key: str, generation):
+    """Await a generation; remember a failed one in chunk_failure_cache."""
+    try:
+        result = await generation
+    except Exception as e:
+        await chunk_failure_cache.set(
+            failure_key,
+            {"status": "error", "message": f"Real generation failed: {str(e)}"},
+        )
+        raise
+    if isinstance(result, Response):
+        await chunk_failure_cache.set(failure_key, json.loads(result.body))
+    return result
 
-                if saved:
-                    print(f"💾 Saved recall chunk to database: {content_id}")
-                    return ChunkResponse(
-                        vehicle_key=vehicle_key,
-                        content_id=content_id,
-                        chunk_type=chunk_type,
-                        template_type=template_type,
-                        template_version=template_version,
-                        status="ready",
-                        verification_status=result["verification_status"],
-                        source_confidence=result["source_confidence"],
-                        qa_status="pending",
-                        verified_status="unverified",
-                        verified_at=None,
-                        promotion_count=0,
-                        sources=result["sources"],
-                        data=result["data"],
-                        generated_at=saved.created_at,
-                    )
-                else:
-                    from fastapi.responses import JSONResponse
-
-                    return JSONResponse(
-                        status_code=500,
-                        content={
-                            "status": "db_error",
-                            "message": "Failed to save recall chunk to database",
-                        },
-                    )
-
-        elif content_id in ["diagnostic_flow", "diag_flow", "troubleshooting"]:
-            print(f"🔧 Generating diagnostic flow from multi-source...")
-            concern = "general diagnosis"
-            dtc_codes = []
-
-            result = await advanced_generator.generate_diagnostic_flow(
-                vehicle_key=vehicle_key,
-                year=year,
-                make=make,
-                model=model,
-                concern=concern,
-                dtc_codes=dtc_codes,
-            )
 
-            if result["success"]:
-                # Generate content_text
-                content_text = (
-                    f"Diagnostic Flow for {year} {make} {model}. Concern: {concern}."
-                )
+GeneratedResult = Optional[Tuple[Dict[str, Any], str]]
 
-                saved = await supabase_service.save_chunk(
-                    vehicle_key=vehicle_key,
-                    content_id=content_id,
-                    chunk_type=chunk_type,
-                    template_type=template_type,
-                    title=result["title"],
-                    data=result["data"],
-                    sources=result["sources"],
-                    verification_status=result["verification_status"],
-                    source_confidence=result["source_confidence"],
-                    qa_status="pending",
-                    content_text=content_text,
-                    template_version=template_version,
-                )
 
-                if saved:
-                    print(f"💾 Saved diagnostic flow: {content_id}")
-                    return ChunkResponse(
-                        vehicle_key=vehicle_key,
-                        content_id=content_id,
-                        chunk_type=chunk_type,
-                        template_type=template_type,
-                        template_version=template_version,
-                        status="ready",
-                        verification_status=result["verification_status"],
-                        source_confidence=result["source_confidence"],
-                        qa_status="pending",
-                        verified_status="unverified",
-                        verified_at=None,
-                        promotion_count=0,
-                        sources=result["sources"],
-                        data=result["data"],
-                        generated_at=saved.created_at,
-                    )
-                else:
-                    from fastapi.responses import JSONResponse
-
-                    return JSONResponse(
-                        status_code=500,
-                        content={
-                            "status": "db_error",
-                            "message": "Failed to save diagnostic flow to database",
-                        },
-                    )
-
-        elif "wiring" in content_id or "diagram" in content_id:
-            print(f"🔌 Generating wiring diagram...")
-            system = "electrical"
-            component = content_id.replace("wiring_", "").replace("_diagram", "")
-
-            result = await advanced_generator.generate_wiring_diagram(
-                vehicle_key=vehicle_key,
-                year=year,
-                make=make,
-                model=model,
-                system=system,
-                component=component,
-            )
+async def _generate_tsb(
+    vehicle_key: str, content_id: str, year: str, make: str, model: str
+) -> GeneratedResult:
+    """Known issues / TSBs from NHTSA. Returns (result, content_text) or None."""
+    logger.info("🔧 Generating real TSB/issues data from NHTSA...")
+    result = await real_generator.generate_tsb_chunk(
+        vehicle_key=vehicle_key, year=year, make=make, model=model
+    )
+    if not result["success"]:
+        return None
+    # Generate content_text summary for search/indexing
+    content_text = f"Known Issues for {year} {make} {model}. Found {len(result['data'].get('known_issues', []))} common issues."
+    return result, content_text
+
+
+async def _generate_recalls(
+    vehicle_key: str, content_id: str, year: str, make: str, model: str
+) -> GeneratedResult:
+    """Safety recalls from NHTSA. Returns (result, content_text) or None."""
+    logger.info("🔧 Generating real recall data from NHTSA...")
+    result = await real_generator.generate_recall_chunk(
+        vehicle_key=vehicle_key, year=year, make=make, model=model
+    )
+    if not result["success"]:
+        return None
+    content_text = f"Safety Recalls for {year} {make} {model}. Found {len(result['data'].get('recalls', []))} recalls."
+    return result, content_text
+
+
+async def _generate_diag_flow(
+    vehicle_key: str, content_id: str, year: str, make: str, model: str
+) -> GeneratedResult:
+    """Diagnostic flow from multi-source. Returns (result, content_text) or None."""
+    logger.info("🔧 Generating diagnostic flow from multi-source...")
+    concern = "general diagnosis"
+    result = await advanced_generator.generate_diagnostic_flow(
+        vehicle_key=vehicle_key,
+        year=year,
+        make=make,
+        model=model,
+        concern=concern,
+        dtc_codes=[],
+    )
+    if not result["success"]:
+        return None
+    content_text = f"Diagnostic Flow for {year} {make} {model}. Concern: {concern}."
+    return result, content_text
+
+
+async def _generate_wiring(
+    vehicle_key: str, content_id: str, year: str, make: str, model: str
+) -> GeneratedResult:
+    """Wiring diagram for the component named in content_id, or None."""
+    logger.info("🔌 Generating wiring diagram...")
+    component = content_id.replace("wiring_", "").replace("_diagram", "")
+    result = await advanced_generator.generate_wiring_diagram(
+        vehicle_key=vehicle_key,
+        year=year,
+        make=make,
+        model=model,
+        system="electrical",
+        component=component,
+    )
+    if not result["success"]:
+        return None
+    content_text = f"Wiring Diagram for {component} on {year} {make} {model}."
+    return result, content_text
 
-            if result["success"]:
-                # Generate content_text
-                content_text = (
-                    f"Wiring Diagram for {component} on {year} {make} {model}."
-                )
 
-                saved = await supabase_service.save_chunk(
-                    vehicle_key=vehicle_key,
-                    content_id=content_id,
-                    chunk_type=chunk_type,
-                    template_type=template_type,
-                    title=result["title"],
-                    data=result["data"],
-                    sources=result["sources"],
-                    verification_status=result["verification_status"],
-                    source_confidence=result["source_confidence"],
-                    qa_status="pending",
-                    content_text=content_text,
-                    template_version=template_version,
-                )
+def _is_wiring_id(content_id: str) -> bool:
+    return "wiring" in content_id or "diagram" in content_id
 
-                if saved:
-                    print(f"💾 Saved wiring diagram: {content_id}")
-                    return ChunkResponse(
-                        vehicle_key=vehicle_key,
-                        content_id=content_id,
-                        chunk_type=chunk_type,
-                        template_type=template_type,
-                        template_version=template_version,
-                        status="ready",
-                        verification_status=result["verification_status"],
-                        source_confidence=result["source_confidence"],
-                        qa_status="pending",
-                        verified_status="unverified",
-                        verified_at=None,
-                        promotion_count=0,
-                        sources=result["sources"],
-                        data=result["data"],
-                        generated_at=saved.created_at,
-                    )
-                else:
-                    from fastapi.responses import JSONResponse
-
-                    return JSONResponse(
-                        status_code=500,
-                        content={
-                            "status": "db_error",
-                            "message": "Failed to save wiring diagram to database",
-                        },
-                    )
 
-    # Fall back to REAL chunk generation using chunk_generator
-    print(f"🔧 Generating REAL chunk data using web scraping + AI for: {content_id}")
+# (content_id predicate, generator, label) - checked in order on a cache miss
+_SPECIALIZED_GENERATORS = (
+    (_TSB_IDS.__contains__, _generate_tsb, "TSB chunk"),
+    (_RECALL_IDS.__contains__, _generate_recalls, "recall chunk"),
+    (_DIAG_IDS.__contains__, _generate_diag_flow, "diagnostic flow"),
+    (_is_wiring_id, _generate_wiring, "wiring diagram"),
+)
 
-    # chunk_generator already imported at top
-    # Vehicle already imported at top
 
-    # Create Vehicle object
-    vehicle_obj = Vehicle(
-        year=year,
-        make=make,
-        model=model,
-        engine=parts[-1] if len(parts) > 3 else "unknown",
+async def _save_and_respond(
+    result: Dict[str, Any],
+    content_text: str,
+    label: str,
+    vehicle_key: str,
+    content_id: str,
+    chunk_type: str,
+    template_type: str,
+    template_version: str,
+):
+    """Save a specialized generator result and build the ready (or 500) response."""
+    saved = await supabase_service.save_chunk(
+        vehicle_key=vehicle_key,
+        content_id=content_id,
+        chunk_type=chunk_type,
+        template_type=template_type,
+        title=result["title"],
+        data=result["data"],
+        sources=result["sources"],
+        verification_status=result["verification_status"],
+        source_confidence=result["source_confidence"],
+        qa_status="pending",
+        content_text=content_text,
+        template_version=template_version,
+    )
+
+    if not saved:
+        return FastJSONResponse(
+            status_code=500,
+            content={
+                "status": "db_error",
+                "message": f"Failed to save {label} to database",
+            },
+        )
+
+    logger.info("💾 Saved %s: %s", label, content_id)
+    return _build_ready_response(
+        vehicle_key,
+        content_id,
+        chunk_type,
+        template_type,
+        template_version,
+        verification_status=result["verification_status"],
+        source_confidence=result["source_confidence"],
+        sources=result["sources"],
+        data=result["data"],
+        generated_at=saved.created_at,
+    )
+
+
+async def _generate_and_save(
+    vehicle_key: str,
+    content_id: str,
+    chunk_type: str,
+    template_type: str,
+    template_version: str,
+    stale_chunk_id: Optional[str] = None,
+):
+    """Cache-miss path of get_chunk: generate real data, save it, build the response."""
+    if stale_chunk_id:
+        # Delete the banned/rejected chunk
+        if await supabase_service.delete_chunk_by_id(stale_chunk_id):
+            logger.info("✅ Deleted banned/rejected chunk: %s", content_id)
+
+    # Parse vehicle info from vehicle_key (e.g., "2011_ford_f150_50lv8")
+    parsed = _parse_vehicle_key(vehicle_key)
+    year, make, model = parsed.year, parsed.display_make, parsed.display_model
+    logger.info("📋 Parsed: %s %s %s", year, make, model)
+
+    # PERF: Route specialized content_ids through the handler table; the first
+    # matching handler runs and a failed generation falls through to chunk_generator
+    for matches, generate, label in _SPECIALIZED_GENERATORS:
+        if matches(content_id):
+            generated = await generate(vehicle_key, content_id, year, make, model)
+            if generated:
+                result, content_text = generated
+                return await _save_and_respond(
+                    result,
+                    content_text,
+                    label,
+                    vehicle_key,
+                    content_id,
+                    chunk_type,
+                    template_type,
+                    template_version,
+                )
+            break
+
+    # Fall back to REAL chunk generation using chunk_generator
+    logger.info(
+        "🔧 Generating REAL chunk data using web scraping + AI for: %s", content_id
     )
 
+    vehicle_obj = parsed.to_display_vehicle()
+
     # Map content_id to concern/title
     concern = content_id.replace("_", " ")
     title = content_id.replace("_", " ").title()
 
     # Map chunk_type string to actual type
-    chunk_type_map = {
-        "spec": "fluid_capacity",
-        "procedure": "removal_steps",
-        "list": "known_issues",
-        "diagram": "wiring_diagram",
-        "torque_spec": "torque_spec",
-        "fluid_capacity": "fluid_capacity",
-        "removal_steps": "removal_steps",
-        "known_issues": "known_issues",
-        "part_location": "part_location",
-        "wiring_diagram": "wiring_diagram",
-        "diag_flow": "diag_flow",
-        "labor_time": "labor_time",
-        "tsb": "tsb",
-        "part_info": "part_info",
-    }
-
     # Smart mapping for generic 'spec' type
     if chunk_type == "spec" and "torque" in content_id:
         ct_string = "torque_spec"
     else:
-        ct_string = chunk_type_map.get(chunk_type, "known_issues")
+        ct_string = _CHUNK_TYPE_MAP.get(chunk_type, "known_issues")
 
     try:
         # Generate real chunk using web scraping + AI
@@ -540,24 +680,10 @@ async def get_chunk(
             template_version=template_version,
         )
 
-        print(f"✅ Generated real chunk (cost: ${cost:.4f})")
+        logger.info("✅ Generated real chunk (cost: $%.4f)", cost)
 
         # Map ServiceChunk verification_status to database verification_status
-        # ServiceChunk uses: unverified, pending_review, verified, auto_verified, community_verified, flagged
-        # DB ONLY accepts: pending_verification, auto_verified, rejected
-        verification_status_map = {
-            "unverified": "pending_verification",
-            "pending_review": "pending_verification",
-            "pending_verification": "pending_verification",
-            "verified": "auto_verified",
-            "auto_verified": "auto_verified",
-            "community_verified": "auto_verified",
-            "flagged": "pending_verification",
-            "rejected": "rejected",
-        }
-        db_verification_status = verification_status_map.get(
-            service_chunk.verification_status, "pending_verification"
-        )
+        db_verification_status = to_db_status(service_chunk.verification_status)
 
         # Convert ServiceChunk to database format
         # Use the structured data from the generator (contains spec_items for specs, html for procedures)
@@ -583,34 +709,26 @@ async def get_chunk(
         )
 
         if saved_chunk:
-            print(f"💾 Saved real chunk to database: {content_id}")
-            return ChunkResponse(
-                vehicle_key=vehicle_key,
-                content_id=content_id,
-                chunk_type=chunk_type,
-                template_type=template_type,
-                template_version=template_version,
-                status="ready",
+            logger.info("💾 Saved real chunk to database: %s", content_id)
+            return _build_ready_response(
+                vehicle_key,
+                content_id,
+                chunk_type,
+                template_type,
+                template_version,
                 verification_status=service_chunk.verification_status,
                 source_confidence=(
                     service_chunk.consensus_score
                     if service_chunk.consensus_score
                     else 0.75
                 ),
-                qa_status="pending",
-                verified_status="unverified",
-                verified_at=None,
-                promotion_count=0,
-                visibility="safe",
                 sources=[cite.url for cite in service_chunk.source_cites if cite.url]
                 or ["Generated content"],
                 data=chunk_data,
                 generated_at=saved_chunk.created_at,
             )
         else:
-            from fastapi.responses import JSONResponse
-
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=500,
                 content={
                     "status": "db_error",
@@ -619,14 +737,9 @@ async def get_chunk(
             )
 
     except Exception as e:
-        print(f"❌ Real generation failed: {e}")
-        import traceback
+        logger.exception("❌ Real generation failed: %s", e)
 
-        traceback.print_exc()
-
-        from fastapi.responses import JSONResponse
-
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"status": "error", "message": f"Real generation failed: {str(e)}"},
         )
@@ -669,27 +782,6 @@ def _generate_stub_data(content_id: str, chunk_type: str) -> Dict[str, Any]:
             "chunk_type": chunk_type,
         }
 
-    # Cache miss - generate new chunk
-    # For now, return placeholder to avoid blocking UI
-    # TODO: Trigger async generation + websocket notification
-
-    return ChunkResponse(
-        vehicle_key=vehicle_key,
-        content_id=content_id,
-        chunk_type=chunk_type,
-        template_type=template_type,
-        status="generating",
-        verification_status="pending",
-        source_confidence=0.0,
-        sources=[],
-        data={
-            "message": "Content is being generated. Check back in a few seconds.",
-            "content_id": content_id,
-            "chunk_type": chunk_type,
-        },
-        generated_at=None,
-    )
-
 
 class OnDemandRequest(BaseModel):
     vehicle_key: str
@@ -718,8 +810,16 @@ async def generate_on_demand(request: OnDemandRequest):
     # Normalize template_type immediately
     template_type = _normalize_template_type(vehicle_key, template_type)
 
+    # PERF: The limit check and the existence check are independent
+    # round-trips - run them concurrently
+    daily_count, existing = await asyncio.gather(
+        supabase_service.get_daily_generation_count(vehicle_key),
+        supabase_service.get_chunk(
+            vehicle_key=vehicle_key, content_id=content_id, chunk_type=chunk_type
+        ),
+    )
+
     # 1. Check Limits (10 per vehicle per day)
-    daily_count = await supabase_service.get_daily_generation_count(vehicle_key)
     if daily_count >= 10:
         raise HTTPException(
             status_code=429,
@@ -727,9 +827,6 @@ async def generate_on_demand(request: OnDemandRequest):
         )
 
     # 2. Check if exists
-    existing = await supabase_service.get_chunk(
-        vehicle_key=vehicle_key, content_id=content_id, chunk_type=chunk_type
-    )
 
     if existing:
         # If banned, return 404
@@ -754,20 +851,11 @@ async def generate_on_demand(request: OnDemandRequest):
         }
 
     # 3. Generate REAL content
-    print(f"⚡ Generating on-demand chunk (REAL): {content_id}")
+    logger.info("⚡ Generating on-demand chunk (REAL): %s", content_id)
 
     # Parse vehicle
     try:
-        parts = vehicle_key.split("_")
-        if len(parts) < 4:
-            raise ValueError("vehicle_key must have at least 4 parts")
-
-        year = parts[0]
-        make = parts[1]
-        model = "_".join(parts[2:-1]) if len(parts) > 4 else parts[2]
-        engine = parts[-1]
-
-        vehicle = Vehicle(year=year, make=make, model=model, engine=engine)
+        vehicle = _parse_vehicle_key(vehicle_key).to_vehicle()
     except Exception as e:
         raise HTTPException(
             status_code=400,
@@ -779,23 +867,7 @@ async def generate_on_demand(request: OnDemandRequest):
     context = content_id.replace("_", " ")
 
     # Map chunk_type string to actual type
-    chunk_type_map = {
-        "spec": "fluid_capacity",
-        "procedure": "removal_steps",
-        "list": "known_issues",
-        "diagram": "wiring_diagram",
-        "fluid_capacity": "fluid_capacity",
-        "torque_spec": "torque_spec",
-        "removal_steps": "removal_steps",
-        "known_issues": "known_issues",
-        "part_location": "part_location",
-        "wiring_diagram": "wiring_diagram",
-        "diag_flow": "diag_flow",
-        "labor_time": "labor_time",
-        "tsb": "tsb",
-        "part_info": "part_info",
-    }
-    ct = chunk_type_map.get(chunk_type, chunk_type)
+    ct = _CHUNK_TYPE_MAP.get(chunk_type, chunk_type)
 
     try:
         # Generate using chunk_generator
@@ -808,23 +880,10 @@ async def generate_on_demand(request: OnDemandRequest):
             template_version=template_version,
         )
 
-        print(f"✅ Generated real chunk (cost: ${cost:.4f})")
+        logger.info("✅ Generated real chunk (cost: $%.4f)", cost)
 
         # Map ServiceChunk verification_status to database verification_status
-        # DB ONLY accepts: pending_verification, auto_verified, rejected
-        verification_status_map = {
-            "unverified": "pending_verification",
-            "pending_review": "pending_verification",
-            "pending_verification": "pending_verification",
-            "verified": "auto_verified",
-            "auto_verified": "auto_verified",
-            "community_verified": "auto_verified",
-            "flagged": "pending_verification",
-            "rejected": "rejected",
-        }
-        db_verification_status = verification_status_map.get(
-            service_chunk.verification_status, "pending_verification"
-        )
+        db_verification_status = to_db_status(service_chunk.verification_status)
 
         # Save to database
         # Use mapped chunk type for DB (e.g. diagram -> wiring_diagram)
@@ -862,10 +921,7 @@ async def generate_on_demand(request: OnDemandRequest):
             )
 
     except Exception as e:
-        print(f"❌ Generation failed: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.exception("❌ Generation failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
 
 
@@ -905,22 +961,16 @@ async def generate_chunk_endpoint(
                     "chunk_id": existing.id,
                 }
             else:
-                print(
-                    f"⚠️ Template version mismatch for {content_id}: stored={stored_version}, requested={template_version}. Regenerating."
+                logger.warning(
+                    "⚠️ Template version mismatch for %s: stored=%s, requested=%s. Regenerating.",
+                    content_id,
+                    stored_version,
+                    template_version,
                 )
 
     # Parse vehicle
     try:
-        parts = vehicle_key.split("_")
-        if len(parts) < 4:
-            raise ValueError("vehicle_key must have at least 4 parts")
-
-        year = parts[0]
-        make = parts[1]
-        model = "_".join(parts[2:-1]) if len(parts) > 4 else parts[2]
-        engine = parts[-1]
-
-        vehicle = Vehicle(year=year, make=make, model=model, engine=engine)
+        vehicle = _parse_vehicle_key(vehicle_key).to_vehicle()
     except Exception as e:
         raise HTTPException(
             status_code=400,
@@ -932,26 +982,10 @@ async def generate_chunk_endpoint(
     context = content_id.replace("_", " ")
 
     # Map chunk_type string to actual type
-    chunk_type_map = {
-        "spec": "fluid_capacity",
-        "procedure": "removal_steps",
-        "list": "known_issues",
-        "diagram": "wiring_diagram",
-        "fluid_capacity": "fluid_capacity",
-        "torque_spec": "torque_spec",
-        "removal_steps": "removal_steps",
-        "known_issues": "known_issues",
-        "part_location": "part_location",
-        "wiring_diagram": "wiring_diagram",
-        "diag_flow": "diag_flow",
-        "labor_time": "labor_time",
-        "tsb": "tsb",
-        "part_info": "part_info",
-    }
-    ct = chunk_type_map.get(chunk_type, chunk_type)
+    ct = _CHUNK_TYPE_MAP.get(chunk_type, chunk_type)
 
     try:
-        print(f"🔧 Generating chunk: {content_id} ({chunk_type})")
+        logger.info("🔧 Generating chunk: %s (%s)", content_id, chunk_type)
 
         # Generate using chunk_generator
         service_chunk, cost = await chunk_generator.generate_chunk(
@@ -963,24 +997,10 @@ async def generate_chunk_endpoint(
             template_version=template_version,
         )
 
-        print(f"✅ Generated chunk (cost: ${cost:.4f})")
+        logger.info("✅ Generated chunk (cost: $%.4f)", cost)
 
         # Map ServiceChunk verification_status to database verification_status
-        # ServiceChunk uses: unverified, pending_review, verified, auto_verified, community_verified, flagged
-        # DB ONLY accepts: pending_verification, auto_verified, rejected
-        verification_status_map = {
-            "unverified": "pending_verification",
-            "pending_review": "pending_verification",
-            "pending_verification": "pending_verification",
-            "verified": "auto_verified",
-            "auto_verified": "auto_verified",
-            "community_verified": "auto_verified",
-            "flagged": "pending_verification",
-            "rejected": "rejected",
-        }
-        db_verification_status = verification_status_map.get(
-            service_chunk.verification_status, "pending_verification"
-        )
+        db_verification_status = to_db_status(service_chunk.verification_status)
 
         # Save to database
         # Use mapped chunk type for DB (e.g. diagram -> wiring_diagram)
@@ -1020,8 +1040,8 @@ async def generate_chunk_endpoint(
             }
         else:
             # Contamination or DB error - Return a "generating" status so UI retries instead of crashing
-            print(
-                f"⚠️ Chunk save failed (likely contamination). Returning 'generating' status to trigger retry."
+            logger.warning(
+                "⚠️ Chunk save failed (likely contamination). Returning 'generating' status to trigger retry.",
             )
             return {
                 "status": "success",  # Return success 200 OK to avoid UI crash
@@ -1038,30 +1058,48 @@ async def generate_chunk_endpoint(
             }
 
     except Exception as e:
-        print(f"❌ Generation failed: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.exception("❌ Generation failed: %s", e)
         # Return error instead of raising
         return {"status": "error", "message": f"Generation failed: {str(e)}"}
 
 
+# Vehicle-key keywords -> template_type, highest priority first
+_TEMPLATE_KEYWORDS = (
+    ("ICE_DIESEL", ("powerstroke", "diesel")),
+    ("HYBRID", ("powerboost", "hybrid")),
+    ("EV", ("lightning", "mach-e", "ev")),
+    ("ICE_GASOLINE", ("coyote", "5.0l", "ecoboost", "v8", "v6")),
+)
+_TEMPLATE_KEYWORD_PRIORITY = MappingProxyType(
+    {
+        keyword: priority
+        for priority, (_, keywords) in enumerate(_TEMPLATE_KEYWORDS)
+        for keyword in keywords
+    }
+)
+# Lookahead so overlapping keywords are all seen ("hybridiesel" still hits diesel)
+_TEMPLATE_KEYWORD_RE = re.compile(
+    "(?=(%s))" % "|".join(re.escape(k) for k in _TEMPLATE_KEYWORD_PRIORITY)
+)
+
+
+@lru_cache(maxsize=4096)
 def _normalize_template_type(vehicle_key: str, template_type: str) -> str:
     """
     Force template_type to valid enum values based on vehicle key.
     Fixes constraint violation: "chunks_template_type_check"
     """
-    vk = vehicle_key.lower()
-
     # 1. Detect from vehicle key
-    if "powerstroke" in vk or "diesel" in vk:
-        return "ICE_DIESEL"
-    if "powerboost" in vk or "hybrid" in vk:
-        return "HYBRID"
-    if "lightning" in vk or "mach-e" in vk or "ev" in vk:
-        return "EV"
-    if "coyote" in vk or "5.0l" in vk or "ecoboost" in vk or "v8" in vk or "v6" in vk:
-        return "ICE_GASOLINE"
+    # PERF: One scan over the key; the best-priority keyword wins as before
+    best = None
+    for match in _TEMPLATE_KEYWORD_RE.finditer(vehicle_key.lower()):
+        priority = _TEMPLATE_KEYWORD_PRIORITY[match.group(1)]
+        if best is None or priority < best:
+            best = priority
+            if best == 0:
+                break
+    if best is not None:
+        return _TEMPLATE_KEYWORDS[best][0]
 
     # 2. Fallback: If template_type is already valid, return it upper
     tt_upper = template_type.upper()
@@ -1093,16 +1131,7 @@ async def generate_leaf_endpoint(request: LeafGenerationRequest):
 
     # Parse vehicle
     try:
-        parts = vehicle_key.split("_")
-        if len(parts) < 4:
-            raise ValueError("vehicle_key must have at least 4 parts")
-
-        vehicle = Vehicle(
-            year=parts[0],
-            make=parts[1],
-            model="_".join(parts[2:-1]) if len(parts) > 4 else parts[2],
-            engine=parts[-1],
-        )
+        vehicle = _parse_vehicle_key(vehicle_key).to_vehicle()
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid vehicle_key: {e}")
 
@@ -1113,16 +1142,21 @@ async def generate_leaf_endpoint(request: LeafGenerationRequest):
     final_response = []
     chunks_to_generate = []
 
+    # PERF: One query for every chunk in the leaf instead of one get_chunk each
+    existing_chunks = await supabase_service.get_chunks_bulk(
+        vehicle_key, [f"{leaf_id}_{chunk_def.get('type')}" for chunk_def in chunks_def]
+    )
+
     for chunk_def in chunks_def:
         chunk_type = chunk_def.get("type")
         # Map chunk type for DB (diagram -> wiring_diagram)
         db_chunk_type = "wiring_diagram" if chunk_type == "diagram" else chunk_type
         content_id = f"{leaf_id}_{chunk_type}"
 
-        existing = await supabase_service.get_chunk(
-            vehicle_key=vehicle_key, content_id=content_id, chunk_type=db_chunk_type
-        )
+        existing = existing_chunks.get((content_id, db_chunk_type))
 
+        # verified_status (not verification_status) carries the "banned" marker
+        # written for contaminated chunks
         if existing and existing.verified_status != "banned":
             # Add to response
             final_response.append(
@@ -1144,30 +1178,15 @@ async def generate_leaf_endpoint(request: LeafGenerationRequest):
         return {"status": "success", "chunks": final_response}
 
     # Generate missing chunks
-    print(f"⚡ Generating {len(chunks_to_generate)} missing chunks for leaf {leaf_id}")
+    logger.info(
+        "⚡ Generating %s missing chunks for leaf %s", len(chunks_to_generate), leaf_id
+    )
 
     # Map chunk types in definition to actual generator types
     mapped_chunks_to_generate = []
-    chunk_type_map = {
-        "spec": "fluid_capacity",
-        "procedure": "removal_steps",
-        "list": "known_issues",
-        "diagram": "wiring_diagram",
-        "fluid_capacity": "fluid_capacity",
-        "torque_spec": "torque_spec",
-        "removal_steps": "removal_steps",
-        "known_issues": "known_issues",
-        "part_location": "part_location",
-        "wiring_diagram": "wiring_diagram",
-        "diag_flow": "diag_flow",
-        "labor_time": "labor_time",
-        "tsb": "tsb",
-        "part_info": "part_info",
-    }
-
     for c in chunks_to_generate:
         orig_type = c.get("type")
-        mapped_type = chunk_type_map.get(orig_type, orig_type)
+        mapped_type = _CHUNK_TYPE_MAP.get(orig_type, orig_type)
         mapped_chunks_to_generate.append(
             {
                 "type": mapped_type,
@@ -1187,13 +1206,14 @@ async def generate_leaf_endpoint(request: LeafGenerationRequest):
     # Save results
     results = bundle_result["results"]
 
+    # PERF: Successful chunks are saved with one multi-row upsert
+    to_save = []
+    save_slots = []
+
     for i, c in enumerate(chunks_to_generate):
         orig_type = c.get("type")
         mapped_type = mapped_chunks_to_generate[i]["type"]
-        content_id = f"{leaf_id}_{mapped_type}"  # Generator uses mapped type in ID?
-        # Wait, generator returns results keyed by content_id constructed inside it.
         # Inside generate_leaf_bundle: content_id = f"{leaf_id}_{chunk_type}" where chunk_type is from chunks_def (mapped_type)
-
         gen_content_id = f"{leaf_id}_{mapped_type}"
         res = results.get(gen_content_id)
 
@@ -1201,71 +1221,37 @@ async def generate_leaf_endpoint(request: LeafGenerationRequest):
             chunk = res["chunk"]
 
             # Map verification status
-            # DB ONLY accepts: pending_verification, auto_verified, rejected
-            verification_status_map = {
-                "unverified": "pending_verification",
-                "pending_review": "pending_verification",
-                "pending_verification": "pending_verification",
-                "verified": "auto_verified",
-                "auto_verified": "auto_verified",
-                "community_verified": "auto_verified",
-                "flagged": "pending_verification",
-                "rejected": "rejected",
-            }
-            db_verification_status = verification_status_map.get(
-                chunk.verification_status, "pending_verification"
-            )
+            db_verification_status = to_db_status(chunk.verification_status)
 
             # Save
             db_chunk_type = "wiring_diagram" if orig_type == "diagram" else orig_type
-            final_content_id = (
-                f"{leaf_id}_{orig_type}"  # Use original type for ID consistency?
-            )
-            # Actually, let's stick to the mapped type for ID to avoid confusion,
-            # BUT the frontend expects ID based on template type.
+            # The frontend expects ID based on template type.
             # If template says "diagram", ID is "..._diagram".
             # If we save as "..._wiring_diagram", frontend won't find it.
             # So we must save with content_id = f"{leaf_id}_{orig_type}"
+            final_content_id = f"{leaf_id}_{orig_type}"
 
-            saved = await supabase_service.save_chunk(
-                vehicle_key=vehicle_key,
-                content_id=final_content_id,
-                chunk_type=db_chunk_type,
-                template_type=template_type,
-                title=chunk.title,
-                data=chunk.data,
-                sources=[cite.url for cite in chunk.source_cites if cite.url]
-                or ["Generated content"],
-                verification_status=db_verification_status,
-                source_confidence=(
-                    chunk.consensus_score if chunk.consensus_score else 0.75
-                ),
-                qa_status="pending",
-                content_text=chunk.content_text,
-                template_version=template_version,
+            save_slots.append((len(final_response), final_content_id, orig_type))
+            final_response.append(None)  # Filled in after the bulk save
+            to_save.append(
+                {
+                    "vehicle_key": vehicle_key,
+                    "content_id": final_content_id,
+                    "chunk_type": db_chunk_type,
+                    "template_type": template_type,
+                    "title": chunk.title,
+                    "data": chunk.data,
+                    "sources": [cite.url for cite in chunk.source_cites if cite.url]
+                    or ["Generated content"],
+                    "verification_status": db_verification_status,
+                    "source_confidence": (
+                        chunk.consensus_score if chunk.consensus_score else 0.75
+                    ),
+                    "qa_status": "pending",
+                    "content_text": chunk.content_text,
+                    "template_version": template_version,
+                }
             )
-
-            if saved:
-                final_response.append(
-                    {
-                        "content_id": final_content_id,
-                        "chunk_type": orig_type,
-                        "status": "ready",
-                        "data": saved.data,
-                        "content_text": saved.content_text,
-                        "verification_status": saved.verification_status,
-                        "source_confidence": saved.source_confidence,
-                        "sources": saved.sources,
-                    }
-                )
-            else:
-                final_response.append(
-                    {
-                        "content_id": final_content_id,
-                        "status": "error",
-                        "error": "DB Save Failed",
-                    }
-                )
         else:
             final_response.append(
                 {
@@ -1275,4 +1261,25 @@ async def generate_leaf_endpoint(request: LeafGenerationRequest):
                 }
             )
 
+    saved_chunks = await supabase_service.save_chunks_bulk(to_save) if to_save else []
+
+    for (index, final_content_id, orig_type), saved in zip(save_slots, saved_chunks):
+        if saved:
+            final_response[index] = {
+                "content_id": final_content_id,
+                "chunk_type": orig_type,
+                "status": "ready",
+                "data": saved.data,
+                "content_text": saved.content_text,
+                "verification_status": saved.verification_status,
+                "source_confidence": saved.source_confidence,
+                "sources": saved.sources,
+            }
+        else:
+            final_response[index] = {
+                "content_id": final_content_id,
+                "status": "error",
+                "error": "DB Save Failed",
+            }
+
     return {"status": "success", "chunks": final_response}
@@ -1,26 +1,103 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from models.generation import GenerateChunksRequest, GenerateChunksResponse
 from models.vehicle import Vehicle, VehicleConcern
+from models.verification import to_db_status
 from services.chunk_generator import chunk_generator
 from services.supabase_client import supabase_service
 from services.document_assembler import document_assembler
 from services.vehicle_validator import vehicle_validator
-from services.performance import BatchDBWriter, parallel_generate_with_semaphore
+from services.performance import (
+    BatchDBWriter,
+    FastJSONResponse,
+    chunk_semaphore,
+)
 import asyncio
+import logging
 import time
 import re
+from typing import Dict, List, NamedTuple, Tuple
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
+logger = logging.getLogger(__name__)
 
+# PERF: Compiled once; content_id is sanitized for every generated chunk
+_CONTENT_ID_SANITIZER = re.compile(r"[^a-z0-9_]")
 
-@router.post("/generate-chunks", response_model=GenerateChunksResponse)
-async def generate_chunks(request: GenerateChunksRequest):
+# Relevant chunks already in the DB needed to skip generation entirely
+_FAST_PATH_MIN_CHUNKS = 3
+
+# Slow-path chunk generations in progress across requests, keyed by
+# (vehicle_key, chunk_type, normalized title)
+_inflight_generations: Dict[Tuple[str, str, str], asyncio.Task] = {}
+
+# Common words ignored when scoring a chunk's relevance to the concern
+_STOP_WORDS = frozenset(
+    {
+        "the",
+        "and",
+        "for",
+        "with",
+        "check",
+        "vehicle",
+        "issue",
+        "problem",
+    }
+)
+
+
+def _normalize_title(title: str) -> str:
+    """Case- and whitespace-insensitive form of a chunk title."""
+    return " ".join(title.split()).lower()
+
+
+def _shared_generation(
+    vehicle: Vehicle, chunk_type: str, title: str, concern: str, dtc_codes: List[str]
+) -> Tuple[asyncio.Task, bool]:
     """
-    The core endpoint: determine needed chunks, fetch existing, generate missing, compile document.
-    ANTI-HALLUCINATION: Validates vehicle config BEFORE generation.
+    Task generating this chunk, and whether this call started it.
+    Concurrent requests needing the same chunk share one generation.
     """
-    start_time = time.time()
+    key = (vehicle.key, chunk_type, _normalize_title(title))
+    task = _inflight_generations.get(key)
+    if task is not None:
+        return task, False
+
+    async def run():
+        # chunk_semaphore, not llm_semaphore: generate_chunk acquires that one itself
+        async with chunk_semaphore:
+            return await chunk_generator.generate_chunk(
+                vehicle, chunk_type, title, concern, dtc_codes
+            )
+
+    task = asyncio.ensure_future(run())
+    _inflight_generations[key] = task
+
+    def _done(t: asyncio.Task) -> None:
+        _inflight_generations.pop(key, None)
+        # Retrieve failures in case every waiting request has gone away
+        t.cancelled() or t.exception()
+
+    task.add_done_callback(_done)
+    return task, True
+
 
+class ChunkSelection(NamedTuple):
+    """Chunks chosen for a concern, before they are compiled into a document."""
+
+    vehicle: Vehicle
+    primary: list
+    related: list
+    chunks_found: int
+    chunks_generated: int
+    total_cost: float
+
+
+async def _select_chunks(request: GenerateChunksRequest) -> ChunkSelection:
+    """
+    Determine needed chunks, fetch existing, generate missing.
+    ANTI-HALLUCINATION: Validates vehicle config BEFORE generation.
+    """
     # Build vehicle and concern objects
     vehicle = Vehicle(
         year=request.year, make=request.make, model=request.model, engine=request.engine
@@ -46,76 +123,86 @@ async def generate_chunks(request: GenerateChunksRequest):
     )
 
     # Helper: Simple relevance scorer for Fast Path
-    def is_relevant(chunk, concern_text, dtc_codes):
-        text = (chunk.title + " " + chunk.content_text).lower()
-        concern_tokens = set(concern_text.lower().split())
-        # Remove common stop words
-        stop_words = {
-            "the",
-            "and",
-            "for",
-            "with",
-            "check",
-            "vehicle",
-            "issue",
-            "problem",
-        }
-        concern_tokens = concern_tokens - stop_words
+    def is_relevant(chunk, concern_tokens, dtc_codes_upper, dtc_codes):
+        raw = f"{chunk.title} {chunk.content_text}"
 
         # Check for DTC match
-        if dtc_codes:
-            for code in dtc_codes:
-                if code.lower() in text:
-                    return True
+        # PERF: Codes are almost always written uppercase (P0420), so try the raw
+        # text first and skip the lowercase copy whenever that already matches
+        if any(code in raw for code in dtc_codes_upper):
+            return True
+
+        text = raw.lower()
+        if any(code in text for code in dtc_codes):
+            return True
 
         # Check for keyword overlap
+        # PERF: Stop scanning as soon as 2 strong keywords have matched
         matches = 0
         for token in concern_tokens:
             if token in text:
                 matches += 1
+                if matches >= 2:
+                    return True
 
-        # If > 30% of concern words match, or at least 2 strong keywords
-        return matches >= 2 or (
-            len(concern_tokens) > 0 and matches / len(concern_tokens) > 0.3
+        # Otherwise relevant if > 30% of concern words match
+        return len(concern_tokens) > 0 and matches / len(concern_tokens) > 0.3
+
+    # PERF: Tokenize the concern once, not once per existing chunk
+    concern_tokens = set(request.concern.lower().split()) - _STOP_WORDS
+    dtc_codes_upper = [code.upper() for code in (request.dtc_codes or [])]
+    dtc_codes = [code.lower() for code in dtc_codes_upper]
+
+    # PERF: Ask the LLM for the needed chunks while the DB lookup runs; the two
+    # are independent, so the slow path no longer pays for them back to back.
+    # A fast-path hit only stops waiting: the shielded LLM call still finishes
+    # and fills the needed-chunks cache for the next miss on this concern.
+    needed_task = asyncio.ensure_future(chunk_generator.identify_needed_chunks(concern))
+    # Retrieve failures so a dropped task is not logged as an error
+    needed_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    # FAST PATH: Check if we have ANY chunks for this vehicle already,
+    # filtered for relevance to current concern
+    # PERF: Postgres scores relevance against the full-text index (migration 006)
+    scored = await supabase_service.get_relevant_chunks(
+        vehicle.key, sorted(concern_tokens), dtc_codes_upper
+    )
+    if scored is not None:
+        primary_chunks, related_chunks = scored
+        all_existing_chunks = primary_chunks + related_chunks
+    else:
+        all_existing_chunks = await supabase_service.get_chunks_for_vehicle(
+            vehicle.key
         )
-
-    # FAST PATH: Check if we have ANY chunks for this vehicle already
-    all_existing_chunks = await supabase_service.get_chunks_for_vehicle(vehicle.key)
-
-    # Filter for relevance to current concern
-    primary_chunks = []
-    related_chunks = []
-
-    if all_existing_chunks:
-        for chunk in all_existing_chunks:
-            if is_relevant(chunk, request.concern, request.dtc_codes):
-                primary_chunks.append(chunk)
-            else:
-                related_chunks.append(chunk)
+        primary_chunks = []
+        related_chunks = []
+
+        # PERF: Only score when the fast path is reachable - too few chunks, or
+        # nothing to match them against, always ends on the slow path
+        if len(all_existing_chunks) >= _FAST_PATH_MIN_CHUNKS and (
+            concern_tokens or dtc_codes
+        ):
+            for chunk in all_existing_chunks:
+                if is_relevant(chunk, concern_tokens, dtc_codes_upper, dtc_codes):
+                    primary_chunks.append(chunk)
+                else:
+                    related_chunks.append(chunk)
 
     # If we have enough RELEVANT chunks, use them (Cache Hit)
-    if len(primary_chunks) >= 3:
-        compiled_doc = document_assembler.compile_diagnostic_document(
-            vehicle=vehicle, chunks=primary_chunks, concern=request.concern
-        )
-
-        latency = time.time() - start_time
-
-        return GenerateChunksResponse(
-            vehicle_key=vehicle.key,
-            concern=request.concern,
+    if len(primary_chunks) >= _FAST_PATH_MIN_CHUNKS:
+        needed_task.cancel()
+        return ChunkSelection(
+            vehicle=vehicle,
+            primary=primary_chunks,
+            related=related_chunks,
             chunks_found=len(primary_chunks),
             chunks_generated=0,
-            chunks=[c.model_dump() for c in primary_chunks],
-            related_chunks=[c.model_dump() for c in related_chunks],
-            compiled_html=compiled_doc,
             total_cost=0.0,
-            generation_time_seconds=latency,
         )
 
     # SLOW PATH: Need to identify and possibly generate chunks
     # Step 1: Identify needed chunks (Grok-4-Fast decides)
-    needed_chunks = await chunk_generator.identify_needed_chunks(concern)
+    needed_chunks = await needed_task
 
     if not needed_chunks:
         raise HTTPException(
@@ -130,7 +217,13 @@ async def generate_chunks(request: GenerateChunksRequest):
     chunks_to_generate = []
     total_cost = 0.0
 
+    # PERF: The LLM can repeat a chunk (or only vary its title's case/spacing);
+    # generate each one once
+    unique_needed = {}
     for chunk_type, title in needed_chunks:
+        unique_needed.setdefault((chunk_type, _normalize_title(title)), title)
+
+    for (chunk_type, _), title in unique_needed.items():
         if (chunk_type, title) in existing_map:
             final_primary_chunks.append(existing_map[(chunk_type, title)])
         else:
@@ -138,32 +231,37 @@ async def generate_chunks(request: GenerateChunksRequest):
 
     # Step 3: Generate missing chunks in parallel (with semaphore limiting)
     if chunks_to_generate:
-        generation_tasks = [
-            chunk_generator.generate_chunk(
+        # PERF: Chunks another request is already generating are awaited, not
+        # dispatched again; that request also saves them
+        generations = [
+            _shared_generation(
                 vehicle, chunk_type, title, request.concern, request.dtc_codes or []
             )
             for chunk_type, title in chunks_to_generate
         ]
-
-        # PERF: Use parallel_generate_with_semaphore for rate limiting
-        results = await parallel_generate_with_semaphore(generation_tasks)
+        results = await asyncio.gather(
+            *[asyncio.shield(task) for task, _ in generations], return_exceptions=True
+        )
 
         # PERF: Batch collect all chunks for single DB write
         batch_writer = BatchDBWriter()
         generated_chunks = []
 
-        for result in results:
+        for (_, owned), result in zip(generations, results):
             # Handle exceptions from gather
             if isinstance(result, Exception):
-                print(f"❌ Chunk generation failed: {result}")
+                logger.error("❌ Chunk generation failed: %s", result)
                 continue
 
             chunk, cost = result
+            if not owned:
+                generated_chunks.append(chunk)
+                continue
             total_cost += cost
 
             # Generate content_id from title
-            content_id = re.sub(
-                r"[^a-z0-9_]", "", chunk.title.lower().replace(" ", "_")
+            content_id = _CONTENT_ID_SANITIZER.sub(
+                "", chunk.title.lower().replace(" ", "_")
             )
 
             # Extract sources
@@ -178,21 +276,7 @@ async def generate_chunks(request: GenerateChunksRequest):
             }
 
             # Map verification_status to valid DB values
-            # DB ONLY accepts: pending_verification, auto_verified, rejected
-            status_map = {
-                "unverified": "pending_verification",
-                "pending_review": "pending_verification",
-                "pending_verification": "pending_verification",
-                "verified": "auto_verified",
-                "auto_verified": "auto_verified",
-                "community_verified": "auto_verified",
-                "flagged": "pending_verification",  # Flagged items need review
-                "generated": "pending_verification",
-                "rejected": "rejected",
-            }
-            db_verification_status = status_map.get(
-                chunk.verification_status, "pending_verification"
-            )
+            db_verification_status = to_db_status(chunk.verification_status)
 
             # PERF: Add to batch instead of individual save
             chunk_data = {
@@ -213,7 +297,7 @@ async def generate_chunks(request: GenerateChunksRequest):
 
         # PERF: Single bulk DB write instead of N individual writes
         saved_records = await batch_writer.flush(supabase_service)
-        print(f"⚡ Batch saved {len(saved_records)} chunks")
+        logger.info("⚡ Batch saved %s chunks", len(saved_records))
 
         # Add generated chunks to final list
         for chunk in generated_chunks:
@@ -221,33 +305,72 @@ async def generate_chunks(request: GenerateChunksRequest):
             all_existing_chunks.append(chunk)
 
     # Recalculate related chunks (everything not in final_primary)
-    primary_ids = {
-        c.id for c in final_primary_chunks if c.id
-    }  # Generated chunks might not have ID yet if not re-fetched?
-    # Actually save_chunk returns the chunk with ID.
-    # But wait, existing chunks from DB have IDs.
-
-    # Simple set difference based on object identity or ID
-    # Let's just use the lists.
-    final_related_chunks = [
-        c for c in all_existing_chunks if c not in final_primary_chunks
-    ]
+    # PERF: Every primary chunk is the same object that sits in all_existing_chunks
+    # (fetched or just generated), so an identity set replaces the O(N·M) list scan
+    # that compared each pair field-by-field through pydantic's __eq__.
+    primary_ids = {id(c) for c in final_primary_chunks}
+    final_related_chunks = [c for c in all_existing_chunks if id(c) not in primary_ids]
+
+    return ChunkSelection(
+        vehicle=vehicle,
+        primary=final_primary_chunks,
+        related=final_related_chunks,
+        chunks_found=len(final_primary_chunks) - len(chunks_to_generate),
+        chunks_generated=len(chunks_to_generate),
+        total_cost=round(total_cost, 6),
+    )
+
+
+@router.post("/generate-chunks", response_model=GenerateChunksResponse)
+async def generate_chunks(request: GenerateChunksRequest):
+    """
+    The core endpoint: determine needed chunks, fetch existing, generate missing, compile document.
+    ANTI-HALLUCINATION: Validates vehicle config BEFORE generation.
+    """
+    start_time = time.time()
+    selection = await _select_chunks(request)
 
     # Step 4: Compile chunks into beautiful document
-    compiled_html = document_assembler.compile_diagnostic_document(
-        vehicle=vehicle, concern=request.concern, chunks=final_primary_chunks
+    # PERF: CPU-bound HTML assembly runs off the event loop
+    compiled_html = await asyncio.to_thread(
+        document_assembler.compile_diagnostic_document,
+        vehicle=selection.vehicle,
+        concern=request.concern,
+        chunks=selection.primary,
     )
 
     generation_time = time.time() - start_time
 
-    return GenerateChunksResponse(
-        vehicle_key=vehicle.key,
-        concern=request.concern,
-        chunks_found=len(final_primary_chunks) - len(chunks_to_generate),
-        chunks_generated=len(chunks_to_generate),
-        chunks=[chunk.model_dump() for chunk in final_primary_chunks],
-        related_chunks=[chunk.model_dump() for chunk in final_related_chunks],
-        compiled_html=compiled_html,
-        total_cost=round(total_cost, 6),
-        generation_time_seconds=round(generation_time, 2),
+    # PERF: Chunks are dumped once here and encoded straight to JSON;
+    # returning the Response skips FastAPI re-dumping and re-validating
+    # every chunk dict against response_model.
+    return FastJSONResponse(
+        GenerateChunksResponse.model_construct(
+            vehicle_key=selection.vehicle.key,
+            concern=request.concern,
+            chunks_found=selection.chunks_found,
+            chunks_generated=selection.chunks_generated,
+            chunks=[chunk.model_dump() for chunk in selection.primary],
+            related_chunks=[chunk.model_dump() for chunk in selection.related],
+            compiled_html=compiled_html,
+            total_cost=selection.total_cost,
+            generation_time_seconds=round(generation_time, 2),
+        )
+    )
+
+
+@router.post("/generate-chunks/stream")
+async def generate_chunks_document_stream(request: GenerateChunksRequest):
+    """
+    Same chunk selection as /generate-chunks, but returns only the compiled
+    document, streamed section by section as text/html.
+    PERF: the first bytes go out as soon as the header renders instead of
+    after the whole document has been assembled.
+    """
+    selection = await _select_chunks(request)
+    return StreamingResponse(
+        document_assembler.iter_diagnostic_document(
+            vehicle=selection.vehicle, concern=request.concern, chunks=selection.primary
+        ),
+        media_type="text/html",
     )
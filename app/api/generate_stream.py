@@ -4,8 +4,7 @@ Provides Server-Sent Events (SSE) for real-time generation progress.
 Allows UI to show first chunks immediately while rest are generating.
 """
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
 from models.generation import GenerateChunksRequest
 from models.vehicle import Vehicle, VehicleConcern
 from services.chunk_generator import chunk_generator
@@ -15,16 +14,139 @@ from services.vehicle_validator import vehicle_validator
 from services.performance import (
     BatchDBWriter,
     ProgressTracker,
-    parallel_generate_with_semaphore,
+    chunk_semaphore,
+    sse_response,
 )
+from pydantic import BaseModel
+from pydantic_core import to_json
+from functools import lru_cache
+from typing import Optional
 import asyncio
-import json
 import time
 import re
 
 router = APIRouter()
 
 
+# PERF: SSE frames are built from prebuilt byte prefixes, so each event is
+# one bytes concatenation with no f-string or later UTF-8 encode in Starlette
+_EV_STATUS = b"event: status\ndata: "
+_EV_PROGRESS = b"event: progress\ndata: "
+_EV_CHUNK = b"event: chunk\ndata: "
+_EV_CHUNK_ERROR = b"event: chunk_error\ndata: "
+_EV_CACHE_HIT = b"event: cache_hit\ndata: "
+_EV_COMPILED_HTML = b"event: compiled_html\ndata: "
+_EV_COMPLETE = b"event: complete\ndata: "
+_EV_ERROR = b"event: error\ndata: "
+_EV_END = b"\n\n"
+
+# Chunk fields sent in "chunk" events; the full chunk (content_text, sources,
+# data...) isn't needed to render the preview and often dominates the bytes
+_CHUNK_PREVIEW_FIELDS = (
+    "title",
+    "chunk_type",
+    "content_html",
+    "verified",
+    "consensus_score",
+    "consensus_badge",
+    "tags",
+)
+_CHUNK_PREVIEW_INCLUDE = frozenset(_CHUNK_PREVIEW_FIELDS)
+
+# PERF: Compiled once; content_id is sanitized for every generated chunk
+_CONTENT_ID_SANITIZER = re.compile(r"[^a-z0-9_]")
+
+# Generated chunks saved per background batch while the rest still generate
+_FLUSH_THRESHOLD = 3
+
+# Relevance scoring: words are compared as whole alphanumeric tokens
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset(
+    {
+        "the",
+        "and",
+        "for",
+        "with",
+        "check",
+        "vehicle",
+        "issue",
+        "problem",
+    }
+)
+
+
+def _sse(event_prefix: bytes, payload) -> bytes:
+    """
+    Build one SSE frame; the payload is serialized with pydantic-core's Rust
+    encoder (chunk events carry full content_html; datetimes handled natively).
+    """
+    return event_prefix + to_json(payload) + _EV_END
+
+
+def _chunk_frame(chunk) -> bytes:
+    """
+    SSE chunk event carrying only the fields the streaming preview renders.
+    PERF: pydantic chunks go straight to to_json (no intermediate dict);
+    DB ChunkRecords are plain objects and still need their model_dump().
+    """
+    if isinstance(chunk, BaseModel):
+        body = to_json(chunk, include=_CHUNK_PREVIEW_INCLUDE)
+    else:
+        dumped = chunk.model_dump()
+        body = to_json({field: dumped[field] for field in _CHUNK_PREVIEW_FIELDS})
+    return _EV_CHUNK + body + _EV_END
+
+
+def _html_frame(html: str) -> bytes:
+    """
+    SSE compiled_html event carrying the document as raw multi-line data.
+    PERF: The largest payload of the stream skips JSON escaping entirely;
+    clients rejoin the data lines with "\n" per the SSE spec.
+    """
+    body = html.replace("\r\n", "\n").replace("\r", "\n").encode()
+    return _EV_COMPILED_HTML + body.replace(b"\n", b"\ndata: ") + _EV_END
+
+
+def _chunk_row(chunk) -> dict:
+    """
+    chunks table row for a freshly generated chunk.
+    Built as one dict display per chunk: BatchDBWriter holds the rows until
+    its next flush, so a shared, mutated template dict can't be reused here.
+    """
+    return {
+        "vehicle_key": chunk.vehicle_key,
+        "content_id": _CONTENT_ID_SANITIZER.sub(
+            "", chunk.title.lower().replace(" ", "_")
+        ),
+        "chunk_type": chunk.chunk_type,
+        "template_type": "ICE_GASOLINE",
+        "title": chunk.title,
+        "data": {
+            "content_html": chunk.content_html,
+            "consensus_score": chunk.consensus_score,
+            "consensus_badge": chunk.consensus_badge,
+            "tags": chunk.tags,
+        },
+        "sources": [s.description for s in chunk.source_cites],
+        "verification_status": chunk.verification_status,
+        "source_confidence": chunk.consensus_score or 0.0,
+        "content_text": chunk.content_text,
+        "qa_status": "pending",
+    }
+
+
+@lru_cache(maxsize=4096)
+def _tokens_for(chunk_id, title: str, content_text: Optional[str]) -> frozenset:
+    """
+    Lowercased word tokens of a chunk's title and content.
+    The same vehicle's chunks are scored again on every request and for every
+    concern, so the lowercasing/tokenizing is done once per chunk version.
+    """
+    tokens = set(_TOKEN_RE.findall(title.lower()))
+    tokens.update(_TOKEN_RE.findall((content_text or "").lower()))
+    return frozenset(tokens)
+
+
 async def stream_generation(request: GenerateChunksRequest):
     """
     Generator function that yields SSE events as chunks are generated.
@@ -43,7 +165,7 @@ async def stream_generation(request: GenerateChunksRequest):
     # Validate vehicle
     is_valid, error_msg = vehicle_validator.is_valid(vehicle)
     if not is_valid:
-        yield f"event: error\ndata: {json.dumps({'error': error_msg})}\n\n"
+        yield _sse(_EV_ERROR, {"error": error_msg})
         return
 
     concern = VehicleConcern(
@@ -53,145 +175,199 @@ async def stream_generation(request: GenerateChunksRequest):
     # Check for existing chunks first (fast path)
     all_existing_chunks = await supabase_service.get_chunks_for_vehicle(vehicle.key)
 
-    def is_relevant(chunk, concern_text, dtc_codes):
-        text = (chunk.title + " " + chunk.content_text).lower()
-        concern_tokens = set(concern_text.lower().split())
-        stop_words = {
-            "the",
-            "and",
-            "for",
-            "with",
-            "check",
-            "vehicle",
-            "issue",
-            "problem",
-        }
-        concern_tokens = concern_tokens - stop_words
+    def is_relevant(chunk, concern_tokens, dtc_codes):
+        # PERF: Set lookups instead of a substring scan of the whole text for
+        # every concern token; token sets are memoized across requests
+        text_tokens = _tokens_for(chunk.id, chunk.title, chunk.content_text)
 
-        if dtc_codes:
-            for code in dtc_codes:
-                if code.lower() in text:
-                    return True
+        if not dtc_codes.isdisjoint(text_tokens):
+            return True
 
-        matches = sum(1 for token in concern_tokens if token in text)
+        matches = len(concern_tokens & text_tokens)
         return matches >= 2 or (
             len(concern_tokens) > 0 and matches / len(concern_tokens) > 0.3
         )
 
     primary_chunks = []
     related_chunks = []
+    # (chunk_type, title) -> chunk, used by the slow path's existence check
+    existing_map = {}
 
     if all_existing_chunks:
+        # Tokenize the concern once, not once per existing chunk
+        concern_tokens = set(_TOKEN_RE.findall(request.concern.lower())) - _STOP_WORDS
+        # Normalized once per request; matched with one set op per chunk
+        dtc_codes = frozenset(code.lower() for code in (request.dtc_codes or []))
+        # PERF: One pass both classifies and indexes the existing chunks
         for chunk in all_existing_chunks:
-            if is_relevant(chunk, request.concern, request.dtc_codes or []):
+            existing_map[(chunk.chunk_type, chunk.title)] = chunk
+            if is_relevant(chunk, concern_tokens, dtc_codes):
                 primary_chunks.append(chunk)
             else:
                 related_chunks.append(chunk)
 
     # If we have enough cached chunks, return immediately
     if len(primary_chunks) >= 3:
-        yield f"event: cache_hit\ndata: {json.dumps({'message': 'Using cached chunks', 'count': len(primary_chunks)})}\n\n"
+        yield _sse(
+            _EV_CACHE_HIT,
+            {"message": "Using cached chunks", "count": len(primary_chunks)},
+        )
 
         for chunk in primary_chunks:
-            yield f"event: chunk\ndata: {json.dumps(chunk.model_dump())}\n\n"
-
-        compiled_doc = document_assembler.compile_diagnostic_document(
-            vehicle=vehicle, chunks=primary_chunks, concern=request.concern
+            yield _chunk_frame(chunk)
+
+        # PERF: HTML assembly is CPU-bound; keep it off the event loop so
+        # other open streams keep flowing while it runs
+        compiled_doc = await asyncio.to_thread(
+            document_assembler.compile_diagnostic_document,
+            vehicle=vehicle,
+            chunks=primary_chunks,
+            concern=request.concern,
         )
 
-        yield f"event: complete\ndata: {json.dumps({'chunks_found': len(primary_chunks), 'chunks_generated': 0, 'compiled_html': compiled_doc, 'total_cost': 0.0, 'generation_time_seconds': round(time.time() - start_time, 2)})}\n\n"
+        yield _html_frame(compiled_doc)
+        yield _sse(
+            _EV_COMPLETE,
+            {
+                "chunks_found": len(primary_chunks),
+                "chunks_generated": 0,
+                "total_cost": 0.0,
+                "generation_time_seconds": round(time.time() - start_time, 2),
+            },
+        )
         return
 
     # Slow path: need to generate chunks
-    yield f"event: status\ndata: {json.dumps({'message': 'Analyzing concern...', 'phase': 'identify'})}\n\n"
+    yield _sse(_EV_STATUS, {"message": "Analyzing concern...", "phase": "identify"})
 
     needed_chunks = await chunk_generator.identify_needed_chunks(concern)
 
     if not needed_chunks:
-        yield f"event: error\ndata: {json.dumps({'error': 'Could not determine needed information chunks'})}\n\n"
+        yield _sse(
+            _EV_ERROR, {"error": "Could not determine needed information chunks"}
+        )
         return
 
-    yield f"event: status\ndata: {json.dumps({'message': f'Generating {len(needed_chunks)} chunks...', 'phase': 'generate', 'total': len(needed_chunks)})}\n\n"
-
-    # Check which chunks already exist
-    existing_map = {(c.chunk_type, c.title): c for c in all_existing_chunks}
+    # Split needed chunks against the index built in the relevance pass.
+    # PERF: One hashed lookup per needed chunk (was a membership test plus a
+    # second lookup), done before announcing so "total" counts only real work.
     final_primary_chunks = []
     chunks_to_generate = []
-
-    for chunk_type, title in needed_chunks:
-        if (chunk_type, title) in existing_map:
-            chunk = existing_map[(chunk_type, title)]
-            final_primary_chunks.append(chunk)
-            # Stream existing chunks immediately
-            yield f"event: chunk\ndata: {json.dumps(chunk.model_dump())}\n\n"
+    for key in needed_chunks:
+        chunk = existing_map.get(key)
+        if chunk is None:
+            chunks_to_generate.append(key)
         else:
-            chunks_to_generate.append((chunk_type, title))
+            final_primary_chunks.append(chunk)
+
+    yield _sse(
+        _EV_STATUS,
+        {
+            "message": f"Generating {len(chunks_to_generate)} chunks...",
+            "phase": "generate",
+            "total": len(chunks_to_generate),
+        },
+    )
+
+    # Stream existing chunks immediately
+    for chunk in final_primary_chunks:
+        yield _chunk_frame(chunk)
 
+    total_cost = 0.0
     if chunks_to_generate:
-        total_cost = 0.0
         batch_writer = BatchDBWriter()
+        pending_flushes = []
         generated_count = 0
 
-        # Generate chunks one by one and stream as they complete
-        for i, (chunk_type, title) in enumerate(chunks_to_generate):
-            yield f"event: progress\ndata: {json.dumps({'current': i + 1, 'total': len(chunks_to_generate), 'generating': title})}\n\n"
-
-            try:
-                chunk, cost = await chunk_generator.generate_chunk(
-                    vehicle, chunk_type, title, request.concern, request.dtc_codes or []
-                )
+        async def generate_one(chunk_type, title):
+            # chunk_semaphore, not llm_semaphore: generate_chunk acquires that one
+            async with chunk_semaphore:
+                try:
+                    return title, await chunk_generator.generate_chunk(
+                        vehicle,
+                        chunk_type,
+                        title,
+                        request.concern,
+                        request.dtc_codes or [],
+                    )
+                except Exception as e:
+                    return title, e
+
+        # PERF: Generate all chunks concurrently and stream each one as it
+        # completes, instead of paying every chunk's latency back to back
+        tasks = [
+            asyncio.ensure_future(generate_one(chunk_type, title))
+            for chunk_type, title in chunks_to_generate
+        ]
+        # PERF: One payload dict mutated per step; _sse serializes it
+        # synchronously, so reusing it between frames is safe
+        progress_payload = {
+            "current": 0,
+            "total": len(chunks_to_generate),
+            "generating": "",
+        }
+        try:
+            for i, next_done in enumerate(asyncio.as_completed(tasks)):
+                title, result = await next_done
+                progress_payload["current"] = i + 1
+                progress_payload["generating"] = title
+                yield _sse(_EV_PROGRESS, progress_payload)
+
+                if isinstance(result, Exception):
+                    yield _sse(_EV_CHUNK_ERROR, {"title": title, "error": str(result)})
+                    continue
+
+                chunk, cost = result
                 total_cost += cost
                 generated_count += 1
 
                 # Stream chunk immediately as it's generated (streaming preview)
-                yield f"event: chunk\ndata: {json.dumps({'title': chunk.title, 'chunk_type': chunk.chunk_type, 'content_html': chunk.content_html, 'verified': chunk.verified, 'consensus_score': chunk.consensus_score})}\n\n"
+                yield _chunk_frame(chunk)
 
                 # Add to batch for later DB write
-                content_id = re.sub(
-                    r"[^a-z0-9_]", "", chunk.title.lower().replace(" ", "_")
-                )
-                chunk_data = {
-                    "vehicle_key": chunk.vehicle_key,
-                    "content_id": content_id,
-                    "chunk_type": chunk.chunk_type,
-                    "template_type": "ICE_GASOLINE",
-                    "title": chunk.title,
-                    "data": {
-                        "content_html": chunk.content_html,
-                        "consensus_score": chunk.consensus_score,
-                        "consensus_badge": chunk.consensus_badge,
-                        "tags": chunk.tags,
-                    },
-                    "sources": [s.description for s in chunk.source_cites],
-                    "verification_status": chunk.verification_status,
-                    "source_confidence": chunk.consensus_score or 0.0,
-                    "content_text": chunk.content_text,
-                    "qa_status": "pending",
-                }
-                await batch_writer.add(chunk_data)
+                await batch_writer.add(_chunk_row(chunk))
                 final_primary_chunks.append(chunk)
 
-            except Exception as e:
-                yield f"event: chunk_error\ndata: {json.dumps({'title': title, 'error': str(e)})}\n\n"
+                # PERF: Save in batches while later chunks are still generating
+                if len(batch_writer) >= _FLUSH_THRESHOLD:
+                    pending_flushes.append(
+                        asyncio.ensure_future(batch_writer.flush(supabase_service))
+                    )
+        finally:
+            # Client went away mid-stream: stop the remaining generations
+            for task in tasks:
+                task.cancel()
 
         # Batch save all generated chunks
-        yield f"event: status\ndata: {json.dumps({'message': 'Saving to database...', 'phase': 'save'})}\n\n"
-        await batch_writer.flush(supabase_service)
+        yield _sse(_EV_STATUS, {"message": "Saving to database...", "phase": "save"})
+        await asyncio.gather(*pending_flushes, batch_writer.flush(supabase_service))
 
     # Compile final document
-    yield f"event: status\ndata: {json.dumps({'message': 'Compiling document...', 'phase': 'compile'})}\n\n"
+    yield _sse(_EV_STATUS, {"message": "Compiling document...", "phase": "compile"})
 
-    compiled_html = document_assembler.compile_diagnostic_document(
-        vehicle=vehicle, concern=request.concern, chunks=final_primary_chunks
+    compiled_html = await asyncio.to_thread(
+        document_assembler.compile_diagnostic_document,
+        vehicle=vehicle,
+        concern=request.concern,
+        chunks=final_primary_chunks,
     )
 
     generation_time = time.time() - start_time
 
-    yield f"event: complete\ndata: {json.dumps({'chunks_found': len(final_primary_chunks) - len(chunks_to_generate), 'chunks_generated': len(chunks_to_generate), 'compiled_html': compiled_html, 'total_cost': round(total_cost, 6), 'generation_time_seconds': round(generation_time, 2)})}\n\n"
+    yield _html_frame(compiled_html)
+    yield _sse(
+        _EV_COMPLETE,
+        {
+            "chunks_found": len(final_primary_chunks) - len(chunks_to_generate),
+            "chunks_generated": len(chunks_to_generate),
+            "total_cost": round(total_cost, 6),
+            "generation_time_seconds": round(generation_time, 2),
+        },
+    )
 
 
 @router.post("/generate-chunks-stream")
-async def generate_chunks_stream(request: GenerateChunksRequest):
+async def generate_chunks_stream(request: GenerateChunksRequest, http_request: Request):
     """
     Stream chunk generation with Server-Sent Events.
 
@@ -207,15 +383,8 @@ async def generate_chunks_stream(request: GenerateChunksRequest):
     - chunk: Individual chunk data (stream as generated)
     - chunk_error: Error for specific chunk
     - cache_hit: All chunks found in cache
-    - complete: Final response with compiled HTML
+    - compiled_html: Final compiled document (raw HTML, multi-line data)
+    - complete: Final metadata (counts, cost, timing)
     - error: Fatal error
     """
-    return StreamingResponse(
-        stream_generation(request),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",  # Disable nginx buffering
-        },
-    )
+    return sse_response(stream_generation(request), http_request)
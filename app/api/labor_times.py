@@ -15,19 +15,173 @@ Returns not just hours, but also:
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
 from pydantic import BaseModel
-from typing import Optional, List
+from pydantic_core import to_json
+from typing import Dict, Optional, List
+import asyncio
 import os
+from collections import Counter
 import httpx
 import json
 import re
-from datetime import datetime
+from services.performance import labor_cache
 
 router = APIRouter(prefix="/api/labor", tags=["Labor Times"])
 
-# Cache for labor lookups (in production, use Redis)
-labor_cache: dict = {}
-CACHE_DURATION_HOURS = 168  # 1 week - labor times don't change often
+# Merged web results kept across the parallel query variants
+MAX_SEARCH_RESULTS = 20
+
+# Shared Brave client (warm keep-alive connections), created on first search
+_brave_client: Optional[httpx.AsyncClient] = None
+# query -> in-flight search, so concurrent cache misses share one request
+_brave_inflight: Dict[str, asyncio.Task] = {}
+
+# Cache TTL by estimate confidence: well-sourced estimates live for a week,
+# while fallback estimates expire quickly so a later search can replace them
+CACHE_TTL_BY_CONFIDENCE = {
+    "high": 7 * 24 * 3600,
+    "medium": 3 * 24 * 3600,
+    "low": 12 * 3600,
+    "estimated": 600,
+}
+
+# Longest result text (title + description) the patterns are run against
+MAX_RESULT_TEXT = 2000
+
+# PERF: Search-result patterns compiled once at import, not per result.
+# Each is paired with literals it cannot match without (any one of them);
+# a cheap substring check skips the regex scan when none are present.
+# Captures are bounded ({1,200}) so a long run without a period can't make
+# the engine backtrack across the whole text.
+HOUR_RES = [
+    (re.compile(r'(\d+\.?\d*)\s*(?:hours?|hrs?)\s*(?:of\s*)?(?:labor)?'), ("hour", "hr")),
+    (re.compile(r'book\s*time[:\s]*(\d+\.?\d*)'), ("book",)),
+    (re.compile(r'labor[:\s]*(\d+\.?\d*)\s*(?:hours?|hrs?)'), ("labor",)),
+    (re.compile(r'(\d+\.?\d*)\s*-\s*(\d+\.?\d*)\s*(?:hours?|hrs?)'), ("-",)),  # Range like "2-3 hours"
+]
+GOTCHA_RES = [
+    (
+        re.compile(r'(?:watch out for|be careful|make sure|don\'t forget)[:\s]*([^.]{1,200})'),
+        ("watch out for", "be careful", "make sure", "don't forget"),
+    ),
+    (re.compile(r'(?:common mistake|problem is)[:\s]*([^.]{1,200})'), ("common mistake", "problem is")),
+]
+TIP_RES = [
+    (re.compile(r'(?:tip|trick|pro tip|helpful)[:\s]*([^.]{1,200})'), ("tip", "trick", "helpful")),
+    (re.compile(r'(?:easier if you|helps to)[:\s]*([^.]{1,200})'), ("easier if you", "helps to")),
+]
+TOOL_RE = (
+    re.compile(
+        r'(?:need|require|use)[:\s]*(?:a\s+)?([^.]{0,200}(?:tool|puller|press|socket|wrench)[^.]{0,200})'
+    ),
+    ("tool", "puller", "press", "socket", "wrench"),
+)
+
+
+def _gated_findall(gated_pattern: tuple, text: str) -> list:
+    """findall, skipped when text lacks every literal the pattern requires."""
+    pattern, literals = gated_pattern
+    for literal in literals:
+        if literal in text:
+            return pattern.findall(text)
+    return []
+
+
+# Keywords that indicate difficulty
+NIGHTMARE_KEYWORDS = [
+    "nightmare", "pain in the ass", "terrible", "worst", "hate", "awful", 
+    "drop the subframe", "remove transmission", "engine out", "pull the engine",
+    "don't even try", "dealer only", "shop only", "not diy", "impossible",
+    "6+ hours", "8+ hours", "10+ hours", "all day job", "two day job"
+]
+HARD_KEYWORDS = [
+    "difficult", "challenging", "pain", "tight space", "hard to reach", 
+    "motor mount", "drop axle", "subframe", "hours of labor", "specialty tool",
+    "dealer tool", "not recommended", "experienced only", "professional only",
+    "lower the subframe", "support the engine", "remove intake manifold",
+    "very tight", "no room", "cramped", "frustrating", "tedious"
+]
+MODERATE_KEYWORDS = ["moderate", "some disassembly", "couple hours", "not too bad", "doable", "manageable"]
+EASY_KEYWORDS = ["easy", "simple", "straightforward", "quick", "30 minutes", "basic", "beginner", "diy friendly"]
+
+# Mobile concern keywords - things that make mobile work sketchy/dangerous
+MOBILE_CONCERN_KEYWORDS = [
+    "lift required", "need a lift", "jack stands won't work", "drop subframe", 
+    "transmission out", "engine support", "balance on jack", "sketchy",
+    "lower subframe", "support engine", "engine hoist", "transmission jack",
+    "need lift", "requires lift", "on a lift", "two post lift",
+    "unbolt subframe", "disconnect steering", "power steering lines",
+    "ac lines", "coolant lines", "fuel lines under pressure",
+    "axle drop", "cv axle", "drop the front", "disconnect axle"
+]
+
+# Difficulty categories in the order they are reported per result
+DIFFICULTY_KEYWORDS = [
+    ("nightmare", frozenset(NIGHTMARE_KEYWORDS)),
+    ("hard", frozenset(HARD_KEYWORDS)),
+    ("moderate", frozenset(MODERATE_KEYWORDS)),
+    ("easy", frozenset(EASY_KEYWORDS)),
+]
+
+_ALL_KEYWORDS = sorted(
+    set(
+        NIGHTMARE_KEYWORDS + HARD_KEYWORDS + MODERATE_KEYWORDS + EASY_KEYWORDS
+        + MOBILE_CONCERN_KEYWORDS
+    ),
+    key=len,
+    reverse=True,
+)
+# PERF: One scan finds every keyword instead of ~70 separate `in` checks.
+# The lookahead reports the longest keyword starting at each position...
+_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, _ALL_KEYWORDS)) + "))")
+# ...and any other keyword present is a substring of one of those
+_KEYWORDS_WITHIN = {
+    kw: frozenset(other for other in _ALL_KEYWORDS if other in kw)
+    for kw in _ALL_KEYWORDS
+}
+
+
+def find_keywords(text: str) -> set:
+    """Every known difficulty/mobile keyword that occurs in text."""
+    found = set()
+    for kw in set(_KEYWORD_RE.findall(text)):
+        found |= _KEYWORDS_WITHIN[kw]
+    return found
+
+
+# Base hours when no hour mentions were found, by difficulty
+DIFFICULTY_HOURS = {
+    "easy": 1.0,
+    "moderate": 2.0,
+    "hard": 3.5,
+    "nightmare": 5.0,
+}
+# Extra mobile time as a fraction of adjusted hours. "sketchy" applies
+# whenever sketchy tactics are required (50% more time), whatever the
+# difficulty; anything else not listed adds nothing.
+MOBILE_MULT = {
+    "sketchy": 0.5,
+    "hard": 0.3,
+    "moderate": 0.15,
+    "easy": 0.0,
+}
+
+# Services that are generally NOT mobile-friendly (matched within the service id)
+NOT_MOBILE_RE = re.compile(
+    "timing_belt|timing_chain|head_gasket|transmission_rebuild|"
+    "engine_rebuild|clutch|wheel_alignment|frame_repair"
+)
+# Gotchas that also count as mobile concerns
+MOBILE_GOTCHA_RE = re.compile("lift|subframe|transmission|engine")
+
+# Makes used by get_vehicle_multiplier
+EUROPEAN_MAKES = frozenset({
+    "bmw", "mercedes", "mercedes-benz", "audi", "volkswagen", "porsche", "mini",
+    "land rover", "jaguar", "volvo"
+})
+LUXURY_ASIAN_MAKES = frozenset({"lexus", "acura", "infiniti", "genesis"})
+TRUCK_MAKES = frozenset({"chevrolet", "gmc", "ford", "ram", "dodge", "toyota", "nissan"})
 
 
 class VehicleInfo(BaseModel):
@@ -78,11 +232,11 @@ class LaborResponse(BaseModel):
 
 def get_cache_key(vehicle: VehicleInfo, service: str) -> str:
     """Generate cache key for labor lookup."""
-    return f"{vehicle.year}_{vehicle.make}_{vehicle.model}_{vehicle.engine or 'any'}_{service}".lower().replace(" ", "_")
+    return f"labor:{vehicle.year}:{vehicle.make}:{vehicle.model}:{vehicle.engine or 'any'}:{service}".lower().replace(" ", "_")
 
 
-def build_search_query(vehicle: VehicleInfo, service: str, service_name: Optional[str]) -> str:
-    """Build an effective search query for labor time lookup."""
+def _search_subject(vehicle: VehicleInfo, service: str, service_name: Optional[str]) -> str:
+    """Vehicle + service part shared by every labor search query."""
     vehicle_str = f"{vehicle.year} {vehicle.make} {vehicle.model}"
     if vehicle.engine:
         vehicle_str += f" {vehicle.engine}"
@@ -90,9 +244,42 @@ def build_search_query(vehicle: VehicleInfo, service: str, service_name: Optiona
         vehicle_str += f" {vehicle.drivetrain}"
     
     service_str = service_name or service.replace("_", " ")
-    
+    return f"{vehicle_str} {service_str}"
+
+
+def build_search_query(vehicle: VehicleInfo, service: str, service_name: Optional[str]) -> str:
+    """Build an effective search query for labor time lookup."""
     # Search for labor time and difficulty info
-    return f"{vehicle_str} {service_str} labor time hours difficulty DIY"
+    return f"{_search_subject(vehicle, service, service_name)} labor time hours difficulty DIY"
+
+
+def build_search_queries(vehicle: VehicleInfo, service: str, service_name: Optional[str]) -> List[str]:
+    """
+    The main query plus narrower variants that tend to surface book times
+    and forum write-ups, so rare vehicles still collect enough hour mentions.
+    """
+    subject = _search_subject(vehicle, service, service_name)
+    return [
+        build_search_query(vehicle, service, service_name),
+        f'{subject} "book time"',
+        f"{subject} forum",
+    ]
+
+
+def _get_brave_client() -> httpx.AsyncClient:
+    """Shared client so searches skip TCP + TLS setup after the first one."""
+    global _brave_client
+    if _brave_client is None or _brave_client.is_closed:
+        _brave_client = httpx.AsyncClient(timeout=10.0)
+    return _brave_client
+
+
+async def aclose_brave_client() -> None:
+    """Close the shared Brave client (app shutdown)."""
+    global _brave_client
+    if _brave_client is not None:
+        await _brave_client.aclose()
+        _brave_client = None
 
 
 async def search_brave(query: str) -> Optional[dict]:
@@ -101,21 +288,60 @@ async def search_brave(query: str) -> Optional[dict]:
     if not api_key:
         return None
     
+    # PERF: Concurrent lookups for the same vehicle + service share one search
+    task = _brave_inflight.get(query)
+    if task is None:
+        task = asyncio.ensure_future(_search_brave(query, api_key))
+        _brave_inflight[query] = task
+        task.add_done_callback(lambda _: _brave_inflight.pop(query, None))
+    # Shielded so one caller disconnecting doesn't cancel the others' search
+    return await asyncio.shield(task)
+
+
+async def search_brave_multi(queries: List[str]) -> Optional[dict]:
+    """
+    Run several Brave searches in parallel and merge their web results,
+    deduplicated by URL and capped at MAX_SEARCH_RESULTS (earlier queries
+    first). None only if every search failed.
+    """
+    responses = await asyncio.gather(
+        *[search_brave(q) for q in queries], return_exceptions=True
+    )
+    
+    merged = []
+    seen_urls = set()
+    succeeded = False
+    for response in responses:
+        if not isinstance(response, dict):
+            continue
+        succeeded = True
+        for result in response.get("web", {}).get("results", []):
+            url = result.get("url")
+            if url:
+                if url in seen_urls:
+                    continue
+                seen_urls.add(url)
+            merged.append(result)
+    
+    if not succeeded:
+        return None
+    return {"web": {"results": merged[:MAX_SEARCH_RESULTS]}}
+
+
+async def _search_brave(query: str, api_key: str) -> Optional[dict]:
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.search.brave.com/res/v1/web/search",
-                headers={"X-Subscription-Token": api_key},
-                params={
-                    "q": query,
-                    "count": 8,
-                    "text_decorations": False,
-                    "search_lang": "en",
-                },
-                timeout=10.0
-            )
-            if response.status_code == 200:
-                return response.json()
+        response = await _get_brave_client().get(
+            "https://api.search.brave.com/res/v1/web/search",
+            headers={"X-Subscription-Token": api_key},
+            params={
+                "q": query,
+                "count": 8,
+                "text_decorations": False,
+                "search_lang": "en",
+            },
+        )
+        if response.status_code == 200:
+            return response.json()
     except Exception as e:
         print(f"Brave search error: {e}")
     return None
@@ -125,41 +351,17 @@ def extract_labor_info_from_search(search_results: dict, vehicle: VehicleInfo, s
     """Extract labor time and difficulty info from search results."""
     
     context_texts = []
-    hours_found = []
-    difficulty_indicators = []
+    # PERF: Running stats instead of a list re-scanned by sum()/max() later
+    hours_sum = 0.0
+    hours_count = 0
+    hours_max = 0.0
+    # Results that hit each difficulty category
+    difficulty_counts = Counter()
     gotchas = []
     tips = []
     special_tools = []
     mobile_concerns = []
     
-    # Keywords that indicate difficulty
-    nightmare_keywords = [
-        "nightmare", "pain in the ass", "terrible", "worst", "hate", "awful", 
-        "drop the subframe", "remove transmission", "engine out", "pull the engine",
-        "don't even try", "dealer only", "shop only", "not diy", "impossible",
-        "6+ hours", "8+ hours", "10+ hours", "all day job", "two day job"
-    ]
-    hard_keywords = [
-        "difficult", "challenging", "pain", "tight space", "hard to reach", 
-        "motor mount", "drop axle", "subframe", "hours of labor", "specialty tool",
-        "dealer tool", "not recommended", "experienced only", "professional only",
-        "lower the subframe", "support the engine", "remove intake manifold",
-        "very tight", "no room", "cramped", "frustrating", "tedious"
-    ]
-    moderate_keywords = ["moderate", "some disassembly", "couple hours", "not too bad", "doable", "manageable"]
-    easy_keywords = ["easy", "simple", "straightforward", "quick", "30 minutes", "basic", "beginner", "diy friendly"]
-    
-    # Mobile concern keywords - things that make mobile work sketchy/dangerous
-    mobile_concern_keywords = [
-        "lift required", "need a lift", "jack stands won't work", "drop subframe", 
-        "transmission out", "engine support", "balance on jack", "sketchy",
-        "lower subframe", "support engine", "engine hoist", "transmission jack",
-        "need lift", "requires lift", "on a lift", "two post lift",
-        "unbolt subframe", "disconnect steering", "power steering lines",
-        "ac lines", "coolant lines", "fuel lines under pressure",
-        "axle drop", "cv axle", "drop the front", "disconnect axle"
-    ]
-    
     # High labor hour thresholds that indicate complexity
     high_labor_indicators = []
     
@@ -167,90 +369,64 @@ def extract_labor_info_from_search(search_results: dict, vehicle: VehicleInfo, s
         for result in search_results["web"]["results"]:
             title = result.get("title", "").lower()
             description = result.get("description", "").lower()
-            text = f"{title} {description}"
-            context_texts.append(text)
+            context_texts.append(f"{title} {description}")
+            # Collapse whitespace and cap length so the patterns below run on
+            # bounded input; the " . " keeps title and description as
+            # separate sentences for the [^.] captures
+            text = " ".join(f"{title} . {description}".split())[:MAX_RESULT_TEXT]
             
             # Look for hour mentions
-            hour_patterns = [
-                r'(\d+\.?\d*)\s*(?:hours?|hrs?)\s*(?:of\s*)?(?:labor)?',
-                r'book\s*time[:\s]*(\d+\.?\d*)',
-                r'labor[:\s]*(\d+\.?\d*)\s*(?:hours?|hrs?)',
-                r'(\d+\.?\d*)\s*-\s*(\d+\.?\d*)\s*(?:hours?|hrs?)',  # Range like "2-3 hours"
-            ]
-            for pattern in hour_patterns:
-                matches = re.findall(pattern, text)
+            for pattern in HOUR_RES:
+                matches = _gated_findall(pattern, text)
                 for match in matches:
                     if isinstance(match, tuple):
                         # It's a range, take the higher number
-                        hours_found.append(float(match[1]))
+                        h = float(match[1])
+                        hours_sum += h
+                        hours_count += 1
+                        hours_max = max(hours_max, h)
                     else:
                         try:
                             h = float(match)
                             if 0.25 <= h <= 20:  # Sanity check
-                                hours_found.append(h)
+                                hours_sum += h
+                                hours_count += 1
+                                hours_max = max(hours_max, h)
                                 # Flag high labor as complexity indicator
                                 if h >= 6:
                                     high_labor_indicators.append(f"{h} hours labor")
                         except:
                             pass
             
+            found_keywords = find_keywords(text)
+            
             # Check difficulty indicators
-            for kw in nightmare_keywords:
-                if kw in text:
-                    difficulty_indicators.append("nightmare")
-                    break
-            for kw in hard_keywords:
-                if kw in text:
-                    difficulty_indicators.append("hard")
-                    break
-            for kw in moderate_keywords:
-                if kw in text:
-                    difficulty_indicators.append("moderate")
-                    break
-            for kw in easy_keywords:
-                if kw in text:
-                    difficulty_indicators.append("easy")
-                    break
+            for category, keywords in DIFFICULTY_KEYWORDS:
+                if not keywords.isdisjoint(found_keywords):
+                    difficulty_counts[category] += 1
             
             # Mobile concerns
-            for kw in mobile_concern_keywords:
-                if kw in text:
-                    mobile_concerns.append(kw)
+            mobile_concerns.extend(kw for kw in MOBILE_CONCERN_KEYWORDS if kw in found_keywords)
             
             # Extract gotchas
-            gotcha_patterns = [
-                r'(?:watch out for|be careful|make sure|don\'t forget)[:\s]*([^.]+)',
-                r'(?:common mistake|problem is)[:\s]*([^.]+)',
-            ]
-            for pattern in gotcha_patterns:
-                matches = re.findall(pattern, text)
-                gotchas.extend(matches[:2])
+            for pattern in GOTCHA_RES:
+                gotchas.extend(_gated_findall(pattern, text)[:2])
             
             # Extract tips
-            tip_patterns = [
-                r'(?:tip|trick|pro tip|helpful)[:\s]*([^.]+)',
-                r'(?:easier if you|helps to)[:\s]*([^.]+)',
-            ]
-            for pattern in tip_patterns:
-                matches = re.findall(pattern, text)
-                tips.extend(matches[:2])
+            for pattern in TIP_RES:
+                tips.extend(_gated_findall(pattern, text)[:2])
             
             # Special tools
-            tool_patterns = [
-                r'(?:need|require|use)[:\s]*(?:a\s+)?([^.]*(?:tool|puller|press|socket|wrench)[^.]*)',
-            ]
-            for pattern in tool_patterns:
-                matches = re.findall(pattern, text)
-                special_tools.extend(matches[:2])
+            special_tools.extend(_gated_findall(TOOL_RE, text)[:2])
     
     # Determine overall difficulty
-    if difficulty_indicators:
+    if difficulty_counts:
         # Weight towards the worst indicators
-        if "nightmare" in difficulty_indicators:
+        if difficulty_counts["nightmare"]:
             difficulty = "nightmare"
-        elif difficulty_indicators.count("hard") >= 2 or "hard" in difficulty_indicators:
+        elif difficulty_counts["hard"]:
             difficulty = "hard"
-        elif "moderate" in difficulty_indicators:
+        elif difficulty_counts["moderate"]:
             difficulty = "moderate"
         else:
             difficulty = "easy"
@@ -259,28 +435,22 @@ def extract_labor_info_from_search(search_results: dict, vehicle: VehicleInfo, s
     
     # Override difficulty based on labor hours found
     # If book time is very high, it's hard regardless of forum sentiment
-    if hours_found and max(hours_found) >= 8:
+    if hours_count and hours_max >= 8:
         if difficulty not in ["nightmare", "hard"]:
             difficulty = "hard"
-            high_labor_indicators.append(f"High book time: {max(hours_found)} hours")
-    if hours_found and max(hours_found) >= 12:
+            high_labor_indicators.append(f"High book time: {hours_max} hours")
+    if hours_count and hours_max >= 12:
         difficulty = "nightmare"
-        high_labor_indicators.append(f"Very high book time: {max(hours_found)} hours")
+        high_labor_indicators.append(f"Very high book time: {hours_max} hours")
     
     # Calculate average hours if found
-    if hours_found:
-        avg_hours = sum(hours_found) / len(hours_found)
+    if hours_count:
+        avg_hours = hours_sum / hours_count
         # Weight towards higher numbers for safety in quoting
-        max_hours = max(hours_found)
-        base_hours = (avg_hours + max_hours) / 2
+        base_hours = (avg_hours + hours_max) / 2
     else:
         # Estimate based on difficulty
-        base_hours = {
-            "easy": 1.0,
-            "moderate": 2.0,
-            "hard": 3.5,
-            "nightmare": 5.0
-        }.get(difficulty, 2.0)
+        base_hours = DIFFICULTY_HOURS.get(difficulty, 2.0)
     
     # Add high labor indicators to mobile concerns
     mobile_concerns.extend(high_labor_indicators)
@@ -293,7 +463,7 @@ def extract_labor_info_from_search(search_results: dict, vehicle: VehicleInfo, s
         "special_tools": list(set(special_tools))[:5],
         "mobile_concerns": list(set(mobile_concerns)),
         "context": " | ".join(context_texts[:3])[:500],
-        "confidence": "high" if hours_found and len(hours_found) >= 2 else ("medium" if hours_found else "low")
+        "confidence": "high" if hours_count >= 2 else ("medium" if hours_count else "low")
     }
 
 
@@ -307,23 +477,15 @@ def assess_mobile_feasibility(
 ) -> MobileFeasibility:
     """Determine if this job is feasible for mobile mechanic work."""
     
-    # Services that are generally NOT mobile-friendly
-    not_mobile_services = [
-        "timing_belt", "timing_chain", "head_gasket", "transmission_rebuild",
-        "engine_rebuild", "clutch", "wheel_alignment", "frame_repair"
-    ]
-    
     # Check if service is in the not-mobile list
-    service_lower = service.lower()
-    for nm in not_mobile_services:
-        if nm in service_lower:
-            return MobileFeasibility(
-                can_do_mobile=False,
-                confidence="high",
-                reasoning=f"This service typically requires shop equipment and is not recommended for mobile work.",
-                sketchy_tactics_required=False,
-                recommended_approach="Refer to shop or tow to facility"
-            )
+    if NOT_MOBILE_RE.search(service.lower()):
+        return MobileFeasibility(
+            can_do_mobile=False,
+            confidence="high",
+            reasoning=f"This service typically requires shop equipment and is not recommended for mobile work.",
+            sketchy_tactics_required=False,
+            recommended_approach="Refer to shop or tow to facility"
+        )
     
     # Check difficulty and concerns
     sketchy_required = len(mobile_concerns) > 0 or difficulty == "nightmare"
@@ -335,7 +497,7 @@ def assess_mobile_feasibility(
             mobile_concerns.append(f"High labor time: {base_hours}+ hours")
     
     # Combine all concerns
-    all_concerns = mobile_concerns + [g for g in gotchas if any(kw in g.lower() for kw in ["lift", "subframe", "transmission", "engine"])]
+    all_concerns = mobile_concerns + [g for g in gotchas if MOBILE_GOTCHA_RE.search(g.lower())]
     
     # Very high hours = probably not feasible mobile
     if base_hours >= 10:
@@ -386,16 +548,16 @@ def get_vehicle_multiplier(vehicle: VehicleInfo) -> float:
     make_lower = vehicle.make.lower()
     
     # European = more complex
-    if make_lower in ["bmw", "mercedes", "mercedes-benz", "audi", "volkswagen", "porsche", "mini", "land rover", "jaguar", "volvo"]:
+    if make_lower in EUROPEAN_MAKES:
         return 1.3
     
     # Luxury Asian
-    if make_lower in ["lexus", "acura", "infiniti", "genesis"]:
+    if make_lower in LUXURY_ASIAN_MAKES:
         return 1.15
     
     # Trucks with 4WD typically harder
     if vehicle.drivetrain and vehicle.drivetrain.upper() in ["4WD", "AWD"]:
-        if make_lower in ["chevrolet", "gmc", "ford", "ram", "dodge", "toyota", "nissan"]:
+        if make_lower in TRUCK_MAKES:
             # Trucks
             return 1.2
     
@@ -421,17 +583,17 @@ async def get_labor_estimate(request: LaborRequest):
     
     # Check cache
     cache_key = get_cache_key(vehicle, service)
-    if cache_key in labor_cache:
-        cached = labor_cache[cache_key]
-        if (datetime.now() - cached["timestamp"]).total_seconds() < CACHE_DURATION_HOURS * 3600:
-            cached["response"].cached = True
-            return cached["response"]
+    cached = await labor_cache.get(cache_key)
+    if cached is not None:
+        # PERF: Stored pre-encoded, so a hit skips serialization and
+        # response_model validation entirely
+        return Response(content=cached, media_type="application/json")
     
-    # Build search query
-    query = build_search_query(vehicle, service, request.service_name)
+    # Build search queries
+    queries = build_search_queries(vehicle, service, request.service_name)
     
-    # Search for labor info
-    search_results = await search_brave(query)
+    # Search for labor info (variants run in parallel)
+    search_results = await search_brave_multi(queries)
     
     if search_results:
         labor_info = extract_labor_info_from_search(search_results, vehicle, service)
@@ -463,14 +625,8 @@ async def get_labor_estimate(request: LaborRequest):
     )
     
     # Calculate mobile add time
-    if mobile_feasibility.sketchy_tactics_required:
-        mobile_add = adjusted_hours * 0.5  # 50% more time for sketchy jobs
-    elif labor_info["difficulty"] == "hard":
-        mobile_add = adjusted_hours * 0.3
-    elif labor_info["difficulty"] == "moderate":
-        mobile_add = adjusted_hours * 0.15
-    else:
-        mobile_add = 0
+    mobile_key = "sketchy" if mobile_feasibility.sketchy_tactics_required else labor_info["difficulty"]
+    mobile_add = adjusted_hours * MOBILE_MULT.get(mobile_key, 0.0)
     
     # Round to nearest 0.25
     adjusted_hours = round(adjusted_hours * 4) / 4
@@ -506,12 +662,13 @@ async def get_labor_estimate(request: LaborRequest):
     )
     
     # Cache the result
-    labor_cache[cache_key] = {
-        "response": response,
-        "timestamp": datetime.now()
-    }
+    await labor_cache.set(
+        cache_key,
+        to_json(response.model_copy(update={"cached": True})),
+        ttl_seconds=CACHE_TTL_BY_CONFIDENCE[labor_info["confidence"]],
+    )
     
-    return response
+    return Response(content=to_json(response), media_type="application/json")
 
 
 @router.get("/nightmare-jobs")
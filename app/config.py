@@ -9,12 +9,18 @@ class Settings(BaseSettings):
 
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_key: str = os.getenv("SUPABASE_KEY", "")
+    # Worker threads for blocking Supabase calls (see SupabaseService._execute)
+    supabase_pool_size: int = int(os.getenv("SUPABASE_POOL_SIZE", "16"))
     openrouter_api_key: str = os.getenv("OPENROUTER_API_KEY", "")
     nhtsa_base_url: str = "https://vpic.nhtsa.dot.gov/api"
     carquery_base_url: str = "https://www.carqueryapi.com/api/0.3"
     vehicledatabases_api_key: str = os.getenv("VEHICLEDATABASES_API_KEY", "")
     brave_api_key: str = os.getenv("BRAVE_API_KEY", "")
     tavily_api_key: str = os.getenv("TAVILY_API_KEY", "")
+    # Vercel / Lambda: work left running after a response is frozen or killed
+    is_serverless: bool = bool(
+        os.getenv("VERCEL") or os.getenv("AWS_LAMBDA_FUNCTION_NAME")
+    )
 
 
 settings = Settings()
@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+import atexit
 import os
+import queue
 import sys
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -15,11 +19,21 @@ if str(app_dir) not in sys.path:
     sys.path.insert(0, str(app_dir))
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+# PERF: Records are queued and written by a listener thread, so request
+# handlers never block on stdout/stderr I/O.
+_log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener = QueueListener(
+    _log_queue, logging.StreamHandler(), respect_handler_level=True
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Detect if running on Vercel (serverless)
-IS_SERVERLESS = os.getenv("VERCEL", False) or os.getenv("AWS_LAMBDA_FUNCTION_NAME", False)
+from config import settings
+
+IS_SERVERLESS = settings.is_serverless
 logger.info(f"Running in {'serverless' if IS_SERVERLESS else 'server'} mode")
 
 app = FastAPI(
@@ -35,6 +49,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# PERF: Chunk payloads are mostly HTML/JSON and compress ~5-10x. The SSE
+# stream compresses its own frames (see api/generate_stream.py), so the
+# middleware leaves that response alone.
+app.add_middleware(GZipMiddleware, minimum_size=512)
 
 # Import routers with error handling for serverless
 routers_loaded = []
@@ -112,6 +130,18 @@ except Exception as e:
 logger.info(f"Routers loaded: {routers_loaded}")
 
 
+@app.on_event("shutdown")
+async def close_http_clients():
+    from services.openrouter import openrouter
+
+    await openrouter.aclose()
+
+    if "labor_times" in routers_loaded:
+        from api.labor_times import aclose_brave_client
+
+        await aclose_brave_client()
+
+
 @app.get("/")
 async def root():
     return {
@@ -126,3 +156,17 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy", "routers": len(routers_loaded)}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # uvloop + httptools ship with uvicorn[standard]; pin them explicitly so a
+    # missing extra fails loudly instead of silently falling back to asyncio/h11
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        loop="uvloop",
+        http="httptools",
+    )
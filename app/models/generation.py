@@ -30,6 +30,6 @@ class GenerateChunksResponse(BaseModel):
     chunks_generated: int
     chunks: list
     related_chunks: list = []
-    compiled_html: str
+    compiled_html: Optional[str] = None
     total_cost: float
     generation_time_seconds: float
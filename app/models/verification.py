@@ -0,0 +1,51 @@
+from enum import Enum
+from types import MappingProxyType
+
+
+class ServiceVerificationStatus(str, Enum):
+    """verification_status values produced by the generators (ServiceChunk)"""
+
+    UNVERIFIED = "unverified"
+    PENDING_REVIEW = "pending_review"
+    PENDING_VERIFICATION = "pending_verification"
+    VERIFIED = "verified"
+    AUTO_VERIFIED = "auto_verified"
+    COMMUNITY_VERIFIED = "community_verified"
+    FLAGGED = "flagged"  # Flagged items need review
+    GENERATED = "generated"
+    REJECTED = "rejected"
+
+
+class DBVerificationStatus(str, Enum):
+    """chunks.verification_status - the DB ONLY accepts these"""
+
+    PENDING_VERIFICATION = "pending_verification"
+    AUTO_VERIFIED = "auto_verified"
+    REJECTED = "rejected"
+
+
+_SERVICE = ServiceVerificationStatus
+_DB = DBVerificationStatus
+
+# Keyed by the raw string, since chunks carry verification_status as plain str
+_TO_DB_STATUS = MappingProxyType(
+    {
+        _SERVICE.UNVERIFIED.value: _DB.PENDING_VERIFICATION.value,
+        _SERVICE.PENDING_REVIEW.value: _DB.PENDING_VERIFICATION.value,
+        _SERVICE.PENDING_VERIFICATION.value: _DB.PENDING_VERIFICATION.value,
+        _SERVICE.VERIFIED.value: _DB.AUTO_VERIFIED.value,
+        _SERVICE.AUTO_VERIFIED.value: _DB.AUTO_VERIFIED.value,
+        _SERVICE.COMMUNITY_VERIFIED.value: _DB.AUTO_VERIFIED.value,
+        _SERVICE.FLAGGED.value: _DB.PENDING_VERIFICATION.value,
+        _SERVICE.GENERATED.value: _DB.PENDING_VERIFICATION.value,
+        _SERVICE.REJECTED.value: _DB.REJECTED.value,
+    }
+)
+
+
+def to_db_status(status: str) -> str:
+    """
+    Map a ServiceChunk verification_status to a valid chunks.verification_status.
+    Unknown values fall back to pending_verification.
+    """
+    return _TO_DB_STATUS.get(status, _DB.PENDING_VERIFICATION.value)
@@ -11,7 +11,9 @@ from services.ddg_client import ddg_service
 from services.advanced_generator import advanced_generator
 from services.performance import (
     prompt_cache,
+    needed_chunks_cache,
     llm_semaphore,
+    chunk_semaphore,
     build_vehicle_context,
     parallel_generate_with_semaphore,
 )
@@ -19,7 +21,9 @@ import asyncio
 import json
 import base64
 import re
-from typing import Optional, Dict, Any, List
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
 
 
 # FACTORY MANUAL CSS - Professional service document styling
@@ -109,8 +113,64 @@ def wrap_in_factory_manual_html(
 """
 
 
+# Free per-vehicle sources shared across chunks (and prefetched by chat)
+_VEHICLE_SOURCE_TTL = 300
+_MAX_VEHICLE_SOURCES = 1000
+
+# identify_needed_chunks keys: punctuation/whitespace-insensitive concern text
+_CONCERN_NORMALIZE_RE = re.compile(r"[^a-z0-9]+")
+# Concerns seen once; a second sighting admits the result to the 24h cache
+_MAX_SEEN_CONCERNS = 20_000
+
+
 class ChunkGenerator:
 
+    def __init__(self):
+        self._vehicle_sources: Dict[str, Tuple[asyncio.Task, float]] = {}
+        self._needed_chunks_inflight: Dict[str, asyncio.Task] = {}
+        self._seen_concerns: "OrderedDict[str, None]" = OrderedDict()
+
+    def _vehicle_source(self, label: str, vehicle: Vehicle) -> asyncio.Task:
+        """
+        Shared task for a free per-vehicle lookup ("nhtsa" or "carquery").
+        Every chunk for the same vehicle awaits one request instead of its own;
+        failed lookups are retried on the next call.
+        """
+        key = f"{label}:{vehicle.key}"
+        now = time.monotonic()
+        entry = self._vehicle_sources.get(key)
+        if entry:
+            task, started = entry
+            failed = task.done() and (task.cancelled() or task.exception())
+            if not failed and now - started < _VEHICLE_SOURCE_TTL:
+                return task
+
+        if len(self._vehicle_sources) >= _MAX_VEHICLE_SOURCES:
+            self._vehicle_sources = {
+                k: v
+                for k, v in self._vehicle_sources.items()
+                if now - v[1] < _VEHICLE_SOURCE_TTL
+            }
+
+        fetch = (
+            nhtsa_service.get_tsbs_and_recalls
+            if label == "nhtsa"
+            else carquery_service.get_trims
+        )
+        task = asyncio.ensure_future(fetch(vehicle))
+        # Retrieve failures so an unawaited prefetch is not logged as an error
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._vehicle_sources[key] = (task, now)
+        return task
+
+    def prefetch_vehicle_sources(self, vehicle: Vehicle) -> None:
+        """
+        Start the free NHTSA/CarQuery lookups for a vehicle early, e.g. while
+        the chat intent LLM call is in flight, so chunk generation finds them ready.
+        """
+        self._vehicle_source("nhtsa", vehicle)
+        self._vehicle_source("carquery", vehicle)
+
     def _get_content_id_for_title(self, title: str) -> str:
         """
         Get the correct content_id for a given title.
@@ -166,13 +226,14 @@ class ChunkGenerator:
         # Priority 1: NHTSA (always call - it's FREE)
         if chunk_type in ["known_issues", "diag_flow", "torque_spec", "fluid_capacity", 
                           "known_issue", "diagnostic_info"]:
-            api_tasks.append(nhtsa_service.get_tsbs_and_recalls(vehicle))
+            # shield: one chunk's cancellation must not cancel the shared lookup
+            api_tasks.append(asyncio.shield(self._vehicle_source("nhtsa", vehicle)))
             task_labels.append("nhtsa")
 
         # Priority 2: CarQuery (FREE vehicle database)
         if chunk_type in ["fluid_capacity", "torque_spec", "removal_steps", 
                           "brake_spec", "tire_spec"]:
-            api_tasks.append(carquery_service.get_trims(vehicle))
+            api_tasks.append(asyncio.shield(self._vehicle_source("carquery", vehicle)))
             task_labels.append("carquery")
 
         # Priority 3: SMART SEARCH (replaces old Brave 12-query + Tavily pattern)
@@ -235,7 +296,7 @@ class ChunkGenerator:
                     
                     # Log cost savings
                     if res.get("cached"):
-                        print(f"   ⚡ Smart search: CACHED (saved ~$0.003)")
+                        print("   ⚡ Smart search: CACHED (saved ~$0.003)")
                     else:
                         print(f"   💰 Smart search cost: ${res.get('cost', 0):.4f}")
 
@@ -262,15 +323,67 @@ class ChunkGenerator:
         PERFORMANCE: Uses cache + semaphore for deduplication and rate limiting.
         Returns: list of (chunk_type, context/title) tuples
         """
-        # PERF: Cache key based on vehicle + concern (normalized)
-        cache_key = (
-            f"needed_chunks:{concern.vehicle.key}:{concern.concern.lower()[:100]}"
-        )
+        # PERF: Cache key based on vehicle + concern (normalized) + DTC codes
+        normalized = _CONCERN_NORMALIZE_RE.sub(" ", concern.concern.lower()).strip()
+        dtc_key = ",".join(sorted(code.upper() for code in concern.dtc_codes or []))
+        cache_key = f"needed_chunks:{concern.vehicle.key}:{normalized}:{dtc_key}"
+
+        cached = await needed_chunks_cache.get(cache_key)
+        if cached:
+            print("⚡ Cache hit for identify_needed_chunks")
+            return cached
         cached = await prompt_cache.get(cache_key)
         if cached:
-            print(f"⚡ Cache hit for identify_needed_chunks")
+            print("⚡ Cache hit for identify_needed_chunks")
+            await self._admit_needed_chunks(cache_key, cached)
             return cached
 
+        # PERF: Concurrent requests for the same concern share one LLM call
+        task = self._needed_chunks_inflight.get(cache_key)
+        if task is not None:
+            return await asyncio.shield(task)
+
+        # The shielded task caches its own result, so a caller that stops
+        # waiting (e.g. a fast-path hit in /generate-chunks) doesn't lose it
+        task = asyncio.ensure_future(self._identify_and_cache(cache_key, concern))
+        self._needed_chunks_inflight[cache_key] = task
+        task.add_done_callback(
+            lambda _: self._needed_chunks_inflight.pop(cache_key, None)
+        )
+        return await asyncio.shield(task)
+
+    async def _identify_and_cache(
+        self, cache_key: str, concern: VehicleConcern
+    ) -> list[tuple[ChunkType, str]]:
+        """Ask the LLM for the needed chunks and cache a non-empty answer."""
+        result = await self._identify_needed_chunks(concern)
+        if result:
+            # Short-lived for every concern; the 24h cache only for repeats
+            await prompt_cache.set(cache_key, result)
+            await self._admit_needed_chunks(cache_key, result)
+        return result
+
+    async def _admit_needed_chunks(
+        self, cache_key: str, result: list[tuple[ChunkType, str]]
+    ) -> None:
+        """
+        Admission gate for the 24h needed_chunks_cache: a concern is only
+        promoted once it has been asked twice, so one-off concerns don't
+        evict the ones that keep coming back.
+        """
+        if cache_key in self._seen_concerns:
+            del self._seen_concerns[cache_key]
+            await needed_chunks_cache.set(cache_key, result)
+            return
+
+        self._seen_concerns[cache_key] = None
+        if len(self._seen_concerns) > _MAX_SEEN_CONCERNS:
+            self._seen_concerns.popitem(last=False)
+
+    async def _identify_needed_chunks(
+        self, concern: VehicleConcern
+    ) -> list[tuple[ChunkType, str]]:
+        """Ask the LLM for the needed chunks (uncached)."""
         prompt = f"""You are an expert automotive diagnostic assistant.
 
 Vehicle: {concern.vehicle.year} {concern.vehicle.make} {concern.vehicle.model} {concern.vehicle.engine}
@@ -310,12 +423,13 @@ Focus on the MOST RELEVANT chunks (3-6 total). Be specific in titles."""
                 response_text = response_text[:-3]
 
             chunks_needed = json.loads(response_text.strip())
-            result = [(item["chunk_type"], item["title"]) for item in chunks_needed]
-
-            # PERF: Cache the result
-            await prompt_cache.set(cache_key, result)
-
-            return result
+            # Order-preserving dedupe: a repeated pair would be generated
+            # (and paid for) twice by every caller
+            return list(
+                dict.fromkeys(
+                    (item["chunk_type"], item["title"]) for item in chunks_needed
+                )
+            )
         except Exception as e:
             print(f"Error parsing needed chunks: {e}")
             print(f"Raw response: {response}")
@@ -946,31 +1060,26 @@ CRITICAL OUTPUT RULES:
 
         return chunk, total_cost
 
-    async def generate_leaf_bundle(
+    def _leaf_bundle_tasks(
         self,
         vehicle: Vehicle,
         leaf_id: str,
         chunks_def: List[Dict[str, str]],
-        template_version: str = "1.0",
-    ) -> Dict[str, Any]:
-        """
-        Generate a bundle of chunks for a specific leaf node in parallel.
-        chunks_def: List of dicts with 'type' and 'title' (e.g. [{'type': 'known_issues', 'title': 'Common Issues'}])
-        """
-        results = {}
+        template_version: str,
+    ) -> Tuple[List[str], List[Any]]:
+        """Build (content_ids, generate_chunk coroutines) for a leaf bundle."""
         tasks = []
+        content_ids = []
 
-        print(f"📦 Generating leaf bundle: {leaf_id} ({len(chunks_def)} chunks)")
+        # Context is the leaf ID (e.g. "engine_mechanical_timing_system")
+        context = leaf_id.replace("_", " ")
 
         for chunk_def in chunks_def:
             chunk_type = chunk_def.get("type")
             title = chunk_def.get("title")
 
             # Construct content_id using strict One-to-One rule
-            content_id = self._get_content_id_for_title(title)
-
-            # Context is the leaf ID (e.g. "engine_mechanical_timing_system")
-            context = leaf_id.replace("_", " ")
+            content_ids.append(self._get_content_id_for_title(title))
 
             # Create task
             tasks.append(
@@ -984,17 +1093,32 @@ CRITICAL OUTPUT RULES:
                 )
             )
 
-        # Run in parallel
-        chunk_results = await asyncio.gather(*tasks, return_exceptions=True)
+        return content_ids, tasks
 
-        total_cost = 0.0
+    async def generate_leaf_bundle(
+        self,
+        vehicle: Vehicle,
+        leaf_id: str,
+        chunks_def: List[Dict[str, str]],
+        template_version: str = "1.0",
+    ) -> Dict[str, Any]:
+        """
+        Generate a bundle of chunks for a specific leaf node in parallel.
+        chunks_def: List of dicts with 'type' and 'title' (e.g. [{'type': 'known_issues', 'title': 'Common Issues'}])
+        """
+        results = {}
+        print(f"📦 Generating leaf bundle: {leaf_id} ({len(chunks_def)} chunks)")
+        content_ids, tasks = self._leaf_bundle_tasks(
+            vehicle, leaf_id, chunks_def, template_version
+        )
 
-        for i, res in enumerate(chunk_results):
-            chunk_def = chunks_def[i]
-            chunk_type = chunk_def.get("type")
-            title = chunk_def.get("title")
-            content_id = self._get_content_id_for_title(title)
+        # PERF: Run in parallel, bounded so large bundles don't flood search APIs.
+        # Exceptions are returned per chunk so one failure doesn't abort the bundle.
+        chunk_results = await parallel_generate_with_semaphore(tasks, chunk_semaphore)
 
+        total_cost = 0.0
+
+        for content_id, res in zip(content_ids, chunk_results):
             if isinstance(res, Exception):
                 print(f"❌ Failed to generate {content_id}: {res}")
                 results[content_id] = {"status": "error", "error": str(res)}
@@ -1009,5 +1133,42 @@ CRITICAL OUTPUT RULES:
 
         return {"results": results, "total_cost": total_cost}
 
+    async def stream_leaf_bundle(
+        self,
+        vehicle: Vehicle,
+        leaf_id: str,
+        chunks_def: List[Dict[str, str]],
+        template_version: str = "1.0",
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Same work as generate_leaf_bundle, but yields (content_id, result) as
+        each chunk finishes so callers can stream the fastest chunks first.
+        """
+        print(f"📦 Streaming leaf bundle: {leaf_id} ({len(chunks_def)} chunks)")
+        content_ids, tasks = self._leaf_bundle_tasks(
+            vehicle, leaf_id, chunks_def, template_version
+        )
+
+        async def run(content_id: str, task) -> Tuple[str, Dict[str, Any]]:
+            async with chunk_semaphore:
+                try:
+                    chunk, cost = await task
+                except Exception as e:
+                    print(f"❌ Failed to generate {content_id}: {e}")
+                    return content_id, {"status": "error", "error": str(e)}
+            return content_id, {"status": "success", "chunk": chunk, "cost": cost}
+
+        pending = [
+            asyncio.ensure_future(run(content_id, task))
+            for content_id, task in zip(content_ids, tasks)
+        ]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield await next_done
+        finally:
+            # Client went away mid-stream: stop the remaining generations
+            for future in pending:
+                future.cancel()
+
 
 chunk_generator = ChunkGenerator()
@@ -1,5 +1,6 @@
 from models.chunk import ServiceChunk
 from models.vehicle import Vehicle
+from typing import Iterator
 
 # FACTORY MANUAL CSS - Professional service document styling
 FACTORY_MANUAL_CSS = """
@@ -127,6 +128,18 @@ FACTORY_MANUAL_CSS = """
 """
 
 
+# Document sections in reading order: (heading, chunk types)
+_DOCUMENT_SECTIONS = (
+    # Known Issues first (most valuable for diagnosis)
+    ("⚠️ Known Issues & TSBs", ("known_issues",)),
+    ("🔍 Diagnostic Flow", ("diag_flow",)),
+    ("📍 Component Locations", ("part_location",)),
+    ("🔧 Removal & Installation", ("removal_steps",)),
+    ("📊 Specifications", ("torque_spec", "fluid_capacity")),
+    ("⚡ Wiring Diagrams", ("wiring_diagram",)),
+)
+
+
 class DocumentAssembler:
 
     def compile_diagnostic_document(
@@ -137,6 +150,16 @@ class DocumentAssembler:
         2-3 pages max, not 40 pages of noise.
         Professional factory manual styling.
         """
+        # PERF: One join instead of repeated string += over the whole document
+        return "".join(self.iter_diagnostic_document(vehicle, concern, chunks))
+
+    def iter_diagnostic_document(
+        self, vehicle: Vehicle, concern: str, chunks: list[ServiceChunk]
+    ) -> Iterator[str]:
+        """
+        Yield the diagnostic document piece by piece (header, then each chunk),
+        so it can be streamed without materializing the whole HTML first.
+        """
 
         # Group chunks by type
         chunks_by_type = {}
@@ -145,7 +168,7 @@ class DocumentAssembler:
                 chunks_by_type[chunk.chunk_type] = []
             chunks_by_type[chunk.chunk_type].append(chunk)
 
-        html = f"""<!DOCTYPE html>
+        yield f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -162,110 +185,30 @@ class DocumentAssembler:
     </div>
 """
 
-        # Known Issues first (most valuable for diagnosis)
-        if "known_issues" in chunks_by_type:
-            html += '    <div class="section">\n'
-            html += "        <h2>⚠️ Known Issues & TSBs</h2>\n"
-            for chunk in chunks_by_type["known_issues"]:
-                verified_badge = (
-                    '<span class="verified">✓ Verified</span>'
-                    if chunk.verified
-                    else '<span class="unverified">⚠ Unverified</span>'
-                )
-                html += f'        <div class="chunk">\n'
-                html += f"            <h3>{chunk.title}{verified_badge}</h3>\n"
-                html += f"            {chunk.content_html}\n"
-                html += "        </div>\n"
-            html += "    </div>\n"
+        for heading, chunk_types in _DOCUMENT_SECTIONS:
+            section_chunks = [
+                c for t in chunk_types if t in chunks_by_type for c in chunks_by_type[t]
+            ]
+            if not section_chunks:
+                continue
 
-        # Diagnostic Flow
-        if "diag_flow" in chunks_by_type:
-            html += '    <div class="section">\n'
-            html += "        <h2>🔍 Diagnostic Flow</h2>\n"
-            for chunk in chunks_by_type["diag_flow"]:
+            yield f'    <div class="section">\n        <h2>{heading}</h2>\n'
+            for chunk in section_chunks:
                 verified_badge = (
                     '<span class="verified">✓ Verified</span>'
                     if chunk.verified
                     else '<span class="unverified">⚠ Unverified</span>'
                 )
-                html += f'        <div class="chunk">\n'
-                html += f"            <h3>{chunk.title}{verified_badge}</h3>\n"
-                html += f"            {chunk.content_html}\n"
-                html += "        </div>\n"
-            html += "    </div>\n"
-
-        # Part Locations
-        if "part_location" in chunks_by_type:
-            html += '    <div class="section">\n'
-            html += "        <h2>📍 Component Locations</h2>\n"
-            for chunk in chunks_by_type["part_location"]:
-                verified_badge = (
-                    '<span class="verified">✓ Verified</span>'
-                    if chunk.verified
-                    else '<span class="unverified">⚠ Unverified</span>'
+                yield (
+                    '        <div class="chunk">\n'
+                    f"            <h3>{chunk.title}{verified_badge}</h3>\n"
+                    f"            {chunk.content_html}\n"
+                    "        </div>\n"
                 )
-                html += f'        <div class="chunk">\n'
-                html += f"            <h3>{chunk.title}{verified_badge}</h3>\n"
-                html += f"            {chunk.content_html}\n"
-                html += "        </div>\n"
-            html += "    </div>\n"
+            yield "    </div>\n"
 
-        # Removal Steps
-        if "removal_steps" in chunks_by_type:
-            html += '    <div class="section">\n'
-            html += "        <h2>🔧 Removal & Installation</h2>\n"
-            for chunk in chunks_by_type["removal_steps"]:
-                verified_badge = (
-                    '<span class="verified">✓ Verified</span>'
-                    if chunk.verified
-                    else '<span class="unverified">⚠ Unverified</span>'
-                )
-                html += f'        <div class="chunk">\n'
-                html += f"            <h3>{chunk.title}{verified_badge}</h3>\n"
-                html += f"            {chunk.content_html}\n"
-                html += "        </div>\n"
-            html += "    </div>\n"
-
-        # Specs (Torque, Fluids)
-        spec_types = ["torque_spec", "fluid_capacity"]
-        spec_chunks = [
-            c for t in spec_types if t in chunks_by_type for c in chunks_by_type[t]
-        ]
-        if spec_chunks:
-            html += '    <div class="section">\n'
-            html += "        <h2>📊 Specifications</h2>\n"
-            for chunk in spec_chunks:
-                verified_badge = (
-                    '<span class="verified">✓ Verified</span>'
-                    if chunk.verified
-                    else '<span class="unverified">⚠ Unverified</span>'
-                )
-                html += f'        <div class="chunk">\n'
-                html += f"            <h3>{chunk.title}{verified_badge}</h3>\n"
-                html += f"            {chunk.content_html}\n"
-                html += "        </div>\n"
-            html += "    </div>\n"
-
-        # Wiring Diagrams
-        if "wiring_diagram" in chunks_by_type:
-            html += '    <div class="section">\n'
-            html += "        <h2>⚡ Wiring Diagrams</h2>\n"
-            for chunk in chunks_by_type["wiring_diagram"]:
-                verified_badge = (
-                    '<span class="verified">✓ Verified</span>'
-                    if chunk.verified
-                    else '<span class="unverified">⚠ Unverified</span>'
-                )
-                html += f'        <div class="chunk">\n'
-                html += f"            <h3>{chunk.title}{verified_badge}</h3>\n"
-                html += f"            {chunk.content_html}\n"
-                html += "        </div>\n"
-            html += "    </div>\n"
-
-        html += """</body>
+        yield """</body>
 </html>"""
 
-        return html
-
 
 document_assembler = DocumentAssembler()
@@ -22,6 +22,7 @@ class OpenRouterClient:
     }
 
     def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
         self.api_key = settings.openrouter_api_key
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -29,6 +30,28 @@ class OpenRouterClient:
             "X-Title": "Swoop Intelligence",
         }
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Shared client so every call reuses warm keep-alive connections instead
+        of paying TCP + TLS setup per request. Created lazily on first use.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                # Increase timeout for free tier models (can be slow)
+                timeout=httpx.Timeout(180.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=256, max_keepalive_connections=128
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared client (app shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     async def chat_completion(
         self,
         model_key: str,
@@ -56,18 +79,16 @@ class OpenRouterClient:
         # Note: OpenRouter doesn't have a "reasoning" parameter
         # Grok has reasoning built-in, no need to enable it
 
-        # Increase timeout for free tier models (can be slow)
-        async with httpx.AsyncClient(timeout=180.0) as client:
-            response = await client.post(
-                f"{self.BASE_URL}/chat/completions", headers=self.headers, json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
+        response = await self.client.post(
+            f"{self.BASE_URL}/chat/completions", headers=self.headers, json=payload
+        )
+        response.raise_for_status()
+        data = response.json()
 
-            content = data["choices"][0]["message"]["content"]
-            cost = self.COSTS.get(model_key, 0.0)
+        content = data["choices"][0]["message"]["content"]
+        cost = self.COSTS.get(model_key, 0.0)
 
-            return content, cost
+        return content, cost
 
 
 openrouter = OpenRouterClient()
@@ -0,0 +1,159 @@
+"""
+OpenRouter Background Batches
+Non-interactive lane for pre-warming and bulk work (popular vehicle x query
+pairs) so it never competes with live chat requests for the model.
+
+Requests are described as OpenAI Batch API JSONL lines
+({"custom_id", "method", "url", "body"}). OpenRouter does not expose
+/v1/files or /v1/batches, so a batch is drained in-process by a low
+concurrency worker; callers poll retrieve_batch() exactly as they would
+poll a hosted batch.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from services.openrouter import openrouter
+from services.performance import ConcurrencySemaphore
+
+ResultCallback = Callable[[str, str], Awaitable[None]]
+
+
+class OpenRouterBatchRunner:
+    """
+    Runs submitted batches in the background with a small concurrency cap.
+    Results are kept per batch until retrieved with clear=True, or until
+    completed_ttl_seconds after the batch finishes.
+    """
+
+    def __init__(self, concurrency: int = 2, completed_ttl_seconds: int = 3600):
+        self._semaphore = ConcurrencySemaphore(limit=concurrency)
+        self._completed_ttl = completed_ttl_seconds
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        # Strong refs so workers aren't garbage collected mid-flight
+        self._workers: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def build_requests(prompts: List[Dict]) -> List[Dict]:
+        """
+        Describe prompts as Batch API request objects.
+        Each prompt dict needs custom_id and prompt; model/temperature are optional.
+        """
+        return [
+            {
+                "custom_id": item["custom_id"],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": openrouter.MODELS[item.get("model_key", "ingestion")],
+                    "messages": [{"role": "user", "content": item["prompt"]}],
+                    "temperature": item.get("temperature", 0.1),
+                },
+            }
+            for item in prompts
+        ]
+
+    @classmethod
+    def to_jsonl(cls, prompts: List[Dict]) -> str:
+        """Render prompts as Batch API JSONL (one request object per line)."""
+        return "\n".join(json.dumps(request) for request in cls.build_requests(prompts))
+
+    def submit_batch(
+        self, prompts: List[Dict], on_result: Optional[ResultCallback] = None
+    ) -> str:
+        """
+        Queue a batch and return its batch_id immediately.
+        await on_result(custom_id, text) is called as each request completes;
+        results delivered that way are not also kept on the batch.
+        """
+        self._evict_completed()
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        requests = self.build_requests(prompts)
+
+        self._batches[batch_id] = {
+            "status": "in_progress",
+            "total": len(requests),
+            "completed": 0,
+            "failed": 0,
+            "total_cost": 0.0,
+            "results": {},
+            "errors": {},
+        }
+
+        model_keys = [item.get("model_key", "ingestion") for item in prompts]
+        worker = asyncio.create_task(
+            self._run(batch_id, requests, model_keys, on_result)
+        )
+        self._workers.add(worker)
+        worker.add_done_callback(self._workers.discard)
+
+        print(f"📦 Batch {batch_id} submitted ({len(requests)} requests)")
+        return batch_id
+
+    def retrieve_batch(self, batch_id: str, clear: bool = False) -> Optional[Dict]:
+        """Return batch status/results, or None for an unknown batch_id."""
+        self._evict_completed()
+        if clear:
+            return self._batches.pop(batch_id, None)
+        return self._batches.get(batch_id)
+
+    def _evict_completed(self) -> None:
+        """Drop batches that finished more than completed_ttl_seconds ago."""
+        cutoff = time.monotonic() - self._completed_ttl
+        expired = [
+            batch_id
+            for batch_id, batch in self._batches.items()
+            if batch.get("completed_at", cutoff) < cutoff
+        ]
+        for batch_id in expired:
+            del self._batches[batch_id]
+
+    async def _run(
+        self,
+        batch_id: str,
+        requests: List[Dict],
+        model_keys: List[str],
+        on_result: Optional[ResultCallback],
+    ) -> None:
+        batch = self._batches[batch_id]
+
+        async def run_one(request: Dict, model_key: str) -> None:
+            custom_id = request["custom_id"]
+            body = request["body"]
+            async with self._semaphore:
+                try:
+                    text, cost = await openrouter.chat_completion(
+                        model_key,
+                        body["messages"],
+                        temperature=body["temperature"],
+                    )
+                except Exception as e:
+                    batch["failed"] += 1
+                    batch["errors"][custom_id] = str(e)
+                    return
+
+            batch["completed"] += 1
+            batch["total_cost"] += cost
+            if on_result is None:
+                batch["results"][custom_id] = text
+                return
+            try:
+                await on_result(custom_id, text)
+            except Exception as e:
+                print(f"⚠️ Batch {batch_id} callback failed for {custom_id}: {e}")
+
+        await asyncio.gather(
+            *[run_one(r, key) for r, key in zip(requests, model_keys)]
+        )
+        batch["status"] = "completed"
+        batch["completed_at"] = time.monotonic()
+        print(
+            f"📦 Batch {batch_id} done: {batch['completed']} ok, "
+            f"{batch['failed']} failed (${batch['total_cost']:.4f})"
+        )
+
+
+openrouter_batch = OpenRouterBatchRunner()
@@ -0,0 +1,94 @@
+"""
+OpenRouter Micro-Batcher
+Coalesces short prompts (intent parsing) that arrive within a small window
+into one burst of concurrent OpenRouter calls.
+
+OpenRouter has no multi-prompt chat endpoint, so a "batch" is a single
+asyncio.gather burst. Identical prompts inside the same window share one call.
+"""
+
+import asyncio
+from typing import Dict, List, Set, Tuple
+
+from services.openrouter import openrouter
+
+QueueKey = Tuple[str, float]
+
+
+class OpenRouterBatcher:
+    """
+    Per-model queues flushed every `window_ms` or once `max_batch` prompts
+    are waiting, whichever comes first.
+    """
+
+    def __init__(self, window_ms: int = 20, max_batch: int = 16):
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._queues: Dict[QueueKey, Dict[str, List[asyncio.Future]]] = {}
+        self._timers: Dict[QueueKey, asyncio.Task] = {}
+        # Strong refs so running batches aren't garbage collected mid-flight
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(
+        self, prompt: str, model_key: str = "ingestion", temperature: float = 0.1
+    ) -> str:
+        """Queue a single-message prompt and wait for the model's text response."""
+        key = (model_key, temperature)
+        future = asyncio.get_running_loop().create_future()
+
+        queue = self._queues.setdefault(key, {})
+        queue.setdefault(prompt, []).append(future)
+
+        if len(queue) >= self._max_batch:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.create_task(self._flush_after_window(key))
+
+        return await future
+
+    async def _flush_after_window(self, key: QueueKey) -> None:
+        await asyncio.sleep(self._window)
+        self._timers.pop(key, None)
+        self._flush(key)
+
+    def _flush(self, key: QueueKey) -> None:
+        timer = self._timers.pop(key, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+
+        batch = self._queues.pop(key, None)
+        if batch:
+            task = asyncio.create_task(self._run_batch(key, batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(
+        self, key: QueueKey, batch: Dict[str, List[asyncio.Future]]
+    ) -> None:
+        model_key, temperature = key
+        prompts = list(batch)
+
+        results = await asyncio.gather(
+            *[
+                openrouter.chat_completion(
+                    model_key,
+                    [{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                )
+                for prompt in prompts
+            ],
+            return_exceptions=True,
+        )
+
+        for prompt, result in zip(prompts, results):
+            for future in batch[prompt]:
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    text, _cost = result
+                    future.set_result(text)
+
+
+openrouter_batcher = OpenRouterBatcher()
@@ -4,11 +4,16 @@ Centralized caching, deduplication, and batch operations for 70%+ speed improvem
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple, Union
 from functools import lru_cache
 from datetime import datetime, timedelta
 import hashlib
 import json
+import zlib
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic_core import to_json
 
 from config import settings
 
@@ -17,36 +22,47 @@ class PromptCache:
     """
     In-memory cache for deduplicating repeated prompt components.
     Caches vehicle-specific context, API responses, and template data.
-    TTL: 5 minutes (300 seconds) to balance freshness with speed.
+    TTL: 5 minutes (300 seconds) to balance freshness with speed; set() can
+    override it per entry.
+    Optional max_entries bounds memory by evicting the oldest entries first.
     """
 
-    def __init__(self, ttl_seconds: int = 300):
-        self._cache: Dict[str, Tuple[Any, datetime]] = {}
+    def __init__(self, ttl_seconds: int = 300, max_entries: Optional[int] = None):
+        # hashed key -> (value, expires_at)
+        self._cache: Dict[bytes, Tuple[Any, datetime]] = {}
         self._ttl = timedelta(seconds=ttl_seconds)
+        self._max_entries = max_entries
         self._lock = asyncio.Lock()
 
-    def _hash_key(self, key: str) -> str:
-        """Create a hash key for cache lookup."""
-        return hashlib.md5(key.encode()).hexdigest()
+    def _hash_key(self, key: str) -> bytes:
+        """Create a compact 128-bit hash key for cache lookup."""
+        return hashlib.blake2b(key.encode(), digest_size=16).digest()
 
     async def get(self, key: str) -> Optional[Any]:
         """Get cached value if not expired."""
         hashed = self._hash_key(key)
         async with self._lock:
             if hashed in self._cache:
-                value, timestamp = self._cache[hashed]
-                if datetime.utcnow() - timestamp < self._ttl:
+                value, expires_at = self._cache[hashed]
+                if datetime.utcnow() < expires_at:
                     return value
                 else:
                     # Expired, remove it
                     del self._cache[hashed]
             return None
 
-    async def set(self, key: str, value: Any) -> None:
-        """Set cached value with timestamp."""
+    async def set(
+        self, key: str, value: Any, ttl_seconds: Optional[int] = None
+    ) -> None:
+        """Set cached value; ttl_seconds overrides the cache-wide TTL."""
         hashed = self._hash_key(key)
+        ttl = self._ttl if ttl_seconds is None else timedelta(seconds=ttl_seconds)
         async with self._lock:
-            self._cache[hashed] = (value, datetime.utcnow())
+            self._cache.pop(hashed, None)
+            self._cache[hashed] = (value, datetime.utcnow() + ttl)
+            if self._max_entries and len(self._cache) > self._max_entries:
+                # Dicts keep insertion order, so the first key is the oldest write
+                del self._cache[next(iter(self._cache))]
 
     async def get_or_compute(self, key: str, compute_fn) -> Any:
         """Get from cache or compute and cache the result."""
@@ -62,6 +78,64 @@ class PromptCache:
         """Clear entire cache."""
         self._cache.clear()
 
+    def __len__(self) -> int:
+        """Number of stored entries (expired ones are dropped lazily on get)."""
+        return len(self._cache)
+
+
+class ChunkResponseCache(PromptCache):
+    """
+    PromptCache for encoded GET /chunks responses that can be invalidated per
+    chunk row. Each entry is indexed under the (vehicle_key, content_id,
+    chunk_type) of the rows it was built from, and a save, delete or QA
+    update of any of those rows drops it.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        super().__init__(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        # row -> cache keys built from it, least recently indexed first
+        self._keys_by_row: Dict[Tuple[str, str, str], set] = {}
+        self._invalidations = 0
+
+    def version(self) -> int:
+        """Token to take before reading the DB; pass it to set_for_rows()."""
+        return self._invalidations
+
+    async def set_for_rows(
+        self,
+        key: str,
+        value: Any,
+        rows: List[Tuple[str, str, str]],
+        version: int,
+    ) -> None:
+        """
+        Cache value under key, indexed by the rows it depends on (at most 2).
+        Skipped if any row was invalidated since version was taken: the
+        value may have been read before that write.
+        """
+        if version != self._invalidations:
+            return
+        await self.set(key, value)
+        if version != self._invalidations:
+            self._cache.pop(self._hash_key(key), None)
+            return
+
+        for row in rows:
+            keys = self._keys_by_row.pop(row, None) or set()
+            keys.add(key)
+            self._keys_by_row[row] = keys
+        # Entries are evicted oldest-write-first at max_entries and index at
+        # most 2 rows each, so rows not indexed within the last
+        # 2 * max_entries row slots only point at evicted entries
+        while len(self._keys_by_row) > 2 * self._max_entries:
+            del self._keys_by_row[next(iter(self._keys_by_row))]
+
+    def invalidate(self, vehicle_key: str, content_id: str, chunk_type: str) -> None:
+        """Drop every cached response built from this chunk row."""
+        self._invalidations += 1
+        for key in self._keys_by_row.pop((vehicle_key, content_id, chunk_type), ()):
+            self._cache.pop(self._hash_key(key), None)
+
 
 class BatchDBWriter:
     """
@@ -69,10 +143,19 @@ class BatchDBWriter:
     Collects chunks and writes them in a single bulk operation.
     """
 
+    # chunks upsert conflict target; also the key rows are deduplicated on
+    CONFLICT_COLUMNS = ("vehicle_key", "content_id", "chunk_type")
+    # Rows per upsert request; larger batches are split to bound request size
+    MAX_ROWS_PER_REQUEST = 500
+
     def __init__(self):
         self._pending: List[Dict[str, Any]] = []
         self._lock = asyncio.Lock()
 
+    def __len__(self) -> int:
+        """Number of chunks waiting for the next flush."""
+        return len(self._pending)
+
     async def add(self, chunk_data: Dict[str, Any]) -> None:
         """Add chunk to pending batch."""
         async with self._lock:
@@ -93,45 +176,69 @@ class BatchDBWriter:
         if not chunks_to_save:
             return []
 
+        # Postgres rejects an upsert that touches the same row twice, which
+        # would push the whole batch onto the per-row fallback; last one wins
+        deduped = {
+            tuple(row.get(col) for col in self.CONFLICT_COLUMNS): row
+            for row in chunks_to_save
+        }
+        chunks_to_save = list(deduped.values())
+
+        size = self.MAX_ROWS_PER_REQUEST
+        results = await asyncio.gather(
+            *[
+                self._upsert_slice(chunks_to_save[i : i + size], supabase_client)
+                for i in range(0, len(chunks_to_save), size)
+            ]
+        )
+        saved = [row for rows in results for row in rows]
+        for key in deduped:
+            chunk_response_cache.invalidate(*key)
+        if saved:
+            print(f"✅ Batch saved {len(saved)} chunks in {len(results)} operation(s)")
+        return saved
+
+    async def _upsert_slice(
+        self, rows: List[Dict[str, Any]], supabase_client
+    ) -> List[Any]:
+        """One multi-row upsert; falls back to per-row saves on failure."""
         try:
             # Bulk upsert - single DB round-trip instead of N
-            result = (
-                supabase_client.client.table("chunks")
-                .upsert(chunks_to_save, on_conflict="vehicle_key,content_id,chunk_type")
-                .execute()
+            # PERF: Run on the Supabase executor so the event loop keeps serving
+            result = await supabase_client._execute(
+                supabase_client.client.table("chunks").upsert(
+                    rows, on_conflict=",".join(self.CONFLICT_COLUMNS)
+                )
             )
-
-            if result.data:
-                print(f"✅ Batch saved {len(result.data)} chunks in single operation")
-                return result.data
-            return []
+            return result.data or []
         except Exception as e:
             print(f"❌ Batch save error: {e}")
             # Fallback: try individual saves
-            return await self._fallback_individual_save(chunks_to_save, supabase_client)
+            return await self._fallback_individual_save(rows, supabase_client)
 
     async def _fallback_individual_save(
         self, chunks: List[Dict], supabase_client
     ) -> List[Any]:
         """Fallback to individual saves if batch fails."""
-        saved = []
-        for chunk_data in chunks:
+
+        async def save_one(chunk_data: Dict) -> List[Any]:
             try:
-                result = (
-                    supabase_client.client.table("chunks")
-                    .upsert(
+                result = await supabase_client._execute(
+                    supabase_client.client.table("chunks").upsert(
                         chunk_data,
-                        on_conflict="vehicle_key,content_id,chunk_type",
+                        on_conflict=",".join(self.CONFLICT_COLUMNS),
                     )
-                    .execute()
                 )
-                if result.data:
-                    saved.extend(result.data)
+                return result.data or []
             except Exception as e:
                 print(
                     f"❌ Individual save failed for {chunk_data.get('content_id')}: {e}"
                 )
-        return saved
+                return []
+
+        # One bad row shouldn't serialize the rest behind it
+        results = await asyncio.gather(*[save_one(c) for c in chunks])
+        return [row for rows in results for row in rows]
 
 
 class ConcurrencySemaphore:
@@ -257,10 +364,73 @@ class ProgressTracker:
         return (self._completed + self._failed) >= self._total
 
 
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered by pydantic-core's Rust encoder instead of stdlib json.
+    Handles dicts, Pydantic models and datetimes without a jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+async def _gzip_frames(
+    frames: AsyncIterator[Union[str, bytes]]
+) -> AsyncIterator[bytes]:
+    """
+    Gzip an SSE stream frame by frame. Each frame is sync-flushed so the
+    client can decode and render it immediately instead of waiting for the
+    compressor's buffer to fill.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip container
+    async for frame in frames:
+        if isinstance(frame, str):
+            frame = frame.encode()
+        yield compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def sse_response(
+    frames: AsyncIterator[Union[str, bytes]], request: Request
+) -> StreamingResponse:
+    """
+    Server-Sent Events response, gzipped per frame when the client accepts it.
+    PERF: chunk HTML dominates these streams and compresses ~5-10x.
+    Content-Encoding is set here, so GZipMiddleware leaves the stream alone
+    (it would otherwise hold events back in its compressor buffer).
+    """
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",  # Disable nginx buffering
+        "Vary": "Accept-Encoding",
+    }
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        frames = _gzip_frames(frames)
+    return StreamingResponse(frames, media_type="text/event-stream", headers=headers)
+
+
 # Global singleton instances
 prompt_cache = PromptCache(ttl_seconds=300)
+chat_response_cache = PromptCache(ttl_seconds=86400, max_entries=50_000)
+# Finished chat report chunks per (leaf, vehicle), served stale-while-revalidate
+bundle_cache = PromptCache(ttl_seconds=86400, max_entries=20_000)
 template_cache = TemplateCache(ttl_seconds=3600)
+# identify_needed_chunks results for concerns that repeat (admitted on 2nd ask)
+needed_chunks_cache = PromptCache(ttl_seconds=86400, max_entries=10_000)
+# Encoded GET /chunks "ready" responses. Short TTL bounds staleness after
+# QA/promotion updates that happen outside this process.
+chunk_response_cache = ChunkResponseCache(ttl_seconds=300, max_entries=50_000)
+# Recently failed GET /chunks generations, so polling clients don't restart
+# a generation that keeps failing; short TTL so transient failures retry
+chunk_failure_cache = PromptCache(ttl_seconds=120, max_entries=10_000)
+# Encoded labor estimate responses per (vehicle, service); labor times rarely change
+labor_cache = PromptCache(ttl_seconds=7 * 24 * 3600, max_entries=20_000)
 llm_semaphore = ConcurrencySemaphore(limit=8)
+# Bounds whole-chunk fan-out (search APIs + LLM). Kept separate from
+# llm_semaphore because generate_chunk acquires that one internally.
+chunk_semaphore = ConcurrencySemaphore(limit=8)
 
 
 async def parallel_generate_with_semaphore(
@@ -0,0 +1,192 @@
+"""
+Semantic Intent Cache
+Remembers which nav_tree leaf the LLM picked for a query so paraphrased
+repeats ("brake pad replacement" / "replace brake pads") skip the intent call.
+
+Queries are embedded as L2-normalized bag-of-stems vectors (pure Python, no
+model download) and matched by cosine similarity within a per-vehicle partition.
+Stemming folds inflections ("replacement" / "replace" / "replacing") onto one
+dimension so word-order and word-form paraphrases land on the same vector.
+"""
+
+import math
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Filler words that carry no intent ("how do I change the ...")
+_FILLER_WORDS = frozenset(
+    {
+        "a",
+        "an",
+        "the",
+        "how",
+        "do",
+        "i",
+        "to",
+        "my",
+        "on",
+        "for",
+        "of",
+        "is",
+        "what",
+        "whats",
+        "where",
+        "can",
+        "you",
+        "me",
+        "please",
+        "need",
+        "show",
+    }
+)
+
+# Longest first, so "replacements" drops "ments" rather than just "s"
+_SUFFIXES = ("ments", "ment", "ings", "ing", "ers", "er", "ed", "es", "s")
+
+
+def _stem(token: str) -> str:
+    """Strip one inflectional suffix and a trailing 'e' (replacement -> replac)."""
+    if token.endswith("ss"):
+        return token
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[: -len(suffix)]
+            break
+    if len(token) > 3 and token.endswith("e"):
+        token = token[:-1]
+    return token
+
+
+def embed_query(query: str) -> Dict[str, float]:
+    """
+    Build an L2-normalized sparse term vector for a query.
+    Tokens are stemmed so "replace brake pads" and "brake pad replacement"
+    map to the same vector.
+    """
+    counts: Dict[str, float] = {}
+    for token in _TOKEN_RE.findall(query.lower()):
+        if token in _FILLER_WORDS:
+            continue
+        token = _stem(token)
+        counts[token] = counts.get(token, 0.0) + 1.0
+
+    norm = math.sqrt(sum(v * v for v in counts.values()))
+    if norm == 0:
+        return {}
+    return {token: v / norm for token, v in counts.items()}
+
+
+class _Partition:
+    """LRU-bounded vector store for a single vehicle fingerprint."""
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, ...], Tuple[Dict[str, float], str]]" = (
+            OrderedDict()
+        )
+        # Inverted index: token -> entry keys, so lookups only score overlapping entries
+        self._postings: Dict[str, Set[Tuple[str, ...]]] = {}
+
+    def lookup(
+        self, vector: Dict[str, float], threshold: float
+    ) -> Optional[Tuple[str, float]]:
+        scored: Set[Tuple[str, ...]] = set()
+        best_key = None
+        best_score = 0.0
+
+        for token in vector:
+            for key in self._postings.get(token, ()):
+                if key in scored:
+                    continue
+                scored.add(key)
+                cached_vector, _ = self._entries[key]
+                score = sum(
+                    weight * cached_vector.get(t, 0.0) for t, weight in vector.items()
+                )
+                if score > best_score:
+                    best_key, best_score = key, score
+
+        if best_key is None or best_score < threshold:
+            return None
+
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][1], best_score
+
+    def insert(self, vector: Dict[str, float], leaf_id: str) -> None:
+        key = tuple(sorted(vector))
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = (vector, leaf_id)
+        for token in vector:
+            self._postings.setdefault(token, set()).add(key)
+
+        while len(self._entries) > self._max_entries:
+            old_key, (old_vector, _) = self._entries.popitem(last=False)
+            for token in old_vector:
+                keys = self._postings.get(token)
+                if keys is not None:
+                    keys.discard(old_key)
+                    if not keys:
+                        del self._postings[token]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class IntentCache:
+    """
+    Cosine-similarity cache of query -> leaf_id decisions.
+    Partitioned by vehicle fingerprint so a Civic answer never leaks to an F-150.
+    """
+
+    def __init__(self, max_entries_per_vehicle: int = 10_000):
+        self._max_entries = max_entries_per_vehicle
+        self._partitions: Dict[str, _Partition] = {}
+
+    @staticmethod
+    def vehicle_key(vehicle) -> str:
+        """Fingerprint used to partition the cache (year-agnostic)."""
+        return f"{vehicle.make}|{vehicle.model}|{vehicle.engine}".lower()
+
+    def lookup(
+        self,
+        vector: Dict[str, float],
+        vehicle_key: str,
+        threshold: float = 0.9,
+        allowed_ids: Optional[List[str]] = None,
+    ) -> Optional[str]:
+        """
+        Return a cached leaf_id if a stored query is at least `threshold` similar.
+        If allowed_ids is given, the hit must still be one of the current candidates.
+        """
+        partition = self._partitions.get(vehicle_key)
+        if not partition or not vector:
+            return None
+
+        hit = partition.lookup(vector, threshold)
+        if not hit:
+            return None
+
+        leaf_id, _ = hit
+        if allowed_ids is not None and leaf_id not in allowed_ids:
+            return None
+        return leaf_id
+
+    def insert(self, vector: Dict[str, float], vehicle_key: str, leaf_id: str) -> None:
+        """Remember the LLM's decision for this query vector."""
+        if not vector:
+            return
+        partition = self._partitions.get(vehicle_key)
+        if partition is None:
+            partition = self._partitions[vehicle_key] = _Partition(self._max_entries)
+        partition.insert(vector, leaf_id)
+
+    def clear(self) -> None:
+        """Clear entire cache."""
+        self._partitions.clear()
+
+
+intent_cache = IntentCache()
@@ -1,13 +1,45 @@
 from supabase import create_client, Client
 from config import settings
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from models.verification import to_db_status
+from services.performance import chunk_response_cache
+import asyncio
 import re
 
 
 class ChunkRecord:
     """Simple chunk record from database"""
 
+    # PERF: slots keep attribute reads off the per-instance __dict__; every
+    # column below is always assigned (with a default) in __init__.
+    __slots__ = (
+        "id",
+        "vehicle_key",
+        "content_id",
+        "chunk_type",
+        "template_type",
+        "title",
+        "content_text",
+        "data",
+        "sources",
+        "verification_status",
+        "source_confidence",
+        "qa_status",
+        "qa_notes",
+        "last_qa_reviewed_at",
+        "regeneration_attempts",
+        "regenerated_at",
+        "created_at",
+        "updated_at",
+        "verified_status",
+        "verified_at",
+        "failed_at",
+        "promotion_count",
+        "qa_pass_count",
+    )
+
     def __init__(self, data: Dict[str, Any]):
         self.id = data.get("id")
         self.vehicle_key = data.get("vehicle_key")
@@ -80,6 +112,11 @@ class ChunkRecord:
         }
 
 
+# Explicit column list for chunk reads: keeps the query text stable and
+# leaves out search_vector (migration 003), which is never read here.
+CHUNK_COLUMNS = ",".join(ChunkRecord.__slots__)
+
+
 class SupabaseService:
     # Contamination detection patterns
     BRAND_KEYWORDS = {
@@ -108,6 +145,28 @@ class SupabaseService:
         self.client: Client = create_client(
             settings.supabase_url, settings.supabase_key
         )
+        # PERF: Dedicated, bounded worker pool for blocking queries. The
+        # client's PostgREST session is created once and its keep-alive
+        # connections are shared by these workers, so requests reuse warm
+        # connections instead of handshaking per call.
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.supabase_pool_size, thread_name_prefix="supabase"
+        )
+        # Flipped off if migration 002 (rpc_get_chunk_with_reuse) isn't applied
+        self._reuse_rpc_available = True
+        # Flipped off if migration 003 (chunks.search_vector) isn't applied
+        self._search_vector_available = True
+        # Flipped off if migration 006 (rpc_get_relevant_chunks) isn't applied
+        self._relevant_rpc_available = True
+
+    async def _execute(self, query):
+        """
+        Run a query builder's blocking execute() on the Supabase worker pool.
+        PERF: keeps the event loop free during the round-trip, so independent
+        queries awaited together with asyncio.gather actually overlap.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, query.execute)
 
     def is_safety_critical(self, chunk_type: str, content_id: str) -> bool:
         """Return True only for safety-critical chunks that must be quarantined until verified."""
@@ -317,15 +376,40 @@ class SupabaseService:
         """
         try:
             # Search for chunks of the same type for this vehicle
-            # that contain the keyword in the title
-            result = (
-                self.client.table("chunks")
-                .select("*")
-                .eq("vehicle_key", vehicle_key)
-                .eq("chunk_type", chunk_type)
-                .ilike("title", f"%{keyword}%")
-                .limit(1)
-                .execute()
+            # that match the keyword. Builders mutate in place, so each
+            # attempt starts from a fresh query.
+            def base_query():
+                return (
+                    self.client.table("chunks")
+                    .select(CHUNK_COLUMNS)
+                    .eq("vehicle_key", vehicle_key)
+                    .eq("chunk_type", chunk_type)
+                )
+
+            if self._search_vector_available:
+                # PERF: GIN-indexed full-text match (migration 003)
+                try:
+                    result = await self._execute(
+                        base_query()
+                        .text_search(
+                            "search_vector",
+                            keyword,
+                            options={"config": "english", "type": "websearch"},
+                        )
+                        .limit(1)
+                    )
+                    if result.data:
+                        return ChunkRecord(result.data[0])
+                    return None
+                except Exception as e:
+                    error_str = str(e)
+                    if "42703" not in error_str and "search_vector" not in error_str:
+                        raise
+                    print("⚠️ chunks.search_vector missing, using title ILIKE")
+                    self._search_vector_available = False
+
+            result = await self._execute(
+                base_query().ilike("title", f"%{keyword}%").limit(1)
             )
 
             if result.data and len(result.data) > 0:
@@ -335,19 +419,73 @@ class SupabaseService:
             print(f"❌ Supabase find_reusable_chunk error: {e}")
             return None
 
+    async def get_chunk_with_reuse(
+        self,
+        vehicle_key: str,
+        content_id: str,
+        chunk_type: str,
+        keyword: Optional[str] = None,
+        allow_torque_fallback: bool = False,
+    ) -> Optional[Tuple[ChunkRecord, str]]:
+        """
+        Exact chunk, else a reusable chunk matching keyword, else (if allowed)
+        a reusable torque_spec - in one round-trip via rpc_get_chunk_with_reuse.
+        Returns (chunk, match_kind) with match_kind in exact/reuse/torque_fallback.
+        Falls back to the individual queries if the RPC isn't deployed.
+        """
+        if self._reuse_rpc_available:
+            try:
+                result = await self._execute(
+                    self.client.rpc(
+                        "rpc_get_chunk_with_reuse",
+                        {
+                            "p_vehicle_key": vehicle_key,
+                            "p_content_id": content_id,
+                            "p_chunk_type": chunk_type,
+                            "p_keyword": keyword,
+                            "p_allow_torque_fallback": allow_torque_fallback,
+                        },
+                    )
+                )
+                if not result.data:
+                    return None
+                return ChunkRecord(result.data["chunk"]), result.data["match_kind"]
+            except Exception as e:
+                error_str = str(e)
+                if "PGRST202" in error_str or "does not exist" in error_str:
+                    print("⚠️ rpc_get_chunk_with_reuse not deployed, using separate queries")
+                    self._reuse_rpc_available = False
+                else:
+                    print(f"❌ Supabase get_chunk_with_reuse error: {e}")
+
+        chunk = await self.get_chunk(vehicle_key, content_id, chunk_type)
+        if chunk:
+            return chunk, "exact"
+        if not keyword:
+            return None
+
+        chunk = await self.find_reusable_chunk(vehicle_key, chunk_type, keyword)
+        if chunk:
+            return chunk, "reuse"
+
+        if allow_torque_fallback:
+            chunk = await self.find_reusable_chunk(vehicle_key, "torque_spec", keyword)
+            if chunk:
+                return chunk, "torque_fallback"
+        return None
+
     async def get_chunk(
         self, vehicle_key: str, content_id: str, chunk_type: str
     ) -> Optional[ChunkRecord]:
         """Get a single chunk by vehicle_key, content_id, and chunk_type"""
         try:
-            result = (
+            result = await self._execute(
                 self.client.table("chunks")
-                .select("*")
+                .select(CHUNK_COLUMNS)
                 .eq("vehicle_key", vehicle_key)
                 .eq("content_id", content_id)
                 .eq("chunk_type", chunk_type)
                 .limit(1)
-                .execute()
             )
 
             if result.data and len(result.data) > 0:
@@ -357,7 +495,47 @@ class SupabaseService:
             print(f"❌ Supabase get_chunk error: {e}")
             return None
 
-    async def save_chunk(
+    async def get_chunks_bulk(
+        self, vehicle_key: str, content_ids: List[str]
+    ) -> Dict[Tuple[str, str], ChunkRecord]:
+        """
+        Fetch a vehicle's chunks for several content_ids in one query.
+        Returns {(content_id, chunk_type): chunk} for the rows that exist.
+        """
+        if not content_ids:
+            return {}
+        try:
+            result = await self._execute(
+                self.client.table("chunks")
+                .select(CHUNK_COLUMNS)
+                .eq("vehicle_key", vehicle_key)
+                .in_("content_id", list(dict.fromkeys(content_ids)))
+            )
+            chunks = {}
+            for row in result.data or []:
+                chunk = ChunkRecord(row)
+                chunks.setdefault((chunk.content_id, chunk.chunk_type), chunk)
+            return chunks
+        except Exception as e:
+            print(f"❌ Supabase get_chunks_bulk error: {e}")
+            return {}
+
+    async def delete_chunk_by_id(self, chunk_id: str) -> bool:
+        """Delete a single chunk by id. Returns False if the delete failed."""
+        try:
+            result = await self._execute(
+                self.client.table("chunks").delete().eq("id", chunk_id)
+            )
+            for row in result.data or []:
+                chunk_response_cache.invalidate(
+                    row["vehicle_key"], row["content_id"], row["chunk_type"]
+                )
+            return True
+        except Exception as e:
+            print(f"❌ Supabase delete_chunk_by_id error: {e}")
+            return False
+
+    def _build_chunk_row(
         self,
         vehicle_key: str,
         content_id: str,
@@ -375,64 +553,45 @@ class SupabaseService:
         regeneration_attempts: int = 0,
         regenerated_at: Optional[str] = None,
         template_version: str = "1.0",
-    ) -> Optional[ChunkRecord]:
-        """Insert or update a chunk using upsert"""
-        try:
-            # Safeguard: Ensure content_text is never None
-            if content_text is None:
-                content_text = ""
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Normalize save_chunk arguments into a chunks row.
+        Returns (row, contamination_error); a contaminated row is the
+        banned marker that must be saved instead of the real content.
+        """
+        # Safeguard: Ensure content_text is never None
+        if content_text is None:
+            content_text = ""
 
-            # Safeguard: Ensure data is never None
-            if data is None:
-                data = {}
+        # Safeguard: Ensure data is never None
+        if data is None:
+            data = {}
 
-            # Force template_type based on vehicle key to prevent EV contamination
-            template_type = self._get_template_type(vehicle_key)
+        # Force template_type based on vehicle key to prevent EV contamination
+        template_type = self._get_template_type(vehicle_key)
 
-            # Force template_type to be valid enum
-            if template_type not in ["ICE_GASOLINE", "ICE_DIESEL", "HYBRID", "EV"]:
-                print(
-                    f"⚠️ Invalid template_type '{template_type}' detected in save_chunk. Forcing to ICE_GASOLINE."
-                )
-                template_type = "ICE_GASOLINE"
-
-            # Store template version in data
-            data["template_version"] = template_version
-
-            # STATUS MAPPING: Map internal generator statuses to valid DB enums
-            # Internal statuses: unverified, pending_review, verified, auto_verified, community_verified, flagged, generated
-            # DB ONLY accepts: pending_verification, auto_verified, rejected
-            status_map = {
-                "unverified": "pending_verification",
-                "pending_review": "pending_verification",
-                "pending_verification": "pending_verification",
-                "verified": "auto_verified",
-                "auto_verified": "auto_verified",
-                "community_verified": "auto_verified",
-                "flagged": "pending_verification",
-                "generated": "pending_verification",
-                "rejected": "rejected",
-            }
-
-            # Apply mapping
-            final_verification_status = status_map.get(
-                verification_status, "pending_verification"
+        # Force template_type to be valid enum
+        if template_type not in ["ICE_GASOLINE", "ICE_DIESEL", "HYBRID", "EV"]:
+            print(
+                f"⚠️ Invalid template_type '{template_type}' detected in save_chunk. Forcing to ICE_GASOLINE."
             )
+            template_type = "ICE_GASOLINE"
 
-            # CRITICAL: Detect contamination before saving
-            contamination_error = self.detect_contamination(
-                vehicle_key, content_id, data, content_text, chunk_type
-            )
-            if contamination_error:
-                print(f"🚫 CONTAMINATION BLOCKED: {contamination_error}")
-                print(f"   Vehicle: {vehicle_key}")
-                print(f"   Content ID: {content_id}")
-                # Auto-mark as banned instead of saving contaminated data
-                qa_status = "fail"
-                qa_notes = f"AUTO-BLOCKED: {contamination_error}"
-                verification_status = "rejected"
-                # Set verified_status to banned (will be added via update after insert)
-                chunk_data = {
+        # Store template version in data
+        data["template_version"] = template_version
+
+        # STATUS MAPPING: DB only accepts pending_verification/auto_verified/rejected.
+        # Idempotent, so callers that already mapped with to_db_status are safe
+        final_verification_status = to_db_status(verification_status)
+
+        # CRITICAL: Detect contamination before saving
+        contamination_error = self.detect_contamination(
+            vehicle_key, content_id, data, content_text, chunk_type
+        )
+        if contamination_error:
+            # Auto-mark as banned instead of saving contaminated data
+            return (
+                {
                     "vehicle_key": vehicle_key,
                     "content_id": content_id,
                     "chunk_type": chunk_type,
@@ -444,73 +603,133 @@ class SupabaseService:
                         "reason": contamination_error,
                     },
                     "sources": sources,
-                    "verification_status": verification_status,
+                    "verification_status": "rejected",
                     "source_confidence": 0.0,
-                    "qa_status": qa_status,
-                    "qa_notes": qa_notes,
+                    "qa_status": "fail",
+                    "qa_notes": f"AUTO-BLOCKED: {contamination_error}",
                     "regeneration_attempts": regeneration_attempts,
-                }
-                # Save the banned marker chunk
-                result = (
-                    self.client.table("chunks")
-                    .upsert(chunk_data, on_conflict="vehicle_key,content_id,chunk_type")
-                    .execute()
-                )
-                if result.data:
-                    # Update to set verified_status = banned
-                    self.client.table("chunks").update(
-                        {"verified_status": "banned"}
-                    ).eq("id", result.data[0]["id"]).execute()
-                    print(f"✅ Contaminated chunk auto-banned: {content_id}")
-                return None  # Return None to signal contamination was blocked
-
-            # Determine visibility based on safety-critical status
-            is_critical = self.is_safety_critical(chunk_type, content_id)
+                },
+                contamination_error,
+            )
 
-            if is_critical:
-                # Keep strict behavior for safety-critical items
-                final_verified_status = "unverified"
-                final_qa_status = "pending"
-                # Note: status/visibility are not stored in DB but derived in API
-                # We store verified_status='unverified' which API maps to quarantined for critical items
-            else:
-                # Relaxed behavior for non-critical items
-                final_verified_status = "unverified"
-                final_qa_status = "pending"
-                # API will map this to visible/ready because it's not critical
-
-            chunk_data = {
-                "vehicle_key": vehicle_key,
-                "content_id": content_id,
-                "chunk_type": chunk_type,
-                "template_type": template_type,
-                "title": title,
-                "content_text": content_text,
-                "data": data,
-                "sources": sources,
-                "verification_status": final_verification_status,
-                "source_confidence": source_confidence,
-                "qa_status": final_qa_status,
-                "qa_notes": qa_notes,
-                "regeneration_attempts": regeneration_attempts,
-                "verified_status": final_verified_status,
-            }
+        # Determine visibility based on safety-critical status
+        is_critical = self.is_safety_critical(chunk_type, content_id)
 
-            # Ensure image_url is preserved for diagrams
-            if chunk_type in ["diagram", "wiring_diagram"] and data.get("image_url"):
-                chunk_data["data"]["image_url"] = data["image_url"]
+        if is_critical:
+            # Keep strict behavior for safety-critical items
+            final_verified_status = "unverified"
+            final_qa_status = "pending"
+            # Note: status/visibility are not stored in DB but derived in API
+            # We store verified_status='unverified' which API maps to quarantined for critical items
+        else:
+            # Relaxed behavior for non-critical items
+            final_verified_status = "unverified"
+            final_qa_status = "pending"
+            # API will map this to visible/ready because it's not critical
+
+        chunk_data = {
+            "vehicle_key": vehicle_key,
+            "content_id": content_id,
+            "chunk_type": chunk_type,
+            "template_type": template_type,
+            "title": title,
+            "content_text": content_text,
+            "data": data,
+            "sources": sources,
+            "verification_status": final_verification_status,
+            "source_confidence": source_confidence,
+            "qa_status": final_qa_status,
+            "qa_notes": qa_notes,
+            "regeneration_attempts": regeneration_attempts,
+            "verified_status": final_verified_status,
+        }
 
-            if last_qa_reviewed_at:
-                chunk_data["last_qa_reviewed_at"] = last_qa_reviewed_at
+        # Ensure image_url is preserved for diagrams
+        if chunk_type in ["diagram", "wiring_diagram"] and data.get("image_url"):
+            chunk_data["data"]["image_url"] = data["image_url"]
+
+        if last_qa_reviewed_at:
+            chunk_data["last_qa_reviewed_at"] = last_qa_reviewed_at
+
+        if regenerated_at:
+            chunk_data["regenerated_at"] = regenerated_at
+
+        return chunk_data, None
+
+    async def _save_blocked_chunk(
+        self, chunk_data: Dict[str, Any], contamination_error: str
+    ) -> None:
+        """Save the banned marker row for a chunk that failed the contamination check."""
+        print(f"🚫 CONTAMINATION BLOCKED: {contamination_error}")
+        print(f"   Vehicle: {chunk_data['vehicle_key']}")
+        print(f"   Content ID: {chunk_data['content_id']}")
+        # Save the banned marker chunk
+        result = await self._execute(
+            self.client.table("chunks").upsert(
+                chunk_data, on_conflict="vehicle_key,content_id,chunk_type"
+            )
+        )
+        if result.data:
+            # Update to set verified_status = banned
+            await self._execute(
+                self.client.table("chunks")
+                .update({"verified_status": "banned"})
+                .eq("id", result.data[0]["id"])
+            )
+            print(f"✅ Contaminated chunk auto-banned: {chunk_data['content_id']}")
+        chunk_response_cache.invalidate(
+            chunk_data["vehicle_key"], chunk_data["content_id"], chunk_data["chunk_type"]
+        )
 
-            if regenerated_at:
-                chunk_data["regenerated_at"] = regenerated_at
+    async def save_chunk(
+        self,
+        vehicle_key: str,
+        content_id: str,
+        chunk_type: str,
+        template_type: str,
+        title: str,
+        data: Dict[str, Any],
+        sources: list[str],
+        verification_status: str = "pending_verification",
+        source_confidence: float = 0.0,
+        content_text: Optional[str] = None,
+        qa_status: str = "pending",
+        qa_notes: Optional[str] = None,
+        last_qa_reviewed_at: Optional[str] = None,
+        regeneration_attempts: int = 0,
+        regenerated_at: Optional[str] = None,
+        template_version: str = "1.0",
+    ) -> Optional[ChunkRecord]:
+        """Insert or update a chunk using upsert"""
+        try:
+            chunk_data, contamination_error = self._build_chunk_row(
+                vehicle_key=vehicle_key,
+                content_id=content_id,
+                chunk_type=chunk_type,
+                template_type=template_type,
+                title=title,
+                data=data,
+                sources=sources,
+                verification_status=verification_status,
+                source_confidence=source_confidence,
+                content_text=content_text,
+                qa_status=qa_status,
+                qa_notes=qa_notes,
+                last_qa_reviewed_at=last_qa_reviewed_at,
+                regeneration_attempts=regeneration_attempts,
+                regenerated_at=regenerated_at,
+                template_version=template_version,
+            )
+            if contamination_error:
+                await self._save_blocked_chunk(chunk_data, contamination_error)
+                return None  # Return None to signal contamination was blocked
 
-            result = (
-                self.client.table("chunks")
-                .upsert(chunk_data, on_conflict="vehicle_key,content_id,chunk_type")
-                .execute()
+            result = await self._execute(
+                self.client.table("chunks").upsert(
+                    chunk_data, on_conflict="vehicle_key,content_id,chunk_type"
+                )
             )
+            chunk_response_cache.invalidate(vehicle_key, content_id, chunk_type)
 
             if result.data and len(result.data) > 0:
                 return ChunkRecord(result.data[0])
@@ -519,19 +738,87 @@ class SupabaseService:
             print(f"❌ Supabase save_chunk error: {e}")
             return None
 
+    async def save_chunks_bulk(
+        self, chunks: List[Dict[str, Any]]
+    ) -> List[Optional[ChunkRecord]]:
+        """
+        Save several chunks with one multi-row upsert.
+        Each item holds save_chunk keyword arguments; the result list lines up
+        with the input, None where a chunk was blocked or failed to save.
+        PERF: one round-trip instead of one save_chunk call per chunk.
+        """
+        rows: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        keys: List[Optional[Tuple[str, str, str]]] = []
+        blocked: List[Tuple[Dict[str, Any], str]] = []
+
+        for chunk in chunks:
+            try:
+                chunk_data, contamination_error = self._build_chunk_row(**chunk)
+                if contamination_error:
+                    blocked.append((chunk_data, contamination_error))
+                    keys.append(None)
+                    continue
+            except Exception as e:
+                print(f"❌ Supabase save_chunks_bulk error: {e}")
+                keys.append(None)
+                continue
+
+            key = (
+                chunk_data["vehicle_key"],
+                chunk_data["content_id"],
+                chunk_data["chunk_type"],
+            )
+            # Postgres rejects an upsert that touches the same row twice
+            rows[key] = chunk_data
+            keys.append(key)
+
+        async def upsert_rows() -> Dict[Tuple[str, str, str], ChunkRecord]:
+            saved: Dict[Tuple[str, str, str], ChunkRecord] = {}
+            if rows:
+                result = await self._execute(
+                    self.client.table("chunks").upsert(
+                        list(rows.values()),
+                        on_conflict="vehicle_key,content_id,chunk_type",
+                    )
+                )
+                for row in result.data or []:
+                    record = ChunkRecord(row)
+                    saved[
+                        (record.vehicle_key, record.content_id, record.chunk_type)
+                    ] = record
+            return saved
+
+        # PERF: Banned markers for blocked chunks are written alongside the
+        # bulk upsert instead of one after another ahead of it
+        saved, *blocked_results = await asyncio.gather(
+            upsert_rows(),
+            *[self._save_blocked_chunk(row, err) for row, err in blocked],
+            return_exceptions=True,
+        )
+        for outcome in blocked_results:
+            if isinstance(outcome, Exception):
+                print(f"❌ Supabase save_chunks_bulk error: {outcome}")
+        if isinstance(saved, Exception):
+            print(f"❌ Supabase save_chunks_bulk error: {saved}")
+            saved = {}
+        for key in rows:
+            chunk_response_cache.invalidate(*key)
+
+        return [saved.get(key) if key else None for key in keys]
+
     async def get_chunks_for_vehicle(
         self, vehicle_key: str, chunk_types: Optional[list[str]] = None
     ) -> list[ChunkRecord]:
         """Get all chunks for a vehicle, optionally filtered by chunk types"""
         try:
             query = (
-                self.client.table("chunks").select("*").eq("vehicle_key", vehicle_key)
+                self.client.table("chunks").select(CHUNK_COLUMNS).eq("vehicle_key", vehicle_key)
             )
 
             if chunk_types:
                 query = query.in_("chunk_type", chunk_types)
 
-            result = query.execute()
+            result = await self._execute(query)
 
             if result.data:
                 return [ChunkRecord(chunk) for chunk in result.data]
@@ -540,12 +827,50 @@ class SupabaseService:
             print(f"❌ Supabase get_chunks_for_vehicle error: {e}")
             return []
 
+    async def get_relevant_chunks(
+        self, vehicle_key: str, concern_terms: List[str], dtc_codes: List[str]
+    ) -> Optional[Tuple[List[ChunkRecord], List[ChunkRecord]]]:
+        """
+        Get all chunks for a vehicle split into (relevant, other) for a concern.
+        PERF: relevance is scored in Postgres against the GIN-indexed
+        search_vector instead of scanning every chunk's text in Python.
+        Returns None if the RPC isn't deployed, or if the query fails.
+        """
+        if not self._relevant_rpc_available:
+            return None
+
+        try:
+            result = await self._execute(
+                self.client.rpc(
+                    "rpc_get_relevant_chunks",
+                    {
+                        "p_vehicle_key": vehicle_key,
+                        "p_terms": concern_terms,
+                        "p_dtc_codes": dtc_codes,
+                    },
+                )
+            )
+        except Exception as e:
+            error_str = str(e)
+            if "PGRST202" in error_str or "does not exist" in error_str:
+                print("⚠️ rpc_get_relevant_chunks not deployed, scoring in Python")
+                self._relevant_rpc_available = False
+            else:
+                print(f"❌ Supabase get_relevant_chunks error: {e}")
+            return None
+
+        relevant: List[ChunkRecord] = []
+        other: List[ChunkRecord] = []
+        for row in result.data or []:
+            (relevant if row["relevant"] else other).append(ChunkRecord(row["chunk"]))
+        return relevant, other
+
     async def get_pending_qa_chunks(self, limit: int = 10) -> list[ChunkRecord]:
         """Get chunks that need QA review"""
         try:
             result = (
                 self.client.table("chunks")
-                .select("*")
+                .select(CHUNK_COLUMNS)
                 .eq("qa_status", "pending")
                 .limit(limit)
                 .execute()
@@ -658,6 +983,12 @@ class SupabaseService:
                     .eq("id", chunk_id)
                     .execute()
                 )
+                # Bans/demotions must stop being served from the L1 at once
+                chunk_response_cache.invalidate(
+                    current_chunk.vehicle_key,
+                    current_chunk.content_id,
+                    current_chunk.chunk_type,
+                )
                 return len(result.data) > 0
             except Exception as e:
                 # Fallback for schema constraint violation (Stage 7 migration)
@@ -680,6 +1011,11 @@ class SupabaseService:
                         .eq("id", chunk_id)
                         .execute()
                     )
+                    chunk_response_cache.invalidate(
+                        current_chunk.vehicle_key,
+                        current_chunk.content_id,
+                        current_chunk.chunk_type,
+                    )
                     return len(result.data) > 0
                 raise e
 
@@ -695,7 +1031,7 @@ class SupabaseService:
         try:
             result = (
                 self.client.table("chunks")
-                .select("*")
+                .select(CHUNK_COLUMNS)
                 .eq("vehicle_key", vehicle_key)
                 .eq("content_id", content_id)
                 .limit(1)
@@ -713,7 +1049,7 @@ class SupabaseService:
         try:
             result = (
                 self.client.table("chunks")
-                .select("*")
+                .select(CHUNK_COLUMNS)
                 .eq("id", chunk_id)
                 .limit(1)
                 .execute()
@@ -828,12 +1164,11 @@ class SupabaseService:
                 .replace(hour=0, minute=0, second=0, microsecond=0)
                 .isoformat()
             )
-            result = (
+            result = await self._execute(
                 self.client.table("chunks")
                 .select("id", count="exact")
                 .eq("vehicle_key", vehicle_key)
                 .gte("created_at", today_start)
-                .execute()
             )
 
             return result.count or 0
@@ -896,7 +1231,7 @@ class SupabaseService:
         try:
             result = (
                 self.client.table("chunks")
-                .select("*")
+                .select(CHUNK_COLUMNS)
                 .eq("qa_status", "fail")
                 .limit(limit)
                 .execute()
@@ -913,7 +1248,7 @@ class SupabaseService:
         """Get specific chunks by ID"""
         try:
             result = (
-                self.client.table("chunks").select("*").in_("id", chunk_ids).execute()
+                self.client.table("chunks").select(CHUNK_COLUMNS).in_("id", chunk_ids).execute()
             )
 
             if result.data:
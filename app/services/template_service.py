@@ -1,9 +1,25 @@
 import json
 import os
+import sys
 from pathlib import Path
-from typing import List, Dict, Optional
+from types import MappingProxyType
+from typing import List, Dict, FrozenSet, Mapping, NamedTuple, Optional
 from models.vehicle import Vehicle
 
+# Bound on memoized term -> matching-template sets
+_MAX_CACHED_TERMS = 10_000
+
+
+class _IndexedTemplate(NamedTuple):
+    """Search fields precomputed once per template at load time."""
+
+    leaf_id: str
+    name: Optional[str]
+    description: Optional[str]
+    text: str
+    requires_ice: bool
+    requires_diesel: bool
+
 
 class TemplateService:
     """
@@ -12,7 +28,10 @@ class TemplateService:
     """
 
     def __init__(self):
-        self.templates: Dict[str, Dict] = {}
+        # Read-only after load: interned leaf IDs -> frozen template mappings
+        self.templates: Dict[str, Mapping] = {}
+        self._index: List[_IndexedTemplate] = []
+        self._term_matches: Dict[str, FrozenSet[int]] = {}
         self._load_templates()
 
     def _load_templates(self):
@@ -26,12 +45,50 @@ class TemplateService:
             return
 
         try:
-            with open(template_path, "r", encoding="utf-8") as f:
-                self.templates = json.load(f)
+            with open(template_path, "rb") as f:
+                raw = json.loads(f.read())
+            # Skip shared sections (e.g. default_chunks) that aren't leaf templates
+            self.templates = {
+                sys.intern(leaf_id): MappingProxyType(data)
+                for leaf_id, data in raw.items()
+                if isinstance(data, dict) and "name" in data
+            }
+            self._build_index()
             print(f"✅ Loaded {len(self.templates)} service templates")
         except Exception as e:
             print(f"❌ Failed to load service_templates.json: {e}")
 
+    def _build_index(self) -> None:
+        """Precompute lowercased search text and tag flags for every template."""
+        self._index = []
+        for leaf_id, data in self.templates.items():
+            tags = data.get("tags", [])
+            self._index.append(
+                _IndexedTemplate(
+                    leaf_id=leaf_id,
+                    name=data.get("name"),
+                    description=data.get("description"),
+                    text=(
+                        data.get("name", "") + " " + data.get("description", "")
+                    ).lower(),
+                    requires_ice="requires_ice" in tags,
+                    requires_diesel="requires_diesel" in tags,
+                )
+            )
+        self._term_matches.clear()
+
+    def _matches_for_term(self, term: str) -> FrozenSet[int]:
+        """Indexes of templates whose text contains `term` (memoized per term)."""
+        matches = self._term_matches.get(term)
+        if matches is None:
+            if len(self._term_matches) >= _MAX_CACHED_TERMS:
+                self._term_matches.clear()
+            matches = frozenset(
+                i for i, entry in enumerate(self._index) if term in entry.text
+            )
+            self._term_matches[term] = matches
+        return matches
+
     def search_candidates(
         self, query: str, vehicle: Vehicle, limit: int = 20
     ) -> List[Dict]:
@@ -39,50 +96,52 @@ class TemplateService:
         Find potential matching leaf nodes based on keyword overlap.
         Filters by vehicle tags (e.g. requires_ice).
         """
-        query_terms = set(query.lower().split())
-        candidates = []
+        query_lower = query.lower()
+        query_terms = set(query_lower.split())
 
         # Pre-calculate vehicle flags
-        is_ice = (
-            "electric" not in vehicle.engine.lower()
-            or "hybrid" in vehicle.engine.lower()
-        )
-        is_diesel = "diesel" in vehicle.engine.lower()
-
-        for leaf_id, data in self.templates.items():
-            # 1. Check tags
-            tags = data.get("tags", [])
-            if "requires_ice" in tags and not is_ice:
+        engine = vehicle.engine.lower()
+        is_ice = "electric" not in engine or "hybrid" in engine
+        is_diesel = "diesel" in engine
+
+        # 1. Score by keyword match - only templates containing some term are visited
+        scores: Dict[int, int] = {}
+        for term in query_terms:
+            for i in self._matches_for_term(term):
+                scores[i] = scores.get(i, 0) + 1
+        if not query_terms:
+            scores = dict.fromkeys(range(len(self._index)), 0)
+
+        scored = []
+        for i, score in scores.items():
+            entry = self._index[i]
+
+            # 2. Check tags
+            if entry.requires_ice and not is_ice:
                 continue
-            if "requires_diesel" in tags and not is_diesel:
+            if entry.requires_diesel and not is_diesel:
                 continue
 
-            # 2. Score by keyword match
-            text = (data.get("name", "") + " " + data.get("description", "")).lower()
-            score = 0
-            for term in query_terms:
-                if term in text:
-                    score += 1
-
             # Boost exact phrase match
-            if query.lower() in text:
+            if query_lower in entry.text:
                 score += 5
 
             if score > 0:
-                candidates.append(
-                    {
-                        "id": leaf_id,
-                        "name": data.get("name"),
-                        "description": data.get("description"),
-                        "score": score,
-                    }
-                )
-
-        # Sort by score desc
-        candidates.sort(key=lambda x: x["score"], reverse=True)
-        return candidates[:limit]
-
-    def get_template(self, leaf_id: str) -> Optional[Dict]:
+                scored.append((score, i))
+
+        # Sort by score desc, ties in template order
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        return [
+            {
+                "id": self._index[i].leaf_id,
+                "name": self._index[i].name,
+                "description": self._index[i].description,
+                "score": score,
+            }
+            for score, i in scored[:limit]
+        ]
+
+    def get_template(self, leaf_id: str) -> Optional[Mapping]:
         return self.templates.get(leaf_id)
 
 
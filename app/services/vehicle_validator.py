@@ -3,6 +3,7 @@ Vehicle Configuration Validator
 Prevents hallucinations by validating vehicle configs against known database
 """
 
+from functools import lru_cache
 from typing import Optional
 from models.vehicle import Vehicle
 
@@ -59,23 +60,34 @@ class VehicleValidator:
         Check if vehicle configuration is valid
         Returns: (is_valid, error_message)
         """
-        config = VehicleValidator.normalize_config(
+        return VehicleValidator._validate(
             vehicle.year, vehicle.make, vehicle.model, vehicle.engine
         )
 
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _validate(
+        year: str, make: str, model: str, engine: str
+    ) -> tuple[bool, Optional[str]]:
+        """
+        PERF: Pure function of the four config fields, memoized so the same
+        popular vehicles aren't re-normalized and re-checked on every request.
+        """
+        config = VehicleValidator.normalize_config(year, make, model, engine)
+
         # Check against known configs
         if config in VALID_CONFIGS:
             return True, None
 
         # Check for obvious red flags
-        year_int = int(vehicle.year)
+        year_int = int(year)
 
         # 2019 F-150 never had 3.0L Powerstroke (that's F-250+)
         if (
-            vehicle.year == "2019"
-            and vehicle.make.lower() == "ford"
-            and vehicle.model.lower() == "f-150"
-            and "powerstroke" in vehicle.engine.lower()
+            year == "2019"
+            and make.lower() == "ford"
+            and model.lower() == "f-150"
+            and "powerstroke" in engine.lower()
         ):
             return (
                 False,
@@ -92,7 +104,7 @@ class VehicleValidator:
         # Configuration not in database
         return (
             False,
-            f"UNVERIFIED VEHICLE CONFIGURATION: {vehicle.year} {vehicle.make} {vehicle.model} {vehicle.engine} not in verified database. Cannot generate chunks for unverified configurations.",
+            f"UNVERIFIED VEHICLE CONFIGURATION: {year} {make} {model} {engine} not in verified database. Cannot generate chunks for unverified configurations.",
         )
 
 
@@ -0,0 +1,59 @@
+-- ============================================================
+-- SWOOPINFO: SINGLE-ROUND-TRIP CHUNK LOOKUP WITH REUSE
+-- ============================================================
+-- get_chunk used to make up to three sequential requests on a miss:
+--   1. exact (vehicle_key, content_id, chunk_type) match
+--   2. reusable chunk of the same type whose title contains a keyword
+--   3. removal_steps only: reusable torque_spec with the same keyword
+-- This function answers all three in one query and reports which
+-- branch matched in match_kind ('exact' | 'reuse' | 'torque_fallback').
+--
+-- Returns NULL when nothing matches, otherwise:
+--   {"match_kind": "...", "chunk": {<chunks row>}}
+--
+-- The backend falls back to the individual queries if this function
+-- has not been created yet.
+--
+-- Run this in Supabase SQL Editor
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION rpc_get_chunk_with_reuse(
+  p_vehicle_key text,
+  p_content_id text,
+  p_chunk_type text,
+  p_keyword text DEFAULT NULL,
+  p_allow_torque_fallback boolean DEFAULT false
+)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT jsonb_build_object('match_kind', m.match_kind, 'chunk', to_jsonb(m.c))
+  FROM (
+    (SELECT 'exact' AS match_kind, 1 AS priority, c
+       FROM chunks c
+      WHERE c.vehicle_key = p_vehicle_key
+        AND c.content_id = p_content_id
+        AND c.chunk_type = p_chunk_type
+      LIMIT 1)
+    UNION ALL
+    (SELECT 'reuse', 2, c
+       FROM chunks c
+      WHERE p_keyword IS NOT NULL
+        AND c.vehicle_key = p_vehicle_key
+        AND c.chunk_type = p_chunk_type
+        AND c.title ILIKE '%' || p_keyword || '%'
+      LIMIT 1)
+    UNION ALL
+    (SELECT 'torque_fallback', 3, c
+       FROM chunks c
+      WHERE p_allow_torque_fallback
+        AND p_keyword IS NOT NULL
+        AND c.vehicle_key = p_vehicle_key
+        AND c.chunk_type = 'torque_spec'
+        AND c.title ILIKE '%' || p_keyword || '%'
+      LIMIT 1)
+  ) m
+  ORDER BY m.priority
+  LIMIT 1;
+$$;
@@ -0,0 +1,70 @@
+-- ============================================================
+-- SWOOPINFO: FULL-TEXT SEARCH FOR CHUNK REUSE
+-- ============================================================
+-- Reuse lookups matched keywords with title ILIKE '%keyword%', which
+-- cannot use an index and scans every chunk for the vehicle.
+-- This adds a weighted tsvector (title = A, content_text = B) with a
+-- GIN index and switches rpc_get_chunk_with_reuse to
+-- websearch_to_tsquery, picking the best match by ts_rank_cd.
+--
+-- The backend detects a missing search_vector column and keeps using
+-- ILIKE until this migration has been applied.
+--
+-- Run this in Supabase SQL Editor
+-- ============================================================
+
+ALTER TABLE chunks
+  ADD COLUMN IF NOT EXISTS search_vector tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(content_text, '')), 'B')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS chunks_fts_idx ON chunks USING GIN (search_vector);
+
+CREATE OR REPLACE FUNCTION rpc_get_chunk_with_reuse(
+  p_vehicle_key text,
+  p_content_id text,
+  p_chunk_type text,
+  p_keyword text DEFAULT NULL,
+  p_allow_torque_fallback boolean DEFAULT false
+)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  WITH q AS (
+    SELECT CASE WHEN p_keyword IS NULL THEN NULL
+                ELSE websearch_to_tsquery('english', p_keyword) END AS query
+  )
+  SELECT jsonb_build_object('match_kind', m.match_kind, 'chunk', to_jsonb(m.c))
+  FROM (
+    (SELECT 'exact' AS match_kind, 1 AS priority, c
+       FROM chunks c
+      WHERE c.vehicle_key = p_vehicle_key
+        AND c.content_id = p_content_id
+        AND c.chunk_type = p_chunk_type
+      LIMIT 1)
+    UNION ALL
+    (SELECT 'reuse', 2, c
+       FROM chunks c, q
+      WHERE q.query IS NOT NULL
+        AND c.vehicle_key = p_vehicle_key
+        AND c.chunk_type = p_chunk_type
+        AND c.search_vector @@ q.query
+      ORDER BY ts_rank_cd(c.search_vector, q.query) DESC
+      LIMIT 1)
+    UNION ALL
+    (SELECT 'torque_fallback', 3, c
+       FROM chunks c, q
+      WHERE p_allow_torque_fallback
+        AND q.query IS NOT NULL
+        AND c.vehicle_key = p_vehicle_key
+        AND c.chunk_type = 'torque_spec'
+        AND c.search_vector @@ q.query
+      ORDER BY ts_rank_cd(c.search_vector, q.query) DESC
+      LIMIT 1)
+  ) m
+  ORDER BY m.priority
+  LIMIT 1;
+$$;
@@ -0,0 +1,76 @@
+-- ============================================================
+-- SWOOPINFO: PLAN-CACHED CHUNK LOOKUP
+-- ============================================================
+-- rpc_get_chunk_with_reuse runs on nearly every GET /chunks request.
+-- As a LANGUAGE sql function its UNION was planned on every call and
+-- every branch ran even when the exact match hit. As plpgsql, each
+-- statement is prepared once per connection and its plan cached, and
+-- the reuse / torque_fallback searches only run when needed.
+--
+-- The returned chunk omits search_vector (migration 003), which is
+-- never read by the backend and roughly doubles the payload.
+--
+-- Same signature and result shape as migration 002 / 003:
+--   NULL, or {"match_kind": "exact" | "reuse" | "torque_fallback",
+--             "chunk": {<chunks row>}}
+--
+-- Run this in Supabase SQL Editor
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION rpc_get_chunk_with_reuse(
+  p_vehicle_key text,
+  p_content_id text,
+  p_chunk_type text,
+  p_keyword text DEFAULT NULL,
+  p_allow_torque_fallback boolean DEFAULT false
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  v_query tsquery;
+  v_chunk jsonb;
+BEGIN
+  SELECT to_jsonb(c) - 'search_vector' INTO v_chunk
+    FROM chunks c
+   WHERE c.vehicle_key = p_vehicle_key
+     AND c.content_id = p_content_id
+     AND c.chunk_type = p_chunk_type
+   LIMIT 1;
+  IF v_chunk IS NOT NULL THEN
+    RETURN jsonb_build_object('match_kind', 'exact', 'chunk', v_chunk);
+  END IF;
+
+  IF p_keyword IS NULL THEN
+    RETURN NULL;
+  END IF;
+  v_query := websearch_to_tsquery('english', p_keyword);
+
+  SELECT to_jsonb(c) - 'search_vector' INTO v_chunk
+    FROM chunks c
+   WHERE c.vehicle_key = p_vehicle_key
+     AND c.chunk_type = p_chunk_type
+     AND c.search_vector @@ v_query
+   ORDER BY ts_rank_cd(c.search_vector, v_query) DESC
+   LIMIT 1;
+  IF v_chunk IS NOT NULL THEN
+    RETURN jsonb_build_object('match_kind', 'reuse', 'chunk', v_chunk);
+  END IF;
+
+  IF p_allow_torque_fallback THEN
+    SELECT to_jsonb(c) - 'search_vector' INTO v_chunk
+      FROM chunks c
+     WHERE c.vehicle_key = p_vehicle_key
+       AND c.chunk_type = 'torque_spec'
+       AND c.search_vector @@ v_query
+     ORDER BY ts_rank_cd(c.search_vector, v_query) DESC
+     LIMIT 1;
+    IF v_chunk IS NOT NULL THEN
+      RETURN jsonb_build_object('match_kind', 'torque_fallback', 'chunk', v_chunk);
+    END IF;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
@@ -0,0 +1,100 @@
+-- ============================================================
+-- SWOOPINFO: FILTER UNSERVABLE CHUNKS IN THE LOOKUP
+-- ============================================================
+-- get_chunk used to fetch a row and then throw it away in Python when it
+-- was a "See Manual" stub, had NULL data/content_text, or was banned or
+-- rejected. has_stub_marker precomputes the stub check when the row is
+-- written. A partial index covers only servable rows, and
+-- rpc_get_chunk_with_reuse now skips unservable rows in SQL: the exact
+-- lookup misses and the reuse search moves on to the next candidate.
+--
+-- A miss regenerates the chunk, and the upsert on
+-- (vehicle_key, content_id, chunk_type) overwrites the unservable row.
+--
+-- Run this in Supabase SQL Editor
+-- ============================================================
+
+ALTER TABLE chunks
+  ADD COLUMN IF NOT EXISTS has_stub_marker boolean
+  GENERATED ALWAYS AS (coalesce(content_text LIKE '%See Manual%', false)) STORED;
+
+CREATE INDEX IF NOT EXISTS chunks_servable_idx
+  ON chunks (vehicle_key, content_id, chunk_type)
+  WHERE NOT has_stub_marker
+    AND data IS NOT NULL
+    AND content_text IS NOT NULL
+    AND verification_status IS DISTINCT FROM 'rejected'
+    AND verified_status IS DISTINCT FROM 'banned';
+
+CREATE OR REPLACE FUNCTION rpc_get_chunk_with_reuse(
+  p_vehicle_key text,
+  p_content_id text,
+  p_chunk_type text,
+  p_keyword text DEFAULT NULL,
+  p_allow_torque_fallback boolean DEFAULT false
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  v_query tsquery;
+  v_chunk jsonb;
+BEGIN
+  SELECT to_jsonb(c) - 'search_vector' - 'has_stub_marker' INTO v_chunk
+    FROM chunks c
+   WHERE c.vehicle_key = p_vehicle_key
+     AND c.content_id = p_content_id
+     AND c.chunk_type = p_chunk_type
+     AND NOT c.has_stub_marker
+     AND c.data IS NOT NULL
+     AND c.content_text IS NOT NULL
+     AND c.verification_status IS DISTINCT FROM 'rejected'
+     AND c.verified_status IS DISTINCT FROM 'banned'
+   LIMIT 1;
+  IF v_chunk IS NOT NULL THEN
+    RETURN jsonb_build_object('match_kind', 'exact', 'chunk', v_chunk);
+  END IF;
+
+  IF p_keyword IS NULL THEN
+    RETURN NULL;
+  END IF;
+  v_query := websearch_to_tsquery('english', p_keyword);
+
+  SELECT to_jsonb(c) - 'search_vector' - 'has_stub_marker' INTO v_chunk
+    FROM chunks c
+   WHERE c.vehicle_key = p_vehicle_key
+     AND c.chunk_type = p_chunk_type
+     AND c.search_vector @@ v_query
+     AND NOT c.has_stub_marker
+     AND c.data IS NOT NULL
+     AND c.content_text IS NOT NULL
+     AND c.verification_status IS DISTINCT FROM 'rejected'
+     AND c.verified_status IS DISTINCT FROM 'banned'
+   ORDER BY ts_rank_cd(c.search_vector, v_query) DESC
+   LIMIT 1;
+  IF v_chunk IS NOT NULL THEN
+    RETURN jsonb_build_object('match_kind', 'reuse', 'chunk', v_chunk);
+  END IF;
+
+  IF p_allow_torque_fallback THEN
+    SELECT to_jsonb(c) - 'search_vector' - 'has_stub_marker' INTO v_chunk
+      FROM chunks c
+     WHERE c.vehicle_key = p_vehicle_key
+       AND c.chunk_type = 'torque_spec'
+       AND c.search_vector @@ v_query
+       AND NOT c.has_stub_marker
+       AND c.data IS NOT NULL
+       AND c.content_text IS NOT NULL
+       AND c.verification_status IS DISTINCT FROM 'rejected'
+       AND c.verified_status IS DISTINCT FROM 'banned'
+     ORDER BY ts_rank_cd(c.search_vector, v_query) DESC
+     LIMIT 1;
+    IF v_chunk IS NOT NULL THEN
+      RETURN jsonb_build_object('match_kind', 'torque_fallback', 'chunk', v_chunk);
+    END IF;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
@@ -0,0 +1,51 @@
+-- ============================================================
+-- SWOOPINFO: CONCERN RELEVANCE SCORED IN POSTGRES
+-- ============================================================
+-- /generate-chunks used to pull every chunk for the vehicle and run a
+-- Python substring scan over title + content_text for each one, on
+-- every request. This function returns the same rows with a
+-- "relevant" flag computed against the GIN-indexed search_vector
+-- (migration 003):
+--   * any DTC code appears in the title or content_text, or
+--   * at least 2 concern terms match, or more than 30% of them do
+-- Terms are matched as stemmed English lexemes, so "leaking" also
+-- matches "leak".
+--
+-- Returns one row per chunk: {"chunk": {<chunks row>}, "relevant": bool}
+--
+-- The backend falls back to the Python scan if this function has not
+-- been created yet.
+--
+-- Run this in Supabase SQL Editor (after 003 and 005)
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION rpc_get_relevant_chunks(
+  p_vehicle_key text,
+  p_terms text[] DEFAULT '{}',
+  p_dtc_codes text[] DEFAULT '{}'
+)
+RETURNS TABLE (chunk jsonb, relevant boolean)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    to_jsonb(c) - 'search_vector' - 'has_stub_marker',
+    EXISTS (
+      SELECT 1
+        FROM unnest(p_dtc_codes) AS code
+       WHERE strpos(
+               lower(coalesce(c.title, '') || ' ' || coalesce(c.content_text, '')),
+               lower(code)
+             ) > 0
+    )
+    OR m.matches >= 2
+    OR (cardinality(p_terms) > 0
+        AND m.matches::float / cardinality(p_terms) > 0.3)
+  FROM chunks c
+  CROSS JOIN LATERAL (
+    SELECT count(*) AS matches
+      FROM unnest(p_terms) AS term
+     WHERE c.search_vector @@ plainto_tsquery('english', term)
+  ) m
+  WHERE c.vehicle_key = p_vehicle_key;
+$$;